@@ -0,0 +1,70 @@
+"""
+Benchmark the size of pair files written with full URIs and with
+CURIEs, and the time taken to read them back as full URIs.
+
+Usage (from the `convert` directory):
+    python benchmarks/curie.py [-n PAIRS]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from handlers.curie import LISTING_PREFIX, PrefixMap  # noqa: E402
+from handlers.duke import DukeHandler  # noqa: E402
+from handlers.jedai import JedaiHandler  # noqa: E402
+
+
+def pairs(count: int) -> list[tuple[str, str]]:
+    """Return synthetic pairs of listing URIs."""
+    rng = random.Random(0)
+    ids = count // 2
+    return [
+        (
+            f"{LISTING_PREFIX}site{first % 3 + 1}_{first}",
+            f"{LISTING_PREFIX}site{second % 3 + 1}_{second}",
+        )
+        for first, second in (
+            (rng.randrange(ids), rng.randrange(ids)) for _ in range(count)
+        )
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--pairs", type=int, default=1_000_000)
+    args = parser.parse_args()
+    duplicates = pairs(args.pairs)
+    compacted = PrefixMap({"l": LISTING_PREFIX})
+
+    print(f"{args.pairs} pairs")
+    print(f"{'file':<16} {'MiB':>8} {'write s':>8} {'read s':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for handler_class in (DukeHandler, JedaiHandler):
+            for name, prefixes in (("full", None), ("compact", compacted)):
+                handler = handler_class(prefixes)
+                filename = os.path.join(directory, name + handler.extension)
+
+                start = time.perf_counter()
+                handler.write(filename, "", duplicates, [])
+                written = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for _ in handler.read_dups(filename):
+                    pass
+                read = time.perf_counter() - start
+
+                size = os.path.getsize(filename) / 2**20
+                label = f"{handler_class.__name__[:-7].lower()} {name}"
+                print(f"{label:<16} {size:>8.1f} {written:>8.2f} {read:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
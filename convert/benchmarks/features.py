@@ -0,0 +1,124 @@
+"""
+Benchmark computing the similarity features of pairs in NumPy batches
+against computing them one pair at a time in Python.
+
+Usage (from the `convert` directory):
+    python benchmarks/features.py [-l LISTINGS] [-n PAIRS]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from handlers.curie import LISTING_PREFIX  # noqa: E402
+from handlers.features import (  # noqa: E402
+    EARTH_RADIUS,
+    RELATIVE_COLUMNS,
+    FeatureHandler,
+    Listings,
+)
+from handlers.interned import PairBatch, URITable  # noqa: E402
+
+STREETS: list[str] = ["calle", "avenida", "diagonal", "pasaje", "boulevard"]
+
+
+def write_data(filename: str, listings: int) -> None:
+    """Write a data file of synthetic listings."""
+    rng = random.Random(0)
+    with open(filename, "w") as f:
+        f.write("uri,price,total_surface,covered_surface,address,coordinates\n")
+        for i in range(listings):
+            f.write(
+                f"{LISTING_PREFIX}site1_{i},{rng.randrange(10**4, 10**6)},"
+                f"{rng.randrange(30, 500)},{rng.randrange(30, 300)},"
+                f'"{rng.choice(STREETS)} {rng.randrange(1, 200)} '
+                f'y {rng.randrange(1, 200)}, La Plata",'
+                f'"({rng.uniform(-35, -34):.6f}, {rng.uniform(-58, -57):.6f})"\n'
+            )
+
+
+def python_loop(listings: Listings, pairs: list[tuple[int, int]]) -> list:
+    """Compute the features of each pair, one value at a time."""
+    latitude, longitude = listings.latitude.tolist(), listings.longitude.tolist()
+    numbers = [listings.numbers[column].tolist() for column in RELATIVE_COLUMNS]
+    offsets, tokens = listings.offsets.tolist(), listings.tokens.tolist()
+    addresses = [set(tokens[start:stop]) for start, stop in zip(offsets, offsets[1:])]
+
+    rows = []
+    for first, second in pairs:
+        lat1, lat2 = latitude[first], latitude[second]
+        a = (
+            math.sin((lat2 - lat1) / 2) ** 2
+            + math.cos(lat1)
+            * math.cos(lat2)
+            * math.sin((longitude[second] - longitude[first]) / 2) ** 2
+        )
+        row = [2 * EARTH_RADIUS * math.asin(math.sqrt(min(max(a, 0), 1)))]
+        for values in numbers:
+            x, y = values[first], values[second]
+            scale = max(abs(x), abs(y))
+            row.append(0.0 if scale == 0 else abs(x - y) / scale)
+
+        union = len(addresses[first] | addresses[second])
+        row.append(
+            len(addresses[first] & addresses[second]) / union if union else math.nan
+        )
+        rows.append(row)
+
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-l", "--listings", type=int, default=100_000)
+    parser.add_argument("-n", "--pairs", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    pairs = [
+        (
+            f"{LISTING_PREFIX}site1_{rng.randrange(args.listings)}",
+            f"{LISTING_PREFIX}site1_{rng.randrange(args.listings)}",
+        )
+        for _ in range(args.pairs)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        datafile = os.path.join(directory, "data.csv")
+        filename = os.path.join(directory, "pairs.features.npy")
+        write_data(datafile, args.listings)
+
+        table = URITable()
+        batch = PairBatch.from_pairs(pairs, table)
+        start = time.perf_counter()
+        listings = Listings(datafile, table)
+        parsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        FeatureHandler().write(filename, datafile, batch, PairBatch(table))
+        vectorized = time.perf_counter() - start
+
+        start = time.perf_counter()
+        python = np.array(python_loop(listings, list(batch.numbers())))
+        loop = time.perf_counter() - start
+
+        np.testing.assert_allclose(np.load(filename), python, equal_nan=True)
+
+    print(f"{args.pairs} pairs of {args.listings} listings")
+    print(f"parse listings      {parsed:>8.2f} s")
+    print(f"write (vectorized)  {vectorized:>8.2f} s (including parsing)")
+    print(f"python loop         {loop:>8.2f} s (excluding parsing)")
+
+
+if __name__ == "__main__":
+    main()
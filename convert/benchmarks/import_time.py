@@ -0,0 +1,59 @@
+"""
+Benchmark the import time of convert.py and of each handler.
+
+Each measurement runs in a fresh interpreter, so that no module is
+cached, and the median of several runs is reported.
+
+Usage (from the `convert` directory):
+    python benchmarks/import_time.py [-n RUNS]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+STATEMENTS: dict[str, str] = {
+    "convert.py (registry only)": "import convert",
+    "duke -> jedai": "import convert; convert.STRATEGY_MAP['duke']; convert.STRATEGY_MAP['jedai']",
+    "sqlite": "import convert; convert.STRATEGY_MAP['sqlite']",
+    "dedupe": "import convert; convert.STRATEGY_MAP['dedupe']",
+    "all handlers (eager)": "import convert; list(convert.STRATEGY_MAP.values())",
+}
+
+
+def measure(statement: str) -> float:
+    """
+    Return the time in seconds that a fresh interpreter takes to run a
+    statement, excluding the startup of the interpreter itself.
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--runs", type=int, default=5, help="runs per statement")
+    args = parser.parse_args()
+
+    print(f"{'import':<28} {'median (ms)':>12}")
+    for name, statement in STATEMENTS.items():
+        times = [measure(statement) for _ in range(args.runs)]
+        print(f"{name:<28} {statistics.median(times) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark the memory and time taken to hold the pairs of a conversion
+as tuples of strings and as a batch of interned IDs.
+
+Usage (from the `convert` directory):
+    python benchmarks/interned.py [-n PAIRS]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from handlers.interned import PairBatch, URITable  # noqa: E402
+
+PREFIX: str = (
+    "https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_site"
+)
+
+
+def read_pairs(pairs: int, ids: int):
+    """Yield synthetic pairs, as a reader would, with new strings."""
+    rng = random.Random(0)
+    for _ in range(pairs):
+        first, second = rng.randrange(ids), rng.randrange(ids)
+        yield f"{PREFIX}{first % 3 + 1}_{first}", f"{PREFIX}{second % 3 + 1}_{second}"
+
+
+def measure(build) -> tuple[float, int]:
+    """Return the seconds taken by `build` and the memory its result holds."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--pairs", type=int, default=1_000_000)
+    args = parser.parse_args()
+    ids = args.pairs // 2
+
+    print(f"{args.pairs} pairs of {ids} distinct IDs")
+    print(f"{'representation':<16} {'seconds':>8} {'MiB':>8}")
+    for name, build in [
+        ("tuples", lambda: list(read_pairs(args.pairs, ids))),
+        (
+            "interned batch",
+            lambda: PairBatch.from_pairs(read_pairs(args.pairs, ids), URITable()),
+        ),
+    ]:
+        elapsed, size = measure(build)
+        print(f"{name:<16} {elapsed:>8.2f} {size / 2**20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,18 +6,17 @@ and writer strategies.
 import argparse
 import errno
 import os
-from typing import Final
+from typing import Any, Final, Iterable
 
-from handlers.dedupe import DedupeHandler
-from handlers.duke import DukeHandler
-from handlers.handler import Handler, Reader, Writer
-from handlers.jedai import JedaiHandler
+from handlers.canonical import CanonicalReader, parse_size, read_uris, report_dangling
+from handlers.curie import LISTING_PREFIX, PrefixMap, parse_prefix
+from handlers.handler import Reader, Writer
+from handlers.interned import PairBatch, URITable
+from handlers.registry import HandlerRegistry
 
-STRATEGY_MAP: Final[dict[str, Handler.__class__]] = {
-    "duke": DukeHandler,
-    "dedupe": DedupeHandler,
-    "jedai": JedaiHandler,
-}
+# Handlers are imported only when selected, so that a conversion does not
+# pay for the dependencies of the handlers it does not use.
+STRATEGY_MAP: Final[HandlerRegistry] = HandlerRegistry()
 
 
 def main() -> None:
@@ -26,15 +25,82 @@ def main() -> None:
 
     validate_args(args)
 
-    reader: Reader = STRATEGY_MAP[args.reader]()
-    writer: Writer = STRATEGY_MAP[args.writer]()
+    reader: Reader = STRATEGY_MAP[args.reader](**reader_options(args))
+    if args.canonicalize:
+        reader = CanonicalReader(reader, args.memory, read_uris(args.data))
+
+    writer: Writer = STRATEGY_MAP[args.writer](**writer_options(args))
+    reads_non_dups: bool = STRATEGY_MAP.capabilities(args.reader).reads_non_duplicates
+    duplicates: Iterable[tuple[str, str]] = reader.read_dups(args.input)
+    non_dups: Iterable[tuple[str, str]] = (
+        reader.read_non_dups(args.input) if reads_non_dups else iter(())
+    )
+
+    # Writers that hold every pair in memory get them as compact batches
+    # of interned IDs instead of tuples of strings.
+    if not STRATEGY_MAP.capabilities(args.writer).streaming:
+        table = URITable()
+        duplicates = PairBatch.from_pairs(duplicates, table)
+        non_dups = PairBatch.from_pairs(non_dups, table)
+
     writer.write(
         filename=args.output,
         datafile=args.data,
-        duplicates=reader.read_dups(args.input),
-        non_dups=reader.read_non_dups(args.input),
+        duplicates=duplicates,
+        non_dups=non_dups,
     )
 
+    if args.canonicalize:
+        report_dangling(reader.dangling)
+
+
+def reader_options(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Return the options of the reader given in the command line.
+
+    Args:
+        args (argparse.Namespace): Command-line arguments.
+
+    Returns:
+        The keyword arguments to create the reader with.
+    """
+    capabilities = STRATEGY_MAP.capabilities(args.reader)
+    options: dict[str, Any] = {}
+    if capabilities.reads_datafile:
+        options["datafile"] = args.data
+    if capabilities.named_runs and args.run is not None:
+        options["run"] = args.run
+
+    return options
+
+
+def writer_options(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Return the options of the writer given in the command line.
+
+    Args:
+        args (argparse.Namespace): Command-line arguments.
+
+    Returns:
+        The keyword arguments to create the writer with.
+    """
+    options: dict[str, Any] = {}
+    if args.max_pairs is not None:
+        options.update(
+            max_pairs=args.max_pairs, match_ratio=args.match_ratio, seed=args.seed
+        )
+
+    prefixes: dict[str, str] = dict(args.prefix)
+    if args.compact:
+        prefixes.setdefault("l", LISTING_PREFIX)
+    if prefixes:
+        options["prefixes"] = PrefixMap(prefixes)
+
+    if STRATEGY_MAP.capabilities(args.writer).named_runs and args.run is not None:
+        options["run"] = args.run
+
+    return options
+
 
 def validate_args(args: argparse.Namespace) -> None:
     """
@@ -44,12 +110,34 @@ def validate_args(args: argparse.Namespace) -> None:
         args (argparse.Namespace): Command-line arguments.
 
     Raises:
-        FileExistsError: If the output file already exists.
+        FileExistsError: If the output file already exists and the
+            writer does not append to it.
         FileNotFoundError: If the input or data file do not exist.
         PermissionError: If the user does not have the required
             permissions to access a file.
+        ValueError: If the training data options are given to a writer
+            other than dedupe, a match ratio outside [0, 1], prefixes
+            to a writer that does not compact URIs, or a run to handlers
+            without named runs.
     """
-    if os.path.isfile(args.output):
+    if args.max_pairs is not None and args.writer not in ("dedupe", "dedupe-json"):
+        raise ValueError("--max-pairs is only supported by the dedupe writer")
+
+    if not 0 <= args.match_ratio <= 1:
+        raise ValueError(f"--match-ratio must be between 0 and 1: {args.match_ratio}")
+
+    compacts_uris: bool = STRATEGY_MAP.capabilities(args.writer).compacts_uris
+    if (args.prefix or args.compact) and not compacts_uris:
+        raise ValueError(f"The {args.writer} writer does not compact URIs")
+
+    if args.run is not None and not any(
+        STRATEGY_MAP.capabilities(name).named_runs
+        for name in (args.reader, args.writer)
+    ):
+        raise ValueError("--run is only supported by the sqlite strategy")
+
+    appends: bool = STRATEGY_MAP.capabilities(args.writer).appends
+    if os.path.isfile(args.output) and not appends:
         raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), args.output)
 
     if not os.path.isdir(os.path.dirname(args.output)):
@@ -83,7 +171,7 @@ def read_args() -> argparse.Namespace:
         "--output",
         type=str,
         required=True,
-        help="The output file to write to. If this file already exists, a FileExistsError will be raised.",
+        help="The output file to write to. If this file already exists, a FileExistsError will be raised, unless the writer appends to it, like sqlite.",
     )
     parser.add_argument(
         "-d", "--data", type=str, required=True, help="The data file to read."
@@ -104,6 +192,56 @@ def read_args() -> argparse.Namespace:
         required=True,
         help="The writer strategy to use for the conversion.",
     )
+    parser.add_argument(
+        "-c",
+        "--canonicalize",
+        action="store_true",
+        help="Order the IDs of each pair, drop self-links and repeated pairs, and report IDs missing from the data file.",
+    )
+    parser.add_argument(
+        "-m",
+        "--memory",
+        type=parse_size,
+        default="256M",
+        help="The memory budget for canonicalizing pairs, such as 64M or 1G.",
+    )
+    parser.add_argument(
+        "--max-pairs",
+        type=int,
+        default=None,
+        help="The maximum number of pairs of dedupe's training data. A sample stratified by site pair and cluster is written, with its statistics next to it.",
+    )
+    parser.add_argument(
+        "--match-ratio",
+        type=float,
+        default=0.5,
+        help="The fraction of the capped training data given to matches.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="The seed of the sample of the capped training data.",
+    )
+    parser.add_argument(
+        "-p",
+        "--prefix",
+        type=parse_prefix,
+        action="append",
+        default=[],
+        help="A NAME=IRI prefix to compact the written URIs with, declared in a header of the output. May be repeated.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help=f"Compact the URIs of listings with the prefix l={LISTING_PREFIX}",
+    )
+    parser.add_argument(
+        "--run",
+        type=str,
+        default=None,
+        help="The name of the run to read from or write to, for the sqlite strategy. Writing to an existing database adds the run to it.",
+    )
     return parser.parse_args()
 
 
@@ -0,0 +1,151 @@
+"""
+Profile the listings of a data file in a single pass: the rate of empty
+and unparseable values, the number of distinct values and the
+distribution of the numbers of each column, and the number of rows whose
+URI is not referenced by the labels. The profile is written as JSON.
+"""
+
+import argparse
+import csv
+import errno
+import json
+import os
+import sys
+from typing import Any, Final, Optional
+
+from handlers.profiling import profile_data, read_cluster_uris
+from handlers.registry import HandlerRegistry
+
+STRATEGY_MAP: Final[HandlerRegistry] = HandlerRegistry()
+
+
+def main() -> None:
+    """Parse command-line arguments and profile the data file."""
+    args: argparse.Namespace = read_args()
+
+    validate_args(args)
+
+    labeled_uris: Optional[set[str]] = None
+    if args.labels is not None:
+        labeled_uris = read_labeled_uris(args)
+
+    with open(args.data, "r") as f:
+        profile: dict[str, Any] = profile_data(
+            csv.DictReader(f), labeled_uris, args.precision, args.compression
+        )
+
+    if args.output is None:
+        json.dump(profile, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(profile, f, indent=2)
+
+
+def read_labeled_uris(args: argparse.Namespace) -> set[str]:
+    """
+    Read the URIs referenced by the labels.
+
+    Args:
+        args (argparse.Namespace): Command-line arguments.
+
+    Returns:
+        set[str]: The URIs of every pair, or of every cluster if no
+        reader is given.
+    """
+    if args.reader is None:
+        return set(read_cluster_uris(args.labels))
+
+    capabilities = STRATEGY_MAP.capabilities(args.reader)
+    options: dict[str, Any] = (
+        {"datafile": args.data} if capabilities.reads_datafile else {}
+    )
+    reader = STRATEGY_MAP[args.reader](**options)
+    uris: set[str] = set()
+    for pair in reader.read_dups(args.labels):
+        uris.update(pair)
+    if capabilities.reads_non_duplicates:
+        for pair in reader.read_non_dups(args.labels):
+            uris.update(pair)
+
+    return uris
+
+
+def validate_args(args: argparse.Namespace) -> None:
+    """
+    Validate command line arguments.
+
+    Args:
+        args (argparse.Namespace): Command-line arguments.
+
+    Raises:
+        FileExistsError: If the output file already exists.
+        FileNotFoundError: If the data or labels file do not exist.
+        PermissionError: If the user does not have the required
+            permissions to access a file.
+    """
+    if args.output is not None and os.path.isfile(args.output):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), args.output)
+
+    for file in [args.data, args.labels]:
+        if file is None:
+            continue
+
+        if not os.path.isfile(file):
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), file)
+
+        if not os.access(file, os.R_OK):
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), file)
+
+
+def read_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        An argparse.Namespace containing the parsed command-line
+        arguments.
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-d", "--data", type=str, required=True, help="The data file to profile."
+    )
+    parser.add_argument(
+        "-l",
+        "--labels",
+        type=str,
+        default=None,
+        help="The labels file to count the unreferenced rows with. By default, a file of clusters of duplicates, like the input of gt.py.",
+    )
+    parser.add_argument(
+        "-r",
+        "--reader",
+        choices=sorted(STRATEGY_MAP.keys()),
+        type=str,
+        default=None,
+        help="The reader strategy of the labels file, if it is a file of pairs.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=None,
+        help="The JSON file to write the profile to, instead of the standard output.",
+    )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        default=12,
+        help="The precision of the HyperLogLog sketches of distinct values, which use 2**precision bytes per column.",
+    )
+    parser.add_argument(
+        "--compression",
+        type=int,
+        default=100,
+        help="The number of centroids of the t-digests of numeric columns.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Canonicalize pairs: order the IDs of each pair, drop self-links and
+remove repeated pairs, using an external merge sort that keeps at most
+a given amount of pairs in memory.
+
+Besides wrapping a reader in `convert.py`, it can canonicalize a CSV
+file of pairs, such as the ones read by `metrics.py`:
+
+    python -m handlers.canonical -i pairs.csv -o canonical.csv -d data.csv
+"""
+
+import argparse
+import csv
+import contextlib
+import heapq
+import os
+import re
+import sys
+import tempfile
+from collections.abc import Generator, Iterable, Iterator
+from typing import IO, Optional
+
+from .curie import PrefixMap
+from .handler import Reader
+
+# The memory used by a pair besides the characters of its IDs: the tuple
+# and both str objects.
+PAIR_OVERHEAD: int = 160
+
+UNITS: dict[str, int] = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30}
+
+# The most runs merged at once, which bounds the open files.
+MERGE_FAN_IN: int = 64
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a memory size such as "512K", "64M" or "1G".
+
+    Args:
+        size (str): The size, in bytes or with a K, M or G suffix.
+
+    Returns:
+        int: The size in bytes.
+
+    Raises:
+        ValueError: If the size is not valid.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?)B?\s*", size.upper())
+    if not match:
+        raise ValueError(f"Invalid memory size: {size!r}")
+
+    return int(match.group(1)) * UNITS[match.group(2)]
+
+
+def order_pairs(
+    pairs: Iterable[tuple[str, str]],
+) -> Generator[tuple[str, str], None, None]:
+    """
+    Order the IDs of each pair and drop self-links, so that a pair is
+    yielded the same way regardless of its orientation.
+
+    Args:
+        pairs (Iterable[tuple[str, str]]): The pairs to order.
+
+    Yields:
+        tuple[str, str]: The pair with its smallest ID first.
+    """
+    for id1, id2 in pairs:
+        if id1 < id2:
+            yield id1, id2
+        elif id2 < id1:
+            yield id2, id1
+
+
+def sort_unique(
+    pairs: Iterable[tuple[str, str]], memory: int, directory: Optional[str] = None
+) -> Generator[tuple[str, str], None, None]:
+    """
+    Sort pairs and remove repetitions with an external merge sort.
+
+    Pairs are sorted in runs that fit in the memory budget, runs are
+    spilled to temporary files and then merged, at most `MERGE_FAN_IN`
+    at a time, in as many passes as needed.
+
+    Args:
+        pairs (Iterable[tuple[str, str]]): The pairs to sort.
+        memory (int): The approximate number of bytes of pairs to keep
+            in memory.
+        directory (Optional[str]): The directory for the temporary
+            files, or None for the default one.
+
+    Yields:
+        tuple[str, str]: The distinct pairs, in ascending order.
+    """
+    buffer: set[tuple[str, str]] = set()
+    used: int = 0
+
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        runs: list[str] = []
+        for pair in pairs:
+            if pair in buffer:
+                continue
+
+            buffer.add(pair)
+            used += len(pair[0]) + len(pair[1]) + PAIR_OVERHEAD
+            if used >= memory:
+                runs.append(_spill(sorted(buffer), scratch))
+                buffer, used = set(), 0
+
+        if not runs:
+            yield from sorted(buffer)
+            return
+
+        runs.append(_spill(sorted(buffer), scratch))
+        del buffer
+
+        while len(runs) > MERGE_FAN_IN:
+            merged: list[str] = []
+            for start in range(0, len(runs), MERGE_FAN_IN):
+                group: list[str] = runs[start : start + MERGE_FAN_IN]
+                merged.append(_spill(_merge_runs(group), scratch))
+                for run in group:
+                    os.remove(run)
+            runs = merged
+
+        yield from _merge_runs(runs)
+
+
+def _spill(pairs: Iterable[tuple[str, str]], directory: str) -> str:
+    descriptor, path = tempfile.mkstemp(suffix=".csv", dir=directory)
+    with open(descriptor, "w", newline="") as run:
+        csv.writer(run).writerows(pairs)
+
+    return path
+
+
+def _merge_runs(runs: list[str]) -> Generator[tuple[str, str], None, None]:
+    with contextlib.ExitStack() as stack:
+        readers = [
+            csv.reader(stack.enter_context(open(run, "r", newline=""))) for run in runs
+        ]
+        previous: Optional[tuple[str, str]] = None
+        for row in heapq.merge(*readers):
+            pair: tuple[str, str] = (row[0], row[1])
+            if pair != previous:
+                yield pair
+                previous = pair
+
+
+def read_uris(datafile: str) -> set[str]:
+    """
+    Read the URIs of the listings of a data file.
+
+    Args:
+        datafile (str): The path to a CSV file with a `uri` column.
+
+    Returns:
+        set[str]: The URIs in the data file.
+    """
+    with open(datafile, "r") as f:
+        return {row["uri"] for row in csv.DictReader(f)}
+
+
+class CanonicalReader:
+    """
+    A reader that canonicalizes the pairs read by another reader.
+
+    Pairs are yielded with their smallest ID first, sorted, without
+    self-links and without repetitions. If the URIs of a data file are
+    given, the IDs missing from it are collected in `dangling`.
+    """
+
+    def __init__(
+        self,
+        reader: Reader,
+        memory: int = 256 * 2**20,
+        uris: Optional[set[str]] = None,
+        directory: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            reader (Reader): The reader to wrap.
+            memory (int): The approximate number of bytes of pairs to
+                keep in memory while sorting.
+            uris (Optional[set[str]]): The URIs of the data file, or
+                None to not look for dangling IDs.
+            directory (Optional[str]): The directory for the temporary
+                files, or None for the default one.
+        """
+        self.reader: Reader = reader
+        self.memory: int = memory
+        self.uris: Optional[set[str]] = uris
+        self.directory: Optional[str] = directory
+        self.dangling: set[str] = set()
+
+    def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the canonical duplicates of a file.
+
+        Args:
+            filename (str): The name of the file to read from.
+
+        Yields:
+            tuple[str, str]: A tuple of duplicate IDs.
+        """
+        yield from self._canonicalize(self.reader.read_dups(filename))
+
+    def read_non_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the canonical non-duplicates of a file.
+
+        Args:
+            filename (str): The name of the file to read from.
+
+        Yields:
+            tuple[str, str]: A tuple of non-duplicate IDs.
+        """
+        yield from self._canonicalize(self.reader.read_non_dups(filename))
+
+    def _canonicalize(
+        self, pairs: Iterable[tuple[str, str]]
+    ) -> Generator[tuple[str, str], None, None]:
+        for pair in sort_unique(order_pairs(pairs), self.memory, self.directory):
+            if self.uris is not None:
+                self.dangling.update(uri for uri in pair if uri not in self.uris)
+
+            yield pair
+
+
+class CSVPairReader:
+    """
+    A reader of CSV files with one pair of duplicate IDs per row, which
+    is the format read by `metrics.py`.
+    """
+
+    def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the duplicates from the file.
+
+        Args:
+            filename (str): The name of the file to read from.
+
+        Yields:
+            tuple[str, str]: A tuple of duplicate IDs.
+
+        Raises:
+            ValueError: If a row has a single ID.
+        """
+        with open(filename, "r") as f:
+            expand = PrefixMap.read(f).expand
+            reader = csv.reader(f)
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) < 2:
+                    raise ValueError(f"{filename}: expected a pair of IDs, got {row!r}")
+
+                yield expand(row[0]), expand(row[1])
+
+    def read_non_dups(self, _: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the non-duplicates from the file, which has none.
+        """
+        yield from ()
+
+
+def report_dangling(dangling: set[str], output: IO[str] = sys.stderr) -> None:
+    """
+    Report the IDs that are missing from the data file.
+
+    Args:
+        dangling (set[str]): The missing IDs.
+        output (IO[str]): The file to write the report to.
+    """
+    if not dangling:
+        return
+
+    print(f"{len(dangling)} IDs are missing from the data file:", file=output)
+    for uri in sorted(dangling):
+        print(f"  {uri}", file=output)
+
+
+def read_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        An argparse.Namespace containing the parsed command-line
+        arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-i", "--input", type=str, required=True, help="The CSV file of pairs to read."
+    )
+    parser.add_argument(
+        "-o", "--output", type=str, required=True, help="The CSV file to write to."
+    )
+    parser.add_argument(
+        "-d",
+        "--data",
+        type=str,
+        default=None,
+        help="The data file to look for dangling IDs in.",
+    )
+    parser.add_argument(
+        "-m",
+        "--memory",
+        type=parse_size,
+        default="256M",
+        help="The memory budget for sorting, such as 64M or 1G.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Canonicalize a CSV file of pairs."""
+    args: argparse.Namespace = read_args()
+
+    reader = CanonicalReader(
+        CSVPairReader(),
+        args.memory,
+        read_uris(args.data) if args.data else None,
+    )
+    with open(args.output, "w", newline="") as f:
+        csv.writer(f).writerows(reader.read_dups(args.input))
+
+    report_dangling(reader.dangling)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import csv
+import itertools
+from array import array
+from collections.abc import Generator, Iterable
+from typing import Optional
+
+from .curie import PrefixMap
+
+
+def read_clusters(filename: str) -> dict[str, list[str]]:
+    """
+    Read a clustered CSV file, with a `Cluster ID` and a `uri` column,
+    expanding the URIs compacted with the prefixes of its header.
+
+    Args:
+        filename (str): The name of the file to read from.
+
+    Returns:
+        dict[str, list[str]]: The URIs of each cluster.
+    """
+    clusters: dict[str, list[str]] = {}
+    with open(filename, "r") as f:
+        expand = PrefixMap.read(f).expand
+        for row in csv.DictReader(f):
+            clusters.setdefault(row["Cluster ID"], []).append(expand(row["uri"]))
+
+    return clusters
+
+
+class UnionFind:
+    """
+    A disjoint-set forest over interned IDs, with path compression and
+    union by size.
+
+    Each ID is interned into the index of its node, and the parent and
+    size of the nodes are kept in compact arrays.
+    """
+
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+        self.uris: list[str] = []
+        self.parent: array = array("I")
+        self.size: array = array("I")
+
+    def __len__(self) -> int:
+        return len(self.uris)
+
+    def add(self, uri: str) -> int:
+        """
+        Intern an ID, adding it as a singleton set if it is new.
+
+        Args:
+            uri (str): The ID to add.
+
+        Returns:
+            int: The node of the ID.
+        """
+        node = self.index.get(uri)
+        if node is None:
+            node = self.index[uri] = len(self.uris)
+            self.uris.append(uri)
+            self.parent.append(node)
+            self.size.append(1)
+
+        return node
+
+    def find(self, node: int) -> int:
+        """
+        Find the root of the set of a node, compressing the path to it.
+
+        Args:
+            node (int): The node to look up.
+
+        Returns:
+            int: The root of the set of the node.
+        """
+        parent = self.parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+
+        return root
+
+    def union(self, first: str, second: str) -> int:
+        """
+        Merge the sets of two IDs, attaching the smaller set to the
+        larger one.
+
+        Args:
+            first (str): An ID.
+            second (str): Another ID.
+
+        Returns:
+            int: The root of the merged set.
+        """
+        root1, root2 = self.find(self.add(first)), self.find(self.add(second))
+        if root1 == root2:
+            return root1
+
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+        return root1
+
+    def clusters(self) -> Generator[tuple[int, str], None, None]:
+        """
+        Number the sets in order of appearance of their first ID.
+
+        Yields:
+            tuple[int, str]: The number of the set of each ID and the ID,
+            in order of appearance of the IDs.
+        """
+        numbers: array = array("i", [-1]) * len(self.uris)
+        count: int = 0
+        for node, uri in enumerate(self.uris):
+            root = self.find(node)
+            if numbers[root] < 0:
+                numbers[root], count = count, count + 1
+
+            yield numbers[root], uri
+
+
+class ClusterHandler:
+    """
+    Handler for clustered CSV files, in which each row has the
+    `Cluster ID` of a record and its `uri`, as output by dedupe.
+
+    The writer computes the clusters as the connected components of the
+    duplicate pairs.
+    """
+
+    def __init__(self, prefixes: Optional[PrefixMap] = None) -> None:
+        """
+        Args:
+            prefixes (Optional[PrefixMap]): The prefixes to compact the
+                written URIs with, or None to write them in full.
+        """
+        self.prefixes: PrefixMap = prefixes or PrefixMap({})
+
+    def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the pairs of records that share a cluster.
+
+        Args:
+            filename (str): The name of the file to read from.
+
+        Yields:
+            tuple[str, str]: A tuple of duplicate IDs.
+        """
+        for uris in read_clusters(filename).values():
+            yield from itertools.combinations(uris, 2)
+
+    def read_non_dups(self, _: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the non-duplicates from the file, which has none.
+        """
+        yield from ()
+
+    def write(
+        self,
+        filename: str,
+        datafile: str,
+        duplicates: Iterable[tuple[str, str]],
+        non_dups: Iterable[tuple[str, str]],
+    ) -> None:
+        """
+        Write the connected components of the duplicates as clusters.
+
+        IDs that only appear in non-duplicate pairs are written as
+        singleton clusters.
+
+        Args:
+            filename (str): The path to the file.
+            datafile (str): The path to the data file.
+            duplicates (Iterable[tuple[str, str]]): The duplicate IDs.
+            non_dups (Iterable[tuple[str, str]]): The non-duplicate IDs.
+        """
+        forest = UnionFind()
+        for first, second in duplicates:
+            forest.union(first, second)
+
+        for first, second in non_dups:
+            forest.add(first)
+            forest.add(second)
+
+        compact = self.prefixes.compact
+        with open(filename, "w", newline="") as f:
+            f.write(self.prefixes.header())
+            writer = csv.writer(f)
+            writer.writerow(["Cluster ID", "uri"])
+            writer.writerows(
+                (cluster, compact(uri)) for cluster, uri in forest.clusters()
+            )
+
+    @property
+    def extension(self) -> str:
+        """
+        Return the extension of the file format that the writer writes.
+
+        Returns:
+            The extension of the file format that the writer writes.
+        """
+        return ".clusters.csv"
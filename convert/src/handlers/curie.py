@@ -0,0 +1,150 @@
+"""
+Compact URIs into CURIEs with a prefix map declared at the top of a
+file, e.g.:
+
+    @prefix l: <https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_>
+    +,l:site2_A869314430,l:site3_46308621,0
+
+Writers given a `PrefixMap` write its header and compact each URI.
+Readers read the header, if any, and expand each CURIE as its pair is
+yielded.
+"""
+
+import argparse
+import re
+from typing import IO, Final
+
+# The prefix shared by the URIs of every listing.
+LISTING_PREFIX: Final[str] = (
+    "https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_"
+)
+
+# A prefix name, which is empty for the default prefix.
+PREFIX_NAME: Final[re.Pattern] = re.compile(r"(?:[A-Za-z_][\w.-]*)?")
+
+PREFIX_LINE: Final[re.Pattern] = re.compile(
+    rf"@prefix ({PREFIX_NAME.pattern}): <([^>]*)>\s*"
+)
+
+
+class PrefixMap:
+    """
+    A mapping from prefix names to the IRIs they abbreviate.
+    """
+
+    def __init__(self, prefixes: dict[str, str]) -> None:
+        """
+        Args:
+            prefixes (dict[str, str]): The IRI of each prefix name.
+
+        Raises:
+            ValueError: If a name could be mistaken for a URI scheme.
+        """
+        for name in prefixes:
+            if name in ("http", "https", "urn", "file"):
+                raise ValueError(f"Invalid prefix name: {name!r}")
+
+        self.prefixes: dict[str, str] = dict(prefixes)
+        # The longest IRI that matches is used to compact a URI.
+        self.by_length: list[tuple[str, str]] = sorted(
+            prefixes.items(), key=lambda item: len(item[1]), reverse=True
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.prefixes)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, PrefixMap) and self.prefixes == other.prefixes
+
+    def compact(self, uri: str) -> str:
+        """
+        Abbreviate a URI with the longest prefix that matches it.
+
+        Args:
+            uri (str): The URI.
+
+        Returns:
+            str: The CURIE, or the URI if no prefix matches it.
+        """
+        for name, iri in self.by_length:
+            if uri.startswith(iri):
+                return f"{name}:{uri[len(iri):]}"
+
+        return uri
+
+    def expand(self, curie: str) -> str:
+        """
+        Expand a CURIE into its URI.
+
+        Args:
+            curie (str): The CURIE, or a URI that was not compacted.
+
+        Returns:
+            str: The URI.
+        """
+        name, separator, local = curie.partition(":")
+        iri = self.prefixes.get(name) if separator else None
+        return curie if iri is None else iri + local
+
+    def header(self) -> str:
+        """
+        Return the lines that declare the prefixes in a file.
+
+        Returns:
+            str: An `@prefix` line per prefix.
+        """
+        return "".join(
+            f"@prefix {name}: <{iri}>\n" for name, iri in self.prefixes.items()
+        )
+
+    @classmethod
+    def read(cls, f: IO[str]) -> "PrefixMap":
+        """
+        Read the prefixes declared at the top of a file, leaving it at
+        the first line after them.
+
+        Args:
+            f (IO[str]): The file, at its start.
+
+        Returns:
+            PrefixMap: The prefixes of the file, which are none if it
+            has no header.
+        """
+        prefixes: dict[str, str] = {}
+        while True:
+            position = f.tell()
+            match = PREFIX_LINE.fullmatch(f.readline())
+            if not match:
+                f.seek(position)
+                return cls(prefixes)
+
+            prefixes[match.group(1) or ""] = match.group(2)
+
+
+def parse_prefix(value: str) -> tuple[str, str]:
+    """
+    Parse a prefix given as "NAME=IRI".
+
+    Args:
+        value (str): The prefix argument.
+
+    Returns:
+        tuple[str, str]: The name and the IRI of the prefix.
+
+    Raises:
+        argparse.ArgumentTypeError: If the prefix is not valid, or its
+            name or IRI could not be read back from the header.
+    """
+    name, separator, iri = value.partition("=")
+    if not separator or not iri:
+        raise argparse.ArgumentTypeError(f"Invalid prefix: {value!r}")
+
+    if not PREFIX_NAME.fullmatch(name):
+        raise argparse.ArgumentTypeError(
+            f"Invalid prefix name: {name!r}; it must match {PREFIX_NAME.pattern}"
+        )
+
+    if ">" in iri or iri != iri.strip():
+        raise argparse.ArgumentTypeError(f"Invalid prefix IRI: {iri!r}")
+
+    return name, iri
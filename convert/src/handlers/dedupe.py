@@ -1,13 +1,17 @@
 import csv
 import itertools
-import math
-import re
+import json
+import os
 from collections.abc import Generator, Iterable
-from typing import Any
+from typing import Any, Optional
 
 import dedupe
 from dedupe._typing import RecordDict, TrainingData
-from unidecode import unidecode
+
+from .cluster import read_clusters
+from .interned import PairBatch, URITable
+from .normalize import normalize
+from .sampling import sample_training_pairs
 
 
 class DedupeHandler:
@@ -18,6 +22,26 @@ class DedupeHandler:
     for dedupe.
     """
 
+    def __init__(
+        self,
+        max_pairs: Optional[int] = None,
+        match_ratio: float = 0.5,
+        seed: int = 0,
+    ) -> None:
+        """
+        Args:
+            max_pairs (Optional[int]): The maximum number of pairs of the
+                training data, or None to write every pair. When capped,
+                a sample stratified by site pair and cluster is written,
+                and its seed and statistics are saved next to it.
+            match_ratio (float): The fraction of the capped training
+                data given to matches.
+            seed (int): The seed of the sample.
+        """
+        self.max_pairs: Optional[int] = max_pairs
+        self.match_ratio: float = match_ratio
+        self.seed: int = seed
+
     def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
         """
         Read the duplicates from a file in dedupe's expected format.
@@ -28,14 +52,7 @@ class DedupeHandler:
         Yields:
             tuple[str, str]: A tuple of duplicate files.
         """
-        duplicates: dict[int, list[str]] = {}
-        with open(filename, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cluster = int(row["Cluster ID"])
-                duplicates[cluster] = duplicates.get(cluster, []) + [row["uri"]]
-
-        for dups in duplicates.values():
+        for dups in read_clusters(filename).values():
             if len(dups) < 2:
                 continue
 
@@ -52,14 +69,7 @@ class DedupeHandler:
         Yields:
             tuple[str, str]: A tuple of non duplicate files.
         """
-        duplicates: dict[int, list[str]] = {}
-        with open(filename, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cluster = int(row["Cluster ID"])
-                duplicates[cluster] = duplicates.get(cluster, []) + [row["uri"]]
-
-        for dups in duplicates.values():
+        for dups in read_clusters(filename).values():
             if len(dups) > 1:
                 continue
 
@@ -82,22 +92,94 @@ class DedupeHandler:
                 each item.
             duplicates (Iterable[tuple[str, str]]): A list of tuples of
                 duplicate files.
-
+            non_dups (Iterable[tuple[str, str]]): A list of tuples of
+                non-duplicate files. If both are `PairBatch`es of the
+                same table, only the records of their URIs are read,
+                and the URIs are never decoded.
         """
-        with open(datafile, "r") as f:
-            reader = csv.DictReader(f)
-            data_attrs: dict[str, RecordDict] = {
-                row["uri"]: self.normalize(row) for row in reader
+        if self.max_pairs is not None:
+            matches, distincts, stats = sample_training_pairs(
+                duplicates, non_dups, self.max_pairs, self.match_ratio, self.seed
+            )
+            with open(self.stats_filename(filename), "w") as f:
+                json.dump(stats, f, indent=2)
+
+            table = URITable()
+            duplicates = PairBatch.from_pairs(matches, table)
+            non_dups = PairBatch.from_pairs(distincts, table)
+
+        if (
+            isinstance(duplicates, PairBatch)
+            and isinstance(non_dups, PairBatch)
+            and duplicates.table is non_dups.table
+        ):
+            records = self.read_interned_records(datafile, duplicates.table)
+            training_data: TrainingData = {
+                "match": [
+                    (records[d1], records[d2]) for d1, d2 in duplicates.numbers()
+                ],
+                "distinct": [
+                    (records[d1], records[d2]) for d1, d2 in non_dups.numbers()
+                ],
+            }
+        else:
+            with open(datafile, "r") as f:
+                reader = csv.DictReader(f)
+                data_attrs: dict[str, RecordDict] = {
+                    row["uri"]: self.normalize(row) for row in reader
+                }
+
+            training_data = {
+                "match": [(data_attrs[d1], data_attrs[d2]) for d1, d2 in duplicates],
+                "distinct": [(data_attrs[d1], data_attrs[d2]) for d1, d2 in non_dups],
             }
-
-        training_data: TrainingData = {
-            "match": [(data_attrs[d1], data_attrs[d2]) for d1, d2 in duplicates],
-            "distinct": [(data_attrs[d1], data_attrs[d2]) for d1, d2 in non_dups],
-        }
 
         with open(filename, "w") as f:
             dedupe.write_training(training_data, f)
 
+    @staticmethod
+    def stats_filename(filename: str) -> str:
+        """
+        Return the name of the statistics file of a capped training file,
+        e.g. "train.dedupe.stats.json" for "train.dedupe.json".
+
+        Args:
+            filename (str): The name of the training file.
+
+        Returns:
+            str: The name of its statistics file.
+        """
+        return os.path.splitext(filename)[0] + ".stats.json"
+
+    def read_interned_records(self, datafile: str, table: URITable) -> list[RecordDict]:
+        """
+        Read and normalize the records of the URIs interned in a table,
+        skipping the rest of the data file.
+
+        Args:
+            datafile (str): The name of the file with the information of
+                each item.
+            table (URITable): The table of the URIs.
+
+        Returns:
+            list[RecordDict]: The record of each number of the table.
+
+        Raises:
+            KeyError: If the data file does not have the record of a URI.
+        """
+        records: list[Any] = [None] * len(table)
+        with open(datafile, "r") as f:
+            for row in csv.DictReader(f):
+                number = table.index.get(row["uri"])
+                if number is not None:
+                    records[number] = self.normalize(row)
+
+        for number, record in enumerate(records):
+            if record is None:
+                raise KeyError(table[number])
+
+        return records
+
     def normalize(self, row: dict[str, Any]) -> dict[str, Any]:
         """
         Normalize the data for dedupe.
@@ -108,32 +190,7 @@ class DedupeHandler:
         Returns:
             dict[str, Any]: The normalized row.
         """
-        for k, v in row.items():
-            v = unidecode(v)
-            v = re.sub("  +", " ", v)
-            v = re.sub("\n", " ", v)
-            v = v.strip().strip('"').strip("'").lower().strip()
-            row[k] = v
-
-            if not v:
-                row[k] = None
-                continue
-
-            if k in ("age", "bath_amnt", "room_amnt", "garage_amnt", "bed_amnt"):
-                if math.floor(float(v)) == float(v):
-                    row[k] = int(math.floor(float(v)))
-            elif k in (
-                "total_surface",
-                "covered_surface",
-                "land_surface",
-                "maintenance_fee",
-                "price",
-            ):
-                row[k] = "null" if float(v) == float("NaN") else float(v)
-            elif k == "coordinates":
-                row[k] = tuple(map(float, v.strip("()").split(",")))
-
-        return row
+        return normalize(row)
 
     @property
     def extension(self) -> str:
@@ -1,8 +1,19 @@
 import csv
 from collections.abc import Generator, Iterable
+from typing import Optional
+
+from .curie import PrefixMap
 
 
 class DukeHandler:
+    def __init__(self, prefixes: Optional[PrefixMap] = None) -> None:
+        """
+        Args:
+            prefixes (Optional[PrefixMap]): The prefixes to compact the
+                written URIs with, or None to write them in full.
+        """
+        self.prefixes: PrefixMap = prefixes or PrefixMap({})
+
     def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
         """
         Read the duplicates from a file in Duke's expected format.
@@ -14,8 +25,11 @@ class DukeHandler:
             tuple[str, str]: A tuple of duplicate files.
         """
         with open(filename, "r") as f:
+            expand = PrefixMap.read(f).expand
             reader = csv.reader(f)
-            yield from ((row[1], row[2]) for row in reader if row[0] == "+")
+            yield from (
+                (expand(row[1]), expand(row[2])) for row in reader if row[0] == "+"
+            )
 
     def read_non_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
         """
@@ -28,13 +42,16 @@ class DukeHandler:
             tuple[str, str]: A tuple of non-duplicate files.
         """
         with open(filename, "r") as f:
+            expand = PrefixMap.read(f).expand
             reader = csv.reader(f)
-            yield from ((row[1], row[2]) for row in reader if row[0] == "-")
+            yield from (
+                (expand(row[1]), expand(row[2])) for row in reader if row[0] == "-"
+            )
 
     def write(
         self,
         filename: str,
-        _: str,
+        datafile: str,
         duplicates: Iterable[tuple[str, str]],
         non_dups: Iterable[tuple[str, str]],
     ) -> None:
@@ -49,12 +66,14 @@ class DukeHandler:
             non_dups (Iterable[tuple[str, str]]): A list of tuples of
                 non-duplicate pairs.
         """
+        compact = self.prefixes.compact
         with open(filename, "w") as f:
+            f.write(self.prefixes.header())
             writer = csv.writer(f)
             for duplicate in duplicates:
-                writer.writerow(["+", duplicate[0], duplicate[1], 0])
+                writer.writerow(["+", compact(duplicate[0]), compact(duplicate[1]), 0])
             for non_dup in non_dups:
-                writer.writerow(["-", non_dup[0], non_dup[1], 0])
+                writer.writerow(["-", compact(non_dup[0]), compact(non_dup[1]), 0])
 
     @property
     def extension(self) -> str:
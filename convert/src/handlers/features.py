@@ -0,0 +1,382 @@
+"""
+Write similarity features of the labeled pairs for learning-based
+matchers.
+
+The features of each pair are computed from the listings of the data
+file, parsed with the rules of `normalize`, in NumPy batches of pairs.
+They are written as a float64 matrix with a row per pair and a column
+per feature of `FEATURES` to a `.npy` file, which can be memory-mapped
+with `numpy.load(filename, mmap_mode="r")`. The pairs of its rows are
+written, in the same order, to an index CSV next to it, e.g.
+`train.features.index.csv` for `train.features.npy`:
+
+    id1,id2,duplicate
+    https://...#listing_site2_A869314430,https://...#listing_site3_46308621,1
+
+A feature is NaN when a value it needs is missing or cannot be parsed.
+"""
+
+import csv
+import io
+import os
+import re
+from collections.abc import Generator, Iterable, Iterator
+from typing import Any, Final
+
+import numpy as np
+
+from .interned import PairBatch, URITable
+from .normalize import clean, parse_value
+
+FEATURES: Final[tuple[str, ...]] = (
+    "distance",
+    "price",
+    "total_surface",
+    "covered_surface",
+    "address",
+)
+
+# The columns whose relative difference is a feature.
+RELATIVE_COLUMNS: Final[tuple[str, ...]] = ("price", "total_surface", "covered_surface")
+
+# The mean radius of the Earth, in kilometers.
+EARTH_RADIUS: Final[float] = 6371.0088
+
+TOKEN: Final[re.Pattern] = re.compile(r"\w+")
+
+
+class Listings:
+    """
+    The columns of the listings that the features are computed from,
+    as arrays indexed by the numbers of a `URITable`.
+
+    Attributes:
+        latitude (np.ndarray): The latitude of each listing, in radians.
+        longitude (np.ndarray): The longitude of each listing, in radians.
+        numbers (dict[str, np.ndarray]): The values of each column of
+            `RELATIVE_COLUMNS`.
+        offsets (np.ndarray): The start of the address tokens of each
+            listing in `tokens`, and the end of the last one.
+        tokens (np.ndarray): The distinct tokens of the address of each
+            listing, as numbers.
+        vocabulary (int): The number of distinct tokens.
+    """
+
+    def __init__(
+        self, datafile: str, table: URITable, address_column: str = "address"
+    ) -> None:
+        """
+        Read the listings of the URIs interned in a table, skipping the
+        rest of the data file.
+
+        Args:
+            datafile (str): The name of the file with the information of
+                each item.
+            table (URITable): The table of the URIs.
+            address_column (str): The column of the address.
+
+        Raises:
+            KeyError: If the data file does not have the listing of a URI.
+        """
+        size: int = len(table)
+        self.latitude: np.ndarray = np.full(size, np.nan)
+        self.longitude: np.ndarray = np.full(size, np.nan)
+        self.numbers: dict[str, np.ndarray] = {
+            column: np.full(size, np.nan) for column in RELATIVE_COLUMNS
+        }
+        addresses: list[Any] = [None] * size
+        vocabulary: dict[str, int] = {}
+
+        with open(datafile, "r") as f:
+            for row in csv.DictReader(f):
+                number = table.index.get(row["uri"])
+                if number is None:
+                    continue
+
+                coordinates = _parse(row, "coordinates")
+                if isinstance(coordinates, tuple) and len(coordinates) == 2:
+                    self.latitude[number], self.longitude[number] = coordinates
+                for column in RELATIVE_COLUMNS:
+                    value = _parse(row, column)
+                    if isinstance(value, float):
+                        self.numbers[column][number] = value
+
+                addresses[number] = [
+                    vocabulary.setdefault(token, len(vocabulary))
+                    for token in set(
+                        TOKEN.findall(clean(row.get(address_column) or ""))
+                    )
+                ]
+
+        for number, tokens in enumerate(addresses):
+            if tokens is None:
+                raise KeyError(table[number])
+
+        self.latitude = np.radians(self.latitude)
+        self.longitude = np.radians(self.longitude)
+        self.offsets: np.ndarray = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum([len(tokens) for tokens in addresses], out=self.offsets[1:])
+        self.tokens: np.ndarray = np.fromiter(
+            (token for tokens in addresses for token in tokens),
+            dtype=np.int64,
+            count=int(self.offsets[-1]),
+        )
+        self.vocabulary: int = len(vocabulary)
+
+
+def _parse(row: dict[str, str], column: str) -> Any:
+    """Parse a value of a row, or return None if it cannot be parsed."""
+    try:
+        return parse_value(column, clean(row.get(column) or ""))
+    except ValueError:
+        return None
+
+
+def haversine(listings: Listings, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Compute the great-circle distance between the listings of pairs.
+
+    Args:
+        listings (Listings): The listings.
+        first (np.ndarray): The number of the first listing of each pair.
+        second (np.ndarray): The number of the second listing of each pair.
+
+    Returns:
+        np.ndarray: The distance of each pair, in kilometers.
+    """
+    latitude1, latitude2 = listings.latitude[first], listings.latitude[second]
+    longitude = listings.longitude[second] - listings.longitude[first]
+    a = (
+        np.sin((latitude2 - latitude1) / 2) ** 2
+        + np.cos(latitude1) * np.cos(latitude2) * np.sin(longitude / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def relative_difference(
+    values: np.ndarray, first: np.ndarray, second: np.ndarray
+) -> np.ndarray:
+    """
+    Compute `|a - b| / max(|a|, |b|)` for the values of pairs, which is
+    0 for equal values and 1 when one of them is 0.
+
+    Args:
+        values (np.ndarray): The value of each listing.
+        first (np.ndarray): The number of the first listing of each pair.
+        second (np.ndarray): The number of the second listing of each pair.
+
+    Returns:
+        np.ndarray: The relative difference of each pair.
+    """
+    a, b = values[first], values[second]
+    scale = np.maximum(np.abs(a), np.abs(b))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(scale == 0, 0.0, np.abs(a - b) / scale)
+
+
+def jaccard(listings: Listings, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Compute the Jaccard similarity of the address tokens of pairs.
+
+    The tokens of both listings of each pair are keyed by the position of
+    the pair and sorted, so that the tokens they share are the keys that
+    are repeated next to each other.
+
+    Args:
+        listings (Listings): The listings.
+        first (np.ndarray): The number of the first listing of each pair.
+        second (np.ndarray): The number of the second listing of each pair.
+
+    Returns:
+        np.ndarray: The similarity of each pair, or NaN if neither
+        listing has an address.
+    """
+    pairs: int = len(first)
+    keys: list[np.ndarray] = []
+    sizes: np.ndarray = np.zeros(pairs, dtype=np.int64)
+    for numbers in (first, second):
+        starts = listings.offsets[numbers]
+        lengths = listings.offsets[numbers + 1] - starts
+        sizes += lengths
+        # The position of each token among the tokens of its listing.
+        positions = np.arange(lengths.sum()) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        tokens = listings.tokens[np.repeat(starts, lengths) + positions]
+        keys.append(np.repeat(np.arange(pairs), lengths) * listings.vocabulary + tokens)
+
+    sorted_keys = np.sort(np.concatenate(keys))
+    shared = sorted_keys[1:][sorted_keys[1:] == sorted_keys[:-1]]
+    intersections = np.bincount(shared // max(listings.vocabulary, 1), minlength=pairs)
+    unions = sizes - intersections
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(unions == 0, np.nan, intersections / unions)
+
+
+def similarity_features(
+    listings: Listings, first: np.ndarray, second: np.ndarray
+) -> np.ndarray:
+    """
+    Compute the features of `FEATURES` for a batch of pairs.
+
+    Args:
+        listings (Listings): The listings.
+        first (np.ndarray): The number of the first listing of each pair.
+        second (np.ndarray): The number of the second listing of each pair.
+
+    Returns:
+        np.ndarray: A row of features per pair.
+    """
+    return np.column_stack(
+        [haversine(listings, first, second)]
+        + [
+            relative_difference(listings.numbers[column], first, second)
+            for column in RELATIVE_COLUMNS
+        ]
+        + [jaccard(listings, first, second)]
+    )
+
+
+class FeatureHandler:
+    """
+    A writer of the similarity features of the pairs to a `.npy` matrix
+    and an index CSV, which it reads the pairs back from.
+    """
+
+    def __init__(
+        self, chunk_size: int = 2**16, address_column: str = "address"
+    ) -> None:
+        """
+        Args:
+            chunk_size (int): The number of pairs computed at a time.
+            address_column (str): The column of the address of a listing.
+        """
+        self.chunk_size: int = chunk_size
+        self.address_column: str = address_column
+
+    def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the duplicates from the index of a feature matrix.
+
+        Args:
+            filename (str): The name of the matrix file.
+
+        Yields:
+            tuple[str, str]: A tuple of duplicate URIs.
+        """
+        yield from self._read_pairs(filename, "1")
+
+    def read_non_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the non-duplicates from the index of a feature matrix.
+
+        Args:
+            filename (str): The name of the matrix file.
+
+        Yields:
+            tuple[str, str]: A tuple of non-duplicate URIs.
+        """
+        yield from self._read_pairs(filename, "0")
+
+    def _read_pairs(self, filename: str, duplicate: str) -> Iterator[tuple[str, str]]:
+        with open(self.index_filename(filename), "r", newline="") as f:
+            for row in csv.DictReader(f):
+                if row["duplicate"] == duplicate:
+                    yield row["id1"], row["id2"]
+
+    def write(
+        self,
+        filename: str,
+        datafile: str,
+        duplicates: Iterable[tuple[str, str]],
+        non_dups: Iterable[tuple[str, str]],
+    ) -> None:
+        """
+        Write the features of the (non-)duplicates, in that order, to a
+        matrix file and the pairs of its rows to its index file.
+
+        Args:
+            filename (str): The name of the matrix file.
+            datafile (str): The name of the file with the information of
+                each item.
+            duplicates (Iterable[tuple[str, str]]): A list of tuples of
+                duplicate pairs.
+            non_dups (Iterable[tuple[str, str]]): A list of tuples of
+                non-duplicate pairs. If both are `PairBatch`es of the
+                same table, their numbers are used as they are.
+
+        Raises:
+            KeyError: If the data file does not have the listing of a URI.
+        """
+        if not (
+            isinstance(duplicates, PairBatch)
+            and isinstance(non_dups, PairBatch)
+            and duplicates.table is non_dups.table
+        ):
+            table = URITable()
+            duplicates = PairBatch.from_pairs(duplicates, table)
+            non_dups = PairBatch.from_pairs(non_dups, table)
+
+        listings = Listings(datafile, duplicates.table, self.address_column)
+        # The URIs, quoted once by `csv.writer` and followed by the comma
+        # after them, to write the rows of the index by chunk.
+        fields: np.ndarray = np.empty(len(duplicates.table.uris), dtype=object)
+        buffer = io.StringIO()
+        quoter = csv.writer(buffer, lineterminator="")
+        for number, uri in enumerate(duplicates.table.uris):
+            quoter.writerow([uri, ""])
+            fields[number] = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        matrix = np.lib.format.open_memmap(
+            filename,
+            mode="w+",
+            dtype=np.float64,
+            shape=(len(duplicates) + len(non_dups), len(FEATURES)),
+        )
+
+        row: int = 0
+        with open(self.index_filename(filename), "w", newline="") as f:
+            f.write("id1,id2,duplicate\r\n")
+            for batch, duplicate in ((duplicates, "1"), (non_dups, "0")):
+                # Views of the numbers of the batch, converted a chunk at
+                # a time.
+                firsts = np.frombuffer(batch.first, dtype=np.uint32)
+                seconds = np.frombuffer(batch.second, dtype=np.uint32)
+                for start in range(0, len(batch), self.chunk_size):
+                    first = firsts[start : start + self.chunk_size].astype(np.intp)
+                    second = seconds[start : start + self.chunk_size].astype(np.intp)
+                    matrix[row : row + len(first)] = similarity_features(
+                        listings, first, second
+                    )
+                    f.write(
+                        "".join(fields[first] + (fields[second] + f"{duplicate}\r\n"))
+                    )
+                    row += len(first)
+
+        matrix.flush()
+        del matrix
+
+    @staticmethod
+    def index_filename(filename: str) -> str:
+        """
+        Return the name of the index file of a feature matrix, e.g.
+        "train.features.index.csv" for "train.features.npy".
+
+        Args:
+            filename (str): The name of the matrix file.
+
+        Returns:
+            str: The name of its index file.
+        """
+        return os.path.splitext(filename)[0] + ".index.csv"
+
+    @property
+    def extension(self) -> str:
+        """
+        Return the extension of the file format that the writer writes.
+
+        Returns:
+            The extension of the file format that the writer writes.
+        """
+        return ".features.npy"
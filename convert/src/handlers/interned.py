@@ -0,0 +1,132 @@
+"""
+Compact pairs of interned IDs.
+
+Each distinct URI is stored once in a `URITable`, which numbers it, and
+pairs are kept as two columns of 32-bit numbers in a `PairBatch`. A
+batch iterates as the `(str, str)` pairs of the `Reader` and `Writer`
+protocols, decoding each pair only when it is consumed, so it can be
+passed to any writer. Writers that only need the records of the pairs,
+such as `DedupeHandler`, can use the numbers directly and never decode
+them.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+
+class URITable:
+    """
+    A table that numbers each distinct URI in order of appearance.
+    """
+
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+        self.uris: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.uris)
+
+    def __getitem__(self, number: int) -> str:
+        return self.uris[number]
+
+    def intern(self, uri: str) -> int:
+        """
+        Return the number of a URI, adding it to the table if it is new.
+
+        Args:
+            uri (str): The URI to intern.
+
+        Returns:
+            int: The number of the URI.
+        """
+        number = self.index.get(uri)
+        if number is None:
+            number = self.index[uri] = len(self.uris)
+            self.uris.append(uri)
+
+        return number
+
+
+class PairBatch:
+    """
+    Pairs of URIs interned in a `URITable`, stored as two `array('I')`
+    columns.
+
+    Iterating a batch yields its pairs as tuples of URIs.
+    """
+
+    def __init__(self, table: URITable) -> None:
+        """
+        Args:
+            table (URITable): The table the URIs of the pairs are
+                interned in. Batches that share a table can be compared
+                by number.
+        """
+        self.table: URITable = table
+        self.first: array = array("I")
+        self.second: array = array("I")
+
+    @classmethod
+    def from_pairs(
+        cls, pairs: Iterable[tuple[str, str]], table: URITable
+    ) -> "PairBatch":
+        """
+        Intern the pairs of a reader into a batch.
+
+        Args:
+            pairs (Iterable[tuple[str, str]]): The pairs to intern.
+            table (URITable): The table to intern the URIs in.
+
+        Returns:
+            PairBatch: The batch of the pairs.
+        """
+        batch = cls(table)
+        for first, second in pairs:
+            batch.add(first, second)
+
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.first)
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        uris = self.table.uris
+        return ((uris[first], uris[second]) for first, second in self.numbers())
+
+    def add(self, first: str, second: str) -> None:
+        """
+        Intern a pair and add it to the batch.
+
+        Args:
+            first (str): The first URI of the pair.
+            second (str): The second URI of the pair.
+        """
+        self.first.append(self.table.intern(first))
+        self.second.append(self.table.intern(second))
+
+    def numbers(self) -> Iterator[tuple[int, int]]:
+        """
+        Iterate the pairs without decoding them.
+
+        Returns:
+            Iterator[tuple[int, int]]: The numbers of the URIs of each
+            pair in the table.
+        """
+        return zip(self.first, self.second)
+
+    def to_numpy(self) -> Any:
+        """
+        Return the pairs as an `(n, 2)` NumPy array of `uint32` numbers.
+
+        Returns:
+            numpy.ndarray: A new array with a row per pair.
+        """
+        import numpy as np
+
+        return np.column_stack(
+            [
+                np.frombuffer(self.first, dtype=np.uint32),
+                np.frombuffer(self.second, dtype=np.uint32),
+            ]
+        )
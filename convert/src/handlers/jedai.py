@@ -1,6 +1,8 @@
 import csv
 from collections.abc import Generator
-from typing import Iterable
+from typing import Iterable, Optional
+
+from .curie import PrefixMap
 
 
 class JedaiHandler:
@@ -12,6 +14,14 @@ class JedaiHandler:
     tuple of duplicate IDs.
     """
 
+    def __init__(self, prefixes: Optional[PrefixMap] = None) -> None:
+        """
+        Args:
+            prefixes (Optional[PrefixMap]): The prefixes to compact the
+                written URIs with, or None to write them in full.
+        """
+        self.prefixes: PrefixMap = prefixes or PrefixMap({})
+
     def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
         """
         Read the duplicate IDs from the file.
@@ -23,8 +33,9 @@ class JedaiHandler:
             tuple[str, str]: The duplicate IDs.
         """
         with open(filename, "r") as f:
+            expand = PrefixMap.read(f).expand
             reader = csv.reader(f)
-            yield from ((row[0], row[1]) for row in reader)
+            yield from ((expand(row[0]), expand(row[1])) for row in reader)
 
     def read_non_dups(self, _: str) -> Generator[tuple[str, str], None, None]:
         """
@@ -48,9 +59,13 @@ class JedaiHandler:
             duplicates (list[tuple[str, str]]): The duplicate IDs.
             non_dups (list[tuple[str, str]]): The non-duplicate IDs.
         """
+        compact = self.prefixes.compact
         with open(filename, "w") as f:
+            f.write(self.prefixes.header())
             writer = csv.writer(f)
-            writer.writerows(duplicates)
+            writer.writerows(
+                (compact(first), compact(second)) for first, second in duplicates
+            )
 
     @property
     def extension(self) -> str:
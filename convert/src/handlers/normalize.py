@@ -0,0 +1,93 @@
+"""
+Normalize the values of the listings of a data file.
+
+These are the typing rules of the records written for dedupe, kept
+apart from `DedupeHandler` so that other handlers parse the data file
+the same way without importing dedupe.
+"""
+
+import math
+import re
+from typing import Any, Final
+
+from unidecode import unidecode
+
+INTEGER_COLUMNS: Final[tuple[str, ...]] = (
+    "age",
+    "bath_amnt",
+    "room_amnt",
+    "garage_amnt",
+    "bed_amnt",
+)
+
+FLOAT_COLUMNS: Final[tuple[str, ...]] = (
+    "total_surface",
+    "covered_surface",
+    "land_surface",
+    "maintenance_fee",
+    "price",
+)
+
+
+def clean(value: str) -> str:
+    """
+    Transliterate, lower-case and trim a value.
+
+    Args:
+        value (str): The value to clean.
+
+    Returns:
+        str: The clean value.
+    """
+    value = unidecode(value)
+    value = re.sub("  +", " ", value)
+    value = re.sub("\n", " ", value)
+    return value.strip().strip('"').strip("'").lower().strip()
+
+
+def parse_value(column: str, value: str) -> Any:
+    """
+    Type a clean value by its column.
+
+    Args:
+        column (str): The name of the column.
+        value (str): The clean value.
+
+    Returns:
+        Any: None for an empty value, a number for a numeric column, a
+        tuple of floats for the coordinates, or the value itself.
+
+    Raises:
+        ValueError: If the value of a numeric column is not a number.
+    """
+    if not value:
+        return None
+
+    if column in INTEGER_COLUMNS:
+        if math.floor(float(value)) == float(value):
+            return int(math.floor(float(value)))
+    elif column in FLOAT_COLUMNS:
+        return "null" if float(value) == float("NaN") else float(value)
+    elif column == "coordinates":
+        return tuple(map(float, value.strip("()").split(",")))
+
+    return value
+
+
+def normalize(row: dict[str, Any]) -> dict[str, Any]:
+    """
+    Clean and type every value of a row of the data file, in place.
+
+    Args:
+        row (dict[str, Any]): The row to normalize.
+
+    Returns:
+        dict[str, Any]: The normalized row.
+
+    Raises:
+        ValueError: If the value of a numeric column is not a number.
+    """
+    for k, v in row.items():
+        row[k] = parse_value(k, clean(v))
+
+    return row
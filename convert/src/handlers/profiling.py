@@ -0,0 +1,395 @@
+"""
+Profile the listings of a data file in a single pass and a fixed amount
+of memory per column.
+
+Each value is cleaned and typed with the rules of `normalize`. For each
+column, the profile counts the empty values and the values that cannot
+be typed, estimates the number of distinct values with a HyperLogLog
+sketch and, for numeric columns, summarizes their distribution with a
+t-digest. The coordinates are summarized as their latitude and
+longitude.
+"""
+
+import bisect
+import csv
+import hashlib
+import math
+from collections.abc import Iterable, Iterator
+from typing import Any, Final, Optional
+
+from .normalize import FLOAT_COLUMNS, INTEGER_COLUMNS, clean, parse_value
+
+QUANTILES: Final[tuple[float, ...]] = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class HyperLogLog:
+    """
+    A HyperLogLog sketch of the number of distinct values of a column.
+
+    Values are hashed into 64 bits as they are added, which is all the
+    profile needs for the cardinality of a column. Unlike the sketches
+    of `metrics`, which are fed precomputed hashes of pairs, it is not
+    shared with other structures.
+    """
+
+    def __init__(self, precision: int = 12) -> None:
+        """
+        Args:
+            precision (int): The number of bits of the hash that select a
+                register. The sketch has 2**precision one-byte registers.
+        """
+        self.precision: int = precision
+        self.registers: bytearray = bytearray(2**precision)
+
+    def add(self, value: str) -> None:
+        """
+        Add a value.
+
+        Args:
+            value (str): The value to add.
+        """
+        hashed = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest())
+        register = hashed >> (64 - self.precision)
+        rest = hashed & (2 ** (64 - self.precision) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    @property
+    def relative_error(self) -> float:
+        """Return the relative standard error of the estimates."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct values added.
+
+        Returns:
+            float: The estimated number of distinct values.
+        """
+        m = len(self.registers)
+        raw = (0.7213 / (1 + 1.079 / m)) * m**2 / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+
+        return raw
+
+
+class TDigest:
+    """
+    A merging t-digest of a distribution of numbers.
+
+    Values are buffered and merged into at most about `compression`
+    centroids, which are smaller near the tails so that extreme
+    quantiles are estimated more accurately than the median.
+    """
+
+    def __init__(self, compression: int = 100) -> None:
+        """
+        Args:
+            compression (int): The number of centroids to keep, which
+                bounds the memory of the digest.
+        """
+        self.compression: int = compression
+        self.means: list[float] = []
+        self.weights: list[float] = []
+        self.buffer: list[float] = []
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: float = math.inf
+        self.max: float = -math.inf
+
+    def add(self, value: float) -> None:
+        """
+        Add a value.
+
+        Args:
+            value (float): The value to add.
+        """
+        self.buffer.append(value)
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self.buffer) >= 5 * self.compression:
+            self._merge()
+
+    def _scale(self, q: float) -> float:
+        """The k1 scale function, which maps a quantile to a centroid index."""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _merge(self) -> None:
+        """Merge the buffered values into the centroids."""
+        if not self.buffer:
+            return
+
+        centroids = sorted(
+            list(zip(self.means, self.weights)) + [(v, 1.0) for v in self.buffer]
+        )
+        self.buffer = []
+        total: float = sum(weight for _, weight in centroids)
+
+        means: list[float] = []
+        weights: list[float] = []
+        mean, weight = centroids[0]
+        seen: float = 0.0
+        limit: float = self._scale(seen / total) + 1
+        for next_mean, next_weight in centroids[1:]:
+            if self._scale(min((seen + weight + next_weight) / total, 1.0)) <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                seen += weight
+                limit = self._scale(seen / total) + 1
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile of the values added.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            Optional[float]: The estimated quantile, or None if no value
+            was added.
+        """
+        self._merge()
+        if not self.count:
+            return None
+
+        # The cumulative weight at the center of each centroid, with the
+        # minimum and the maximum at the ends.
+        centers: list[float] = [0.0]
+        values: list[float] = [self.min]
+        seen: float = 0.0
+        for mean, weight in zip(self.means, self.weights):
+            centers.append(seen + weight / 2)
+            values.append(mean)
+            seen += weight
+        centers.append(seen)
+        values.append(self.max)
+
+        target: float = q * seen
+        i: int = min(max(bisect.bisect_right(centers, target), 1), len(centers) - 1)
+        left, right = centers[i - 1], centers[i]
+        if right == left:
+            return values[i]
+
+        value = values[i - 1] + (values[i] - values[i - 1]) * (target - left) / (
+            right - left
+        )
+        return min(max(value, self.min), self.max)
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Summarize the distribution.
+
+        Returns:
+            dict[str, Any]: The count, minimum, maximum and mean of the
+            values, and their estimated `QUANTILES`.
+        """
+        if not self.count:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count,
+            "quantiles": {str(q): self.quantile(q) for q in QUANTILES},
+        }
+
+
+def column_type(column: str) -> str:
+    """
+    Return the type `normalize` gives the values of a column.
+
+    Args:
+        column (str): The name of the column.
+
+    Returns:
+        str: "integer", "float", "coordinates" or "text".
+    """
+    if column in INTEGER_COLUMNS:
+        return "integer"
+    if column in FLOAT_COLUMNS:
+        return "float"
+    if column == "coordinates":
+        return "coordinates"
+
+    return "text"
+
+
+class ColumnProfile:
+    """
+    The profile of the values of a column.
+    """
+
+    def __init__(
+        self, column: str, precision: int = 12, compression: int = 100
+    ) -> None:
+        """
+        Args:
+            column (str): The name of the column.
+            precision (int): The precision of the HyperLogLog sketch.
+            compression (int): The compression of the t-digests.
+        """
+        self.column: str = column
+        self.type: str = column_type(column)
+        self.rows: int = 0
+        self.nulls: int = 0
+        self.unparseable: int = 0
+        self.distinct: HyperLogLog = HyperLogLog(precision)
+        self.digests: dict[str, TDigest] = {}
+        if self.type == "coordinates":
+            self.digests = {
+                "latitude": TDigest(compression),
+                "longitude": TDigest(compression),
+            }
+        elif self.type != "text":
+            self.digests = {"value": TDigest(compression)}
+
+    def add(self, value: Optional[str]) -> None:
+        """
+        Clean, type and add a value.
+
+        A value cannot be typed if it is not a number in a numeric
+        column, is not a whole number in an integer column, or is not a
+        pair of numbers in the coordinates.
+
+        Args:
+            value (Optional[str]): The raw value, or None if the row is
+                missing it.
+        """
+        self.rows += 1
+        cleaned: str = clean(value or "")
+        if not cleaned:
+            self.nulls += 1
+            return
+
+        self.distinct.add(cleaned)
+        if self.type == "text":
+            return
+
+        try:
+            typed = parse_value(self.column, cleaned)
+        except ValueError:
+            typed = None
+
+        if self.type == "coordinates":
+            numbers = typed if isinstance(typed, tuple) and len(typed) == 2 else ()
+        elif isinstance(typed, (int, float)):
+            numbers = (typed,)
+        else:
+            numbers = ()
+
+        if not numbers or not all(math.isfinite(number) for number in numbers):
+            self.unparseable += 1
+            return
+
+        for digest, number in zip(self.digests.values(), numbers):
+            digest.add(float(number))
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Summarize the profile of the column.
+
+        Returns:
+            dict[str, Any]: The type of the column, the number and rate
+            of empty and unparseable values, the estimated number of
+            distinct values and the summary of each distribution.
+        """
+        summary: dict[str, Any] = {
+            "type": self.type,
+            "nulls": self.nulls,
+            "null_rate": self.nulls / self.rows if self.rows else 0.0,
+            "unparseable": self.unparseable,
+            "unparseable_rate": self.unparseable / self.rows if self.rows else 0.0,
+            "distinct": round(self.distinct.estimate()),
+            "distinct_relative_error": self.distinct.relative_error,
+        }
+        for name, digest in self.digests.items():
+            summary[name] = digest.summary()
+
+        return summary
+
+
+def profile_data(
+    rows: Iterable[dict[str, Optional[str]]],
+    labeled_uris: Optional[set[str]] = None,
+    precision: int = 12,
+    compression: int = 100,
+) -> dict[str, Any]:
+    """
+    Profile the rows of a data file in a single pass.
+
+    Args:
+        rows (Iterable[dict[str, Optional[str]]]): The rows, such as
+            those of a `csv.DictReader`, which have every column.
+        labeled_uris (Optional[set[str]]): The URIs referenced by the
+            labels, or None to not compare the rows with them.
+        precision (int): The precision of the HyperLogLog sketches.
+        compression (int): The compression of the t-digests.
+
+    Returns:
+        dict[str, Any]: The number of rows, the summary of each column
+        and, given the labeled URIs, the number of rows they do not
+        reference and of labeled URIs without a row.
+    """
+    columns: dict[str, ColumnProfile] = {}
+    count: int = 0
+    unreferenced: int = 0
+    found: set[str] = set()
+    for row in rows:
+        count += 1
+        for column, value in row.items():
+            if column is None:
+                continue
+            if column not in columns:
+                columns[column] = ColumnProfile(column, precision, compression)
+            columns[column].add(value)
+
+        if labeled_uris is not None:
+            uri = row.get("uri")
+            if uri in labeled_uris:
+                found.add(uri)
+            else:
+                unreferenced += 1
+
+    profile: dict[str, Any] = {"rows": count}
+    if labeled_uris is not None:
+        profile["labels"] = {
+            "uris": len(labeled_uris),
+            "unreferenced_rows": unreferenced,
+            "unreferenced_rate": unreferenced / count if count else 0.0,
+            "missing_uris": len(labeled_uris) - len(found),
+        }
+    profile["columns"] = {
+        column: columns[column].summary() for column in sorted(columns)
+    }
+    return profile
+
+
+def read_cluster_uris(filename: str) -> Iterator[str]:
+    """
+    Read the URIs of a labels file of clusters of duplicates, one per
+    line with its URIs separated by ";", like the input of `gt.py`.
+
+    Args:
+        filename (str): The name of the labels file.
+
+    Yields:
+        str: Each URI of each cluster.
+    """
+    with open(filename, "r") as f:
+        for row in csv.reader(f):
+            if row:
+                yield from row[0].split(";")
@@ -0,0 +1,195 @@
+"""
+A registry of handlers that imports each handler only when it is used.
+
+Built-in handlers are declared by the module and class that implement
+them. Third-party handlers are discovered through the
+`er_evaluation.handlers` entry point group, e.g. in a `pyproject.toml`:
+
+    [project.entry-points."er_evaluation.handlers"]
+    mytool = "mypackage.handler:MyToolHandler"
+
+A third-party handler may declare its capabilities with a `capabilities`
+class attribute holding a `Capabilities` instance.
+"""
+
+import importlib
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Final, Optional
+
+ENTRY_POINT_GROUP: Final[str] = "er_evaluation.handlers"
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """
+    What a handler can do, known without importing it.
+
+    Attributes:
+        streaming: Whether the handler reads and writes pairs one at a
+            time, without holding the whole input in memory.
+        reads_non_duplicates: Whether the format the handler reads
+            carries non-duplicate pairs.
+        writes_non_duplicates: Whether the format the handler writes
+            carries non-duplicate pairs.
+        reads_datafile: Whether the handler is created with the data
+            file, as a `datafile` keyword argument, to read its input.
+        compacts_uris: Whether the handler can be created with a
+            `prefixes` keyword argument to write compacted URIs.
+        named_runs: Whether the handler is created with a `run` keyword
+            argument, naming the run of the file it reads and writes.
+        appends: Whether the handler adds to an existing output file
+            instead of requiring a new one.
+    """
+
+    streaming: bool = False
+    reads_non_duplicates: bool = False
+    writes_non_duplicates: bool = False
+    reads_datafile: bool = False
+    compacts_uris: bool = False
+    named_runs: bool = False
+    appends: bool = False
+
+
+@dataclass(frozen=True)
+class HandlerSpec:
+    """
+    The declaration of a handler.
+
+    Attributes:
+        target: The handler class, as "module:Class". Modules starting
+            with a dot are relative to the `handlers` package.
+        capabilities: The capabilities of the handler, or None to read
+            them from the class once it is imported.
+    """
+
+    target: str
+    capabilities: Optional[Capabilities] = None
+
+
+BUILTIN_HANDLERS: Final[dict[str, HandlerSpec]] = {
+    "duke": HandlerSpec(
+        ".duke:DukeHandler",
+        Capabilities(
+            streaming=True,
+            reads_non_duplicates=True,
+            writes_non_duplicates=True,
+            compacts_uris=True,
+        ),
+    ),
+    "dedupe": HandlerSpec(
+        ".dedupe:DedupeHandler",
+        Capabilities(writes_non_duplicates=True),
+    ),
+    "dedupe-json": HandlerSpec(
+        ".training:DedupeTrainingHandler",
+        Capabilities(
+            reads_non_duplicates=True,
+            writes_non_duplicates=True,
+            reads_datafile=True,
+        ),
+    ),
+    "jedai": HandlerSpec(
+        ".jedai:JedaiHandler", Capabilities(streaming=True, compacts_uris=True)
+    ),
+    "cluster": HandlerSpec(
+        ".cluster:ClusterHandler", Capabilities(streaming=True, compacts_uris=True)
+    ),
+    "features": HandlerSpec(
+        ".features:FeatureHandler",
+        Capabilities(reads_non_duplicates=True, writes_non_duplicates=True),
+    ),
+    "sqlite": HandlerSpec(
+        ".sqlite:SQLiteHandler",
+        Capabilities(
+            streaming=True,
+            reads_non_duplicates=True,
+            writes_non_duplicates=True,
+            named_runs=True,
+            appends=True,
+        ),
+    ),
+}
+
+
+class HandlerRegistry(Mapping[str, type]):
+    """
+    A mapping from handler names to handler classes, which imports each
+    handler the first time it is looked up.
+    """
+
+    def __init__(
+        self,
+        specs: Mapping[str, HandlerSpec] = BUILTIN_HANDLERS,
+        group: Optional[str] = ENTRY_POINT_GROUP,
+    ) -> None:
+        """
+        Args:
+            specs: The built-in handlers.
+            group: The entry point group to discover third-party
+                handlers in, or None to only use the built-in ones.
+        """
+        self.specs: dict[str, HandlerSpec] = dict(specs)
+        self.group: Optional[str] = group
+        self.loaded: dict[str, type] = {}
+        self.discovered: bool = group is None
+
+    def register(self, name: str, spec: HandlerSpec) -> None:
+        """
+        Register a handler, replacing any handler with the same name.
+
+        Args:
+            name: The name to select the handler by.
+            spec: The declaration of the handler.
+        """
+        self.specs[name] = spec
+        self.loaded.pop(name, None)
+
+    def capabilities(self, name: str) -> Capabilities:
+        """
+        Return the capabilities of a handler, importing it only if they
+        are not declared in its spec.
+
+        Args:
+            name: The name of the handler.
+
+        Returns:
+            The capabilities of the handler.
+        """
+        self._discover()
+        capabilities = self.specs[name].capabilities
+        if capabilities is None:
+            capabilities = getattr(self[name], "capabilities", Capabilities())
+
+        return capabilities
+
+    def __getitem__(self, name: str) -> type:
+        if name not in self.loaded:
+            self._discover()
+            module, _, attr = self.specs[name].target.partition(":")
+            self.loaded[name] = getattr(
+                importlib.import_module(module, __package__), attr
+            )
+
+        return self.loaded[name]
+
+    def __iter__(self) -> Iterator[str]:
+        self._discover()
+        return iter(self.specs)
+
+    def __len__(self) -> int:
+        self._discover()
+        return len(self.specs)
+
+    def _discover(self) -> None:
+        """
+        Add the handlers of the entry point group, without importing
+        them. Built-in handlers take precedence over third-party ones.
+        """
+        if self.discovered:
+            return
+
+        self.discovered = True
+        for entry_point in entry_points(group=self.group):
+            self.specs.setdefault(entry_point.name, HandlerSpec(entry_point.value))
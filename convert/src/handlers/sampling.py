@@ -0,0 +1,334 @@
+"""
+Sample a capped, balanced training set out of labeled pairs.
+
+Pairs are read once. Distincts keep a uniform reservoir per pair of
+source sites, and their budget is shared evenly among the site pairs.
+Matches are linked into clusters, each with a uniform sample of its
+pairs, which are merged when their clusters are. The samples of all the
+clusters hold at most the budget of matches together, evening out their
+sizes as `share` does. Then the whole budget of matches is taken in
+turns from every cluster, so that large
+clusters, with their quadratic number of pairs, do not crowd out the
+small ones, and the pairs of each turn are taken in turns from each
+site pair.
+"""
+
+import collections
+import heapq
+import itertools
+import random
+import re
+from collections.abc import Iterable
+from typing import Any
+
+from .cluster import UnionFind
+
+# The reservoirs are keyed by the sites matched in the URIs of a pair.
+SITE: re.Pattern = re.compile(r"listing_(site\d+)_")
+
+
+def site_pair(pair: tuple[str, str]) -> str:
+    """
+    Return the sorted source sites of the listings of a pair.
+
+    Args:
+        pair (tuple[str, str]): The URIs of the pair.
+
+    Returns:
+        str: The sites joined by "-", such as "site1-site3". Sites that
+        cannot be told from a URI are "unknown".
+    """
+    sites = [
+        match.group(1) if (match := SITE.search(uri)) else "unknown" for uri in pair
+    ]
+    return "-".join(sorted(sites))
+
+
+class Reservoir:
+    """
+    A uniform sample of a fixed size of a stream of items (Algorithm R).
+    """
+
+    def __init__(self, size: int, rng: random.Random) -> None:
+        """
+        Args:
+            size (int): The maximum number of items to keep.
+            rng (random.Random): The source of randomness.
+        """
+        self.size: int = size
+        self.rng: random.Random = rng
+        self.seen: int = 0
+        self.items: list[Any] = []
+
+    def add(self, item: Any) -> None:
+        """
+        Offer an item to the sample.
+
+        Args:
+            item (Any): The item.
+        """
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        else:
+            slot = self.rng.randrange(self.seen)
+            if slot < self.size:
+                self.items[slot] = item
+
+
+class ClusterSamples:
+    """
+    Uniform samples of the pairs of each cluster, holding at most a
+    fixed number of pairs in total.
+
+    Each pair gets a random priority, and the sample of a cluster is
+    every pair of it below a threshold, which starts at 1. When there
+    are too many pairs, the one with the highest priority of the largest
+    sample is dropped and lowers the threshold of its cluster, so that
+    small clusters keep their pairs while large ones share the rest.
+    """
+
+    def __init__(self, size: int, rng: random.Random) -> None:
+        """
+        Args:
+            size (int): The maximum number of pairs to keep.
+            rng (random.Random): The source of randomness.
+        """
+        self.size: int = size
+        self.rng: random.Random = rng
+        self.kept: int = 0
+        # The pairs of each cluster, in a heap by decreasing priority.
+        self.samples: dict[int, list[tuple[float, tuple[str, str]]]] = {}
+        self.thresholds: dict[int, float] = {}
+        # The samples by decreasing size and priority, with stale entries
+        # that are skipped.
+        self.largest: list[tuple[int, float, int]] = []
+
+    def add(self, root: int, pair: tuple[str, str]) -> None:
+        """
+        Offer a pair to the sample of its cluster.
+
+        Args:
+            root (int): The root of the cluster.
+            pair (tuple[str, str]): The pair.
+        """
+        priority: float = self.rng.random()
+        if priority >= self.thresholds.get(root, 1.0):
+            return
+
+        heapq.heappush(self.samples.setdefault(root, []), (-priority, pair))
+        self.kept += 1
+        self._push(root)
+        if self.kept > self.size:
+            self._drop()
+
+    def merge(self, first: int, second: int, root: int) -> None:
+        """
+        Merge the samples of two clusters into the one of their union,
+        keeping the pairs below the lower of their thresholds.
+
+        Args:
+            first (int): The root of a cluster.
+            second (int): The root of the other cluster, which may be
+                the same.
+            root (int): The root of their union.
+        """
+        roots: set[int] = {first, second}
+        sample = [item for r in roots for item in self.samples.pop(r, [])]
+        threshold = min(self.thresholds.pop(r, 1.0) for r in roots)
+        if threshold < 1.0:
+            self.thresholds[root] = threshold
+            kept = [item for item in sample if -item[0] < threshold]
+            self.kept -= len(sample) - len(kept)
+            sample = kept
+
+        if sample:
+            heapq.heapify(sample)
+            self.samples[root] = sample
+            self._push(root)
+
+    def clusters(self) -> list[list[tuple[str, str]]]:
+        """
+        Returns:
+            list[list[tuple[str, str]]]: The sample of each cluster, by
+            the root of the cluster.
+        """
+        return [
+            [pair for _, pair in self.samples[root]] for root in sorted(self.samples)
+        ]
+
+    def _push(self, root: int) -> None:
+        sample = self.samples[root]
+        heapq.heappush(self.largest, (-len(sample), sample[0][0], root))
+        if len(self.largest) > 2 * len(self.samples) + 64:
+            self.largest = [
+                (-len(items), items[0][0], r) for r, items in self.samples.items()
+            ]
+            heapq.heapify(self.largest)
+
+    def _drop(self) -> None:
+        while True:
+            size, priority, root = heapq.heappop(self.largest)
+            sample = self.samples.get(root)
+            if sample and (-len(sample), sample[0][0]) == (size, priority):
+                break
+
+        self.thresholds[root] = -heapq.heappop(sample)[0]
+        self.kept -= 1
+        if sample:
+            self._push(root)
+        else:
+            del self.samples[root]
+
+
+def share(sizes: dict[str, int], budget: int) -> dict[str, int]:
+    """
+    Share a budget evenly among strata, giving what small strata cannot
+    use to the larger ones.
+
+    Args:
+        sizes (dict[str, int]): The number of items of each stratum.
+        budget (int): The total number of items to take.
+
+    Returns:
+        dict[str, int]: The number of items to take from each stratum.
+    """
+    quotas: dict[str, int] = {}
+    strata = sorted(sizes, key=lambda stratum: (sizes[stratum], stratum))
+    for position, stratum in enumerate(strata):
+        quotas[stratum] = min(sizes[stratum], budget // (len(strata) - position))
+        budget -= quotas[stratum]
+
+    return quotas
+
+
+def sample_training_pairs(
+    duplicates: Iterable[tuple[str, str]],
+    non_dups: Iterable[tuple[str, str]],
+    max_pairs: int,
+    match_ratio: float = 0.5,
+    seed: int = 0,
+) -> tuple[list[tuple[str, str]], list[tuple[str, str]], dict[str, Any]]:
+    """
+    Sample at most `max_pairs` pairs, `match_ratio` of them matches,
+    stratified by cluster and site pair for matches, and by site pair
+    for distincts.
+
+    Memory holds a reservoir of the budget of distincts for each site
+    pair, the budget of matches across all the clusters, and the
+    union-find of the URIs of the matches with a threshold per cluster.
+
+    Args:
+        duplicates (Iterable[tuple[str, str]]): The matches.
+        non_dups (Iterable[tuple[str, str]]): The distincts.
+        max_pairs (int): The maximum size of the training set.
+        match_ratio (float): The fraction of the training set given to
+            matches. Neither kind takes the unused budget of the other,
+            so the balance holds even when a kind has too few pairs.
+        seed (int): The seed of the sample.
+
+    Returns:
+        tuple: The sampled matches and distincts, and the statistics of
+        the sample, with the number of pairs seen and kept of each kind
+        and site pair.
+
+    Raises:
+        ValueError: If `match_ratio` is not between 0 and 1.
+    """
+    if not 0 <= match_ratio <= 1:
+        raise ValueError(f"The match ratio must be between 0 and 1: {match_ratio}")
+
+    rng = random.Random(seed)
+    budgets: dict[str, int] = {"match": round(max_pairs * match_ratio)}
+    budgets["distinct"] = max_pairs - budgets["match"]
+
+    forest = UnionFind()
+    clusters = ClusterSamples(budgets["match"], rng)
+    seen: collections.Counter = collections.Counter()
+    for pair in duplicates:
+        seen[site_pair(pair)] += 1
+        first, second = forest.find(forest.add(pair[0])), forest.find(
+            forest.add(pair[1])
+        )
+        root = forest.union(*pair)
+        clusters.merge(first, second, root)
+        clusters.add(root, pair)
+
+    strata: dict[str, Reservoir] = {}
+    for pair in non_dups:
+        stratum = site_pair(pair)
+        if stratum not in strata:
+            strata[stratum] = Reservoir(budgets["distinct"], rng)
+        strata[stratum].add(pair)
+
+    stats: dict[str, Any] = {
+        "seed": seed,
+        "max_pairs": max_pairs,
+        "match_ratio": match_ratio,
+    }
+
+    matches = _by_cluster_turns(clusters.clusters(), rng)[: budgets["match"]]
+    kept: collections.Counter = collections.Counter(map(site_pair, matches))
+    stats["match"] = {
+        "seen": sum(seen.values()),
+        "kept": len(matches),
+        "strata": {
+            stratum: {"seen": seen[stratum], "kept": kept[stratum]}
+            for stratum in sorted(seen)
+        },
+        "clusters": len({forest.find(forest.index[pair[0]]) for pair in matches}),
+    }
+
+    quotas = share(
+        {stratum: len(reservoir.items) for stratum, reservoir in strata.items()},
+        budgets["distinct"],
+    )
+    distincts: list[tuple[str, str]] = []
+    stats["distinct"] = {"seen": 0, "kept": 0, "strata": {}}
+    for stratum, reservoir in sorted(strata.items()):
+        items = reservoir.items
+        rng.shuffle(items)
+        distincts.extend(items[: quotas[stratum]])
+        stats["distinct"]["strata"][stratum] = {
+            "seen": reservoir.seen,
+            "kept": quotas[stratum],
+        }
+        stats["distinct"]["seen"] += reservoir.seen
+        stats["distinct"]["kept"] += quotas[stratum]
+
+    return matches, distincts, stats
+
+
+def _by_cluster_turns(
+    clusters: list[list[tuple[str, str]]], rng: random.Random
+) -> list[tuple[str, str]]:
+    """
+    Order matches so that each cluster gives one before any gives two,
+    and each turn takes its matches in turns from each site pair.
+    """
+    ranked: list[tuple[int, int, int, tuple[str, str]]] = []
+    rng.shuffle(clusters)
+    for position, pairs in enumerate(clusters):
+        rng.shuffle(pairs)
+        # The pairs of a cluster, in turns from each of its site pairs.
+        by_site: dict[str, list[tuple[str, str]]] = {}
+        for pair in pairs:
+            by_site.setdefault(site_pair(pair), []).append(pair)
+        ranked.extend(
+            (turn, 0, position, pair)
+            for turn, pair in enumerate(
+                pair
+                for pairs in itertools.zip_longest(*by_site.values())
+                for pair in pairs
+                if pair is not None
+            )
+        )
+
+    ranked.sort()
+    turns: collections.Counter = collections.Counter()
+    for i, (turn, _, position, pair) in enumerate(ranked):
+        stratum = site_pair(pair)
+        ranked[i] = (turn, turns[turn, stratum], position, pair)
+        turns[turn, stratum] += 1
+
+    return [pair for *_, pair in sorted(ranked)]
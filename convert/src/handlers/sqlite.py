@@ -0,0 +1,294 @@
+import csv
+import sqlite3
+from collections.abc import Generator, Iterable
+from typing import Any
+
+from .canonical import order_pairs
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS pairs (
+    run TEXT NOT NULL,
+    id1 TEXT NOT NULL,
+    id2 TEXT NOT NULL,
+    duplicate INTEGER NOT NULL,
+    PRIMARY KEY (run, duplicate, id1, id2)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS pairs_by_ids ON pairs (id1, id2);
+"""
+
+
+def quote(identifier: str) -> str:
+    """
+    Quote an SQL identifier, such as a column name taken from a CSV
+    header.
+
+    Args:
+        identifier (str): The identifier to quote.
+
+    Returns:
+        str: The quoted identifier.
+    """
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class SQLiteStore:
+    """
+    A SQLite database of labeled pairs, matcher outputs and listings.
+
+    Every pair belongs to a run, which is a name such as "labels" or
+    "duke-2024-02-21", and is flagged as either a duplicate or a
+    non-duplicate. Pairs are stored with their smallest ID first.
+    Listings are stored in the `records` table, with one column per
+    column of the datafile.
+    """
+
+    def __init__(self, filename: str) -> None:
+        """
+        Open (and create, if needed) the database.
+
+        Args:
+            filename (str): The path to the database file.
+        """
+        self.connection: sqlite3.Connection = sqlite3.connect(filename)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "SQLiteStore":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        self.connection.close()
+
+    def add_pairs(
+        self, run: str, pairs: Iterable[tuple[str, str]], duplicate: bool = True
+    ) -> None:
+        """
+        Insert pairs into a run in a single transaction.
+
+        Args:
+            run (str): The name of the run.
+            pairs (Iterable[tuple[str, str]]): The pairs to insert.
+            duplicate (bool): Whether the pairs are duplicates.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO pairs (run, id1, id2, duplicate) "
+                "VALUES (?, ?, ?, ?)",
+                ((run, id1, id2, int(duplicate)) for id1, id2 in order_pairs(pairs)),
+            )
+
+    def pairs(
+        self, run: str, duplicate: bool = True
+    ) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the pairs of a run.
+
+        Args:
+            run (str): The name of the run.
+            duplicate (bool): Whether to read the duplicates or the
+                non-duplicates.
+
+        Yields:
+            tuple[str, str]: A pair of IDs.
+        """
+        yield from self.connection.execute(
+            "SELECT id1, id2 FROM pairs WHERE run = ? AND duplicate = ?",
+            (run, int(duplicate)),
+        )
+
+    def runs(self) -> list[str]:
+        """
+        Return the names of the runs in the database.
+
+        Returns:
+            list[str]: The sorted names of the runs.
+        """
+        return [
+            run
+            for (run,) in self.connection.execute(
+                "SELECT DISTINCT run FROM pairs ORDER BY run"
+            )
+        ]
+
+    def runs_with(self, id1: str, id2: str, duplicate: bool = True) -> list[str]:
+        """
+        Return the runs that contain a pair.
+
+        Args:
+            id1 (str): An ID of the pair.
+            id2 (str): The other ID of the pair.
+            duplicate (bool): Whether to look for the pair among the
+                duplicates or the non-duplicates.
+
+        Returns:
+            list[str]: The sorted names of the runs that contain the pair.
+        """
+        id1, id2 = min(id1, id2), max(id1, id2)
+        return [
+            run
+            for (run,) in self.connection.execute(
+                "SELECT run FROM pairs WHERE id1 = ? AND id2 = ? AND duplicate = ? "
+                "ORDER BY run",
+                (id1, id2, int(duplicate)),
+            )
+        ]
+
+    def load_records(self, datafile: str) -> None:
+        """
+        Load the listings of a datafile into the `records` table.
+
+        The table is created with the columns of the first datafile
+        loaded. Empty values are stored as NULL, and numeric values are
+        stored as numbers. Listings already in the table are kept, so
+        only the missing ones are inserted.
+
+        Args:
+            datafile (str): The path to a CSV file with a `uri` column.
+
+        Raises:
+            ValueError: If the columns of the datafile differ from the
+                ones of the `records` table.
+        """
+        with open(datafile, "r") as f:
+            reader = csv.DictReader(f)
+            assert reader.fieldnames
+            columns: list[str] = list(reader.fieldnames)
+
+            existing: list[str] = [
+                name
+                for _, name, *_ in self.connection.execute("PRAGMA table_info(records)")
+            ]
+            if existing and sorted(existing) != sorted(columns):
+                raise ValueError(
+                    f"The columns of {datafile} do not match the records table: "
+                    f"{columns} != {existing}"
+                )
+
+            with self.connection:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS records (uri TEXT PRIMARY KEY, "
+                    + ", ".join(
+                        f"{quote(column)} NUMERIC"
+                        for column in columns
+                        if column != "uri"
+                    )
+                    + ")"
+                )
+                self.connection.executemany(
+                    f"INSERT OR IGNORE INTO records ({', '.join(map(quote, columns))}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    (
+                        [row[column].strip() or None for column in columns]
+                        for row in reader
+                    ),
+                )
+
+    def pairs_with_records(
+        self, run: str, duplicate: bool = True
+    ) -> Generator[tuple[dict[str, Any], dict[str, Any]], None, None]:
+        """
+        Read the pairs of a run joined with the listings of both IDs.
+
+        Pairs whose IDs are not in the `records` table are skipped.
+
+        Args:
+            run (str): The name of the run.
+            duplicate (bool): Whether to read the duplicates or the
+                non-duplicates.
+
+        Yields:
+            tuple[dict[str, Any], dict[str, Any]]: The records of both
+                IDs of a pair.
+        """
+        cursor: sqlite3.Cursor = self.connection.execute(
+            "SELECT r1.*, r2.* FROM pairs "
+            "JOIN records AS r1 ON r1.uri = pairs.id1 "
+            "JOIN records AS r2 ON r2.uri = pairs.id2 "
+            "WHERE pairs.run = ? AND pairs.duplicate = ?",
+            (run, int(duplicate)),
+        )
+        columns: list[str] = [description[0] for description in cursor.description]
+        width: int = len(columns) // 2
+        for row in cursor:
+            yield (
+                dict(zip(columns[:width], row[:width])),
+                dict(zip(columns[width:], row[width:])),
+            )
+
+
+class SQLiteHandler:
+    """
+    Handler for SQLite databases of labeled pairs, matcher outputs and
+    listings.
+
+    Each handler reads and writes a single run of the database. Writing
+    to an existing database adds the run to it, next to the other runs.
+    """
+
+    def __init__(self, run: str = "default") -> None:
+        """
+        Args:
+            run (str): The name of the run to read from and write to.
+        """
+        self.run: str = run
+
+    def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the duplicates of the run from the database.
+
+        Args:
+            filename (str): The path to the database.
+
+        Yields:
+            tuple[str, str]: A tuple of duplicate IDs.
+        """
+        with SQLiteStore(filename) as store:
+            yield from store.pairs(self.run, duplicate=True)
+
+    def read_non_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the non-duplicates of the run from the database.
+
+        Args:
+            filename (str): The path to the database.
+
+        Yields:
+            tuple[str, str]: A tuple of non-duplicate IDs.
+        """
+        with SQLiteStore(filename) as store:
+            yield from store.pairs(self.run, duplicate=False)
+
+    def write(
+        self,
+        filename: str,
+        datafile: str,
+        duplicates: Iterable[tuple[str, str]],
+        non_dups: Iterable[tuple[str, str]],
+    ) -> None:
+        """
+        Write the (non-)duplicates and the listings to the database.
+
+        Args:
+            filename (str): The path to the database.
+            datafile (str): The path to the data file.
+            duplicates (Iterable[tuple[str, str]]): The duplicate IDs.
+            non_dups (Iterable[tuple[str, str]]): The non-duplicate IDs.
+        """
+        with SQLiteStore(filename) as store:
+            store.load_records(datafile)
+            store.add_pairs(self.run, duplicates, duplicate=True)
+            store.add_pairs(self.run, non_dups, duplicate=False)
+
+    @property
+    def extension(self) -> str:
+        """
+        Return the extension of the file format that the writer writes.
+
+        Returns:
+            The extension of the file format that the writer writes.
+        """
+        return ".sqlite"
@@ -0,0 +1,272 @@
+"""
+Read dedupe's training JSON incrementally.
+
+A training file has a `match` and a `distinct` array of pairs of
+records. The arrays are parsed one pair at a time from a sliding
+buffer, so memory is bounded by the largest pair rather than by the
+size of the file. The matches and the distincts are read in a single
+parse of the file, and the pairs of an array that is reached before it
+is read are kept as URIs until then.
+"""
+
+import collections
+import csv
+import json
+import re
+from collections.abc import Generator, Iterator
+from typing import IO, Any, Optional
+
+from .dedupe import DedupeHandler
+
+# The end of a text that may be a number or a literal cut by the end of a
+# chunk, such as "-1." or "tru".
+TOKEN: re.Pattern = re.compile(r"[\w.+-]*\s*")
+
+
+def _incomplete(error: json.JSONDecodeError) -> bool:
+    """Return whether a decoding error may be fixed by reading on."""
+    if error.msg.startswith("Unterminated string"):
+        return True
+
+    return TOKEN.fullmatch(error.doc, error.pos) is not None
+
+
+def _from_json(json_object: dict[str, Any]) -> Any:
+    """Decode the tuples and frozensets hinted by dedupe's encoder."""
+    if json_object.get("__class__") == "tuple":
+        return tuple(json_object["__value__"])
+    if json_object.get("__class__") == "frozenset":
+        return frozenset(json_object["__value__"])
+
+    return json_object
+
+
+class _Buffer:
+    """A window over a JSON text file, refilled as values are decoded."""
+
+    WHITESPACE: str = " \t\n\r"
+
+    def __init__(self, file: IO[str], chunk_size: int) -> None:
+        self.file: IO[str] = file
+        self.chunk_size: int = chunk_size
+        self.decoder: json.JSONDecoder = json.JSONDecoder(object_hook=_from_json)
+        self.text: str = ""
+        self.position: int = 0
+
+    def fill(self) -> bool:
+        """Drop the consumed text and read another chunk."""
+        chunk: str = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+
+        self.text = self.text[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character."""
+        while True:
+            while (
+                self.position < len(self.text)
+                and self.text[self.position] in self.WHITESPACE
+            ):
+                self.position += 1
+
+            if self.position < len(self.text):
+                return self.text[self.position]
+
+            if not self.fill():
+                raise ValueError("Unexpected end of the training file")
+
+    def expect(self, char: str) -> None:
+        """Consume the next character, which must be `char`."""
+        if self.peek() != char:
+            raise ValueError(
+                f"Expected {char!r} in the training file, found {self.peek()!r}"
+            )
+
+        self.position += 1
+
+    def decode(self) -> Any:
+        """Decode the next JSON value, reading as much as it needs."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.position)
+            except json.JSONDecodeError as error:
+                # Only a value cut by the end of the text can be completed,
+                # so other errors are raised without reading the rest.
+                if not _incomplete(error) or not self.fill():
+                    raise
+                continue
+
+            # A number may continue in the next chunk.
+            if end == len(self.text) and self.fill():
+                continue
+
+            self.position = end
+            return value
+
+
+def iter_training_pairs(
+    filename: str, chunk_size: int = 2**16
+) -> Generator[tuple[str, Any], None, None]:
+    """
+    Parse the arrays of a training file one item at a time.
+
+    Args:
+        filename (str): The name of the training file.
+        chunk_size (int): The number of characters read at a time.
+
+    Yields:
+        tuple[str, Any]: The key of the array, such as "match" or
+        "distinct", and each of its items, with dedupe's hinted tuples
+        decoded.
+
+    Raises:
+        ValueError: If the file is not a JSON object, as soon as the
+            error is found.
+    """
+    with open(filename, "r") as f:
+        buffer = _Buffer(f, chunk_size)
+        buffer.expect("{")
+        while buffer.peek() != "}":
+            key: str = buffer.decode()
+            buffer.expect(":")
+            if buffer.peek() == "[":
+                buffer.expect("[")
+                while buffer.peek() != "]":
+                    yield key, buffer.decode()
+                    if buffer.peek() == ",":
+                        buffer.expect(",")
+                buffer.expect("]")
+            else:
+                buffer.decode()
+
+            if buffer.peek() == ",":
+                buffer.expect(",")
+
+
+class _TrainingPairs:
+    """
+    A parse of a training file shared by the readers of its arrays.
+
+    Each reader takes the pairs of its array, and the pairs of the
+    other arrays it parses on the way are queued for their readers. A
+    reader stops once its array is closed, since the keys of a JSON
+    object are unique.
+    """
+
+    def __init__(self, filename: str, uris: dict[str, str]) -> None:
+        self.items: Iterator[tuple[str, Any]] = iter_training_pairs(filename)
+        self.uris: dict[str, str] = uris
+        self.queues: dict[str, collections.deque] = collections.defaultdict(
+            collections.deque
+        )
+        self.closed: set[str] = set()
+        self.key: Optional[str] = None
+        self.started: set[str] = set()
+
+    def read(self, kind: str) -> Iterator[tuple[str, str]]:
+        """Yield the pairs of URIs of an array, such as "match"."""
+        self.started.add(kind)
+        queue: collections.deque = self.queues[kind]
+        while True:
+            if queue:
+                yield queue.popleft()
+                continue
+            if kind in self.closed:
+                return
+
+            item = next(self.items, None)
+            if item is None:
+                self.closed.update(self.queues)
+                return
+
+            key, (first, second) = item
+            if key != self.key and self.key is not None:
+                self.closed.add(self.key)
+            self.key = key
+            self.queues[key].append(
+                (
+                    self.uris.get(first["uri"], first["uri"]),
+                    self.uris.get(second["uri"], second["uri"]),
+                )
+            )
+
+
+class DedupeTrainingHandler(DedupeHandler):
+    """
+    Handler for dedupe's training JSON, which reads the pairs of its
+    `match` and `distinct` arrays and writes like `DedupeHandler`.
+
+    The records of the training data are normalized, so their `uri` is
+    lower-cased. Given the data file, the original URIs are restored.
+    Reading the matches and then the distincts of a file, or the other
+    way around, parses it once.
+    """
+
+    def __init__(self, datafile: Optional[str] = None, **options: Any) -> None:
+        """
+        Args:
+            datafile (Optional[str]): The data file to restore the URIs
+                of the records from, or None to keep them as they are.
+            options: The options of `DedupeHandler`.
+        """
+        super().__init__(**options)
+        self.datafile: Optional[str] = datafile
+        self.uris: Optional[dict[str, str]] = None
+        self.parses: dict[str, _TrainingPairs] = {}
+
+    def read_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the matches of a training file.
+
+        Args:
+            filename (str): The name of the file to read from.
+
+        Yields:
+            tuple[str, str]: A tuple of duplicate URIs.
+        """
+        yield from self._read_pairs(filename, "match")
+
+    def read_non_dups(self, filename: str) -> Generator[tuple[str, str], None, None]:
+        """
+        Read the distincts of a training file.
+
+        Args:
+            filename (str): The name of the file to read from.
+
+        Yields:
+            tuple[str, str]: A tuple of non-duplicate URIs.
+        """
+        yield from self._read_pairs(filename, "distinct")
+
+    def _read_pairs(self, filename: str, kind: str) -> Iterator[tuple[str, str]]:
+        # A parse is shared by one reader of each array, so reading an
+        # array again parses the file again.
+        parse: Optional[_TrainingPairs] = self.parses.get(filename)
+        if parse is None or kind in parse.started:
+            parse = self.parses[filename] = _TrainingPairs(
+                filename, self.original_uris()
+            )
+
+        yield from parse.read(kind)
+
+    def original_uris(self) -> dict[str, str]:
+        """
+        Map the normalized URIs of the data file to the original ones.
+
+        Returns:
+            dict[str, str]: The original URI of each normalized URI, or
+            an empty mapping if there is no data file.
+        """
+        if self.uris is None:
+            self.uris = {}
+            if self.datafile is not None:
+                with open(self.datafile, "r") as f:
+                    for row in csv.DictReader(f):
+                        uri: str = row["uri"]
+                        self.uris[self.normalize({"uri": uri})["uri"]] = uri
+
+        return self.uris
@@ -0,0 +1,103 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from convert.src.handlers import canonical
+from convert.src.handlers.canonical import (
+    CanonicalReader,
+    CSVPairReader,
+    order_pairs,
+    parse_size,
+    sort_unique,
+)
+
+
+class ListReader:
+    """A reader of pairs held in lists."""
+
+    def __init__(self, dups, non_dups):
+        self.dups, self.non_dups = dups, non_dups
+
+    def read_dups(self, _):
+        yield from self.dups
+
+    def read_non_dups(self, _):
+        yield from self.non_dups
+
+
+class TestCanonicalization(unittest.TestCase):
+    """Test the canonicalization of pairs."""
+
+    def test_parse_size(self):
+        """Test that memory sizes are parsed with their units."""
+        self.assertEqual(parse_size("512"), 512)
+        self.assertEqual(parse_size("64k"), 64 * 2**10)
+        self.assertEqual(parse_size("1G"), 2**30)
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+    def test_order_pairs(self):
+        """Test that pairs are ordered and self-links dropped."""
+        self.assertEqual(
+            list(order_pairs([("b", "a"), ("a", "b"), ("c", "c")])),
+            [("a", "b"), ("a", "b")],
+        )
+
+    def test_sort_unique_spills_to_disk(self):
+        """Test that the external sort matches an in-memory sort."""
+        pairs = [
+            (f"{random.randrange(50)}", f"{random.randrange(50)}") for _ in range(2000)
+        ]
+
+        self.assertEqual(list(sort_unique(pairs, memory=1024)), sorted(set(pairs)))
+
+    def test_sort_unique_merges_in_passes(self):
+        """Test that many runs are merged a few at a time."""
+        pairs = [
+            (f"{random.randrange(500)}", f"{random.randrange(500)}")
+            for _ in range(3000)
+        ]
+        opened = []
+        real_merge = canonical._merge_runs
+
+        def merge_runs(runs):
+            opened.append(len(runs))
+            return real_merge(runs)
+
+        with patch.object(canonical, "MERGE_FAN_IN", 3), patch.object(
+            canonical, "_merge_runs", merge_runs
+        ):
+            self.assertEqual(list(sort_unique(pairs, memory=512)), sorted(set(pairs)))
+
+        self.assertGreater(len(opened), 2)
+        self.assertLessEqual(max(opened), 3)
+
+    def test_single_id_rows(self):
+        """Test that a row with a single ID is reported clearly."""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "pairs.csv")
+            with open(filename, "w") as f:
+                f.write("a,b\n\nc\n")
+
+            pairs = CSVPairReader().read_dups(filename)
+            self.assertEqual(next(pairs), ("a", "b"))
+            with self.assertRaisesRegex(ValueError, "expected a pair"):
+                next(pairs)
+
+    def test_canonical_reader(self):
+        """Test that the reader canonicalizes pairs and reports dangling IDs."""
+        reader = CanonicalReader(
+            ListReader([("b", "a"), ("a", "b"), ("a", "a"), ("z", "a")], [("c", "a")]),
+            memory=256,
+            uris={"a", "b", "c"},
+        )
+
+        self.assertEqual(list(reader.read_dups("")), [("a", "b"), ("a", "z")])
+        self.assertEqual(list(reader.read_non_dups("")), [("a", "c")])
+        self.assertEqual(reader.dangling, {"z"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from convert.src.handlers.cluster import ClusterHandler, UnionFind
+
+
+class TestUnionFind(unittest.TestCase):
+    """Test the union-find over interned IDs."""
+
+    def test_union(self):
+        """Test that linked IDs end up in the same set."""
+        forest = UnionFind()
+        forest.union("A", "B")
+        forest.union("C", "D")
+        forest.union("B", "D")
+        forest.add("E")
+
+        roots = {uri: forest.find(forest.index[uri]) for uri in "ABCDE"}
+        self.assertEqual(len({roots[uri] for uri in "ABCD"}), 1)
+        self.assertNotEqual(roots["A"], roots["E"])
+        self.assertEqual(forest.size[roots["A"]], 4)
+
+    def test_clusters(self):
+        """Test that sets are numbered in order of appearance."""
+        forest = UnionFind()
+        forest.union("A", "B")
+        forest.union("C", "D")
+        forest.union("E", "A")
+
+        self.assertEqual(
+            list(forest.clusters()),
+            [(0, "A"), (0, "B"), (1, "C"), (1, "D"), (0, "E")],
+        )
+
+
+class TestClusterHandler(unittest.TestCase):
+    """Test the clustered CSV handler."""
+
+    def test_write_and_read(self):
+        """Test that written clusters are read back as the same pairs."""
+        handler = ClusterHandler()
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "out" + handler.extension)
+            handler.write(
+                filename,
+                "",
+                [("A", "B"), ("C", "D"), ("B", "E")],
+                [("A", "F")],
+            )
+
+            with open(filename) as f:
+                self.assertEqual(
+                    f.read().splitlines(),
+                    [
+                        "Cluster ID,uri",
+                        "0,A",
+                        "0,B",
+                        "1,C",
+                        "1,D",
+                        "0,E",
+                        "2,F",
+                    ],
+                )
+
+            self.assertEqual(
+                sorted(handler.read_dups(filename)),
+                [("A", "B"), ("A", "E"), ("B", "E"), ("C", "D")],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import argparse
+import io
+import os
+import tempfile
+import unittest
+
+from convert.src.handlers.cluster import ClusterHandler
+from convert.src.handlers.curie import LISTING_PREFIX, PrefixMap, parse_prefix
+from convert.src.handlers.duke import DukeHandler
+from convert.src.handlers.jedai import JedaiHandler
+
+
+class TestPrefixMap(unittest.TestCase):
+    """Test the CURIE prefix map."""
+
+    def setUp(self):
+        """Create a map with nested prefixes."""
+        self.prefixes = PrefixMap(
+            {"p": "https://example.org/pronto.owl#", "l": LISTING_PREFIX}
+        )
+
+    def test_compact_and_expand(self):
+        """Test that the longest prefix is used and URIs round-trip."""
+        uri = LISTING_PREFIX + "site2_A869314430"
+
+        self.assertEqual(self.prefixes.compact(uri), "l:site2_A869314430")
+        self.assertEqual(self.prefixes.expand("l:site2_A869314430"), uri)
+        self.assertEqual(self.prefixes.compact("http://other/1"), "http://other/1")
+        self.assertEqual(self.prefixes.expand("http://other/1"), "http://other/1")
+
+    def test_read_header(self):
+        """Test that the header is read and the file is left after it."""
+        f = io.StringIO(self.prefixes.header() + "l:1,l:2\n")
+
+        self.assertEqual(PrefixMap.read(f), self.prefixes)
+        self.assertEqual(f.read(), "l:1,l:2\n")
+        self.assertFalse(PrefixMap.read(io.StringIO("A,B\n")))
+
+    def test_invalid(self):
+        """Test that invalid prefixes are rejected."""
+        with self.assertRaises(ValueError):
+            PrefixMap({"https": "https://example.org/"})
+        for value in ("l", "1x=https://example.org/", "l x=https://x/", "l=<x>"):
+            with self.subTest(value), self.assertRaises(argparse.ArgumentTypeError):
+                parse_prefix(value)
+
+        name, iri = parse_prefix("l.2=https://example.org/")
+        header = PrefixMap({name: iri}).header()
+        self.assertEqual(PrefixMap.read(io.StringIO(header)).prefixes, {name: iri})
+
+
+class TestCompactedHandlers(unittest.TestCase):
+    """Test that handlers read back the compacted files they write."""
+
+    def test_round_trip(self):
+        """Test that each handler writes CURIEs and reads back the URIs."""
+        duplicates = [
+            (LISTING_PREFIX + "site1_1", LISTING_PREFIX + "site2_2"),
+            (LISTING_PREFIX + "site3_3", "http://other/4"),
+        ]
+        non_dups = [(LISTING_PREFIX + "site1_1", LISTING_PREFIX + "site3_3")]
+        prefixes = PrefixMap({"l": LISTING_PREFIX})
+
+        with tempfile.TemporaryDirectory() as directory:
+            for handler_class in (DukeHandler, JedaiHandler, ClusterHandler):
+                with self.subTest(handler=handler_class.__name__):
+                    handler = handler_class(prefixes)
+                    filename = os.path.join(directory, "pairs" + handler.extension)
+                    handler.write(filename, "", duplicates, non_dups)
+
+                    with open(filename) as f:
+                        content = f.read()
+                    self.assertTrue(content.startswith(prefixes.header()))
+                    self.assertEqual(content.count(LISTING_PREFIX), 1)
+
+                    pairs = {frozenset(pair) for pair in handler.read_dups(filename)}
+                    self.assertTrue({frozenset(pair) for pair in duplicates} <= pairs)
+
+
+if __name__ == "__main__":
+    unittest.main()
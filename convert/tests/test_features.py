@@ -0,0 +1,105 @@
+import csv
+import io
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from convert.src.handlers.features import FEATURES, FeatureHandler
+from convert.src.handlers.interned import PairBatch, URITable
+
+PREFIX = "https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_"
+
+
+class TestFeatureHandler(unittest.TestCase):
+    """Test the writer of similarity feature matrices."""
+
+    def setUp(self):
+        """Write a data file with missing and unparseable values."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.datafile = os.path.join(self.directory.name, "data.csv")
+        self.filename = os.path.join(self.directory.name, "train.features.npy")
+        with open(self.datafile, "w") as f:
+            f.write("uri,price,total_surface,covered_surface,address,coordinates\n")
+            f.write(f'{PREFIX}a,100,50,,"Calle 7, La Plata","(0.0, 0.0)"\n')
+            f.write(f'{PREFIX}b,80,50,,"calle 7 y 50 La Plata","(0.0, 1.0)"\n')
+            f.write(f"{PREFIX}c,consultar,0,0,,\n")
+            f.write(f"{PREFIX}d,0,0,0,,\n")
+            f.write(f"{PREFIX}unused,1,1,1,x,\n")
+
+        self.duplicates = [(f"{PREFIX}a", f"{PREFIX}b"), (f"{PREFIX}c", f"{PREFIX}d")]
+        self.non_dups = [(f"{PREFIX}a", f"{PREFIX}c")]
+
+    def tearDown(self):
+        """Remove the files."""
+        self.directory.cleanup()
+
+    def test_features(self):
+        """Test the value of each feature, and NaN for missing values."""
+        FeatureHandler().write(
+            self.filename, self.datafile, self.duplicates, self.non_dups
+        )
+
+        matrix = np.load(self.filename, mmap_mode="r")
+        self.assertEqual(matrix.shape, (3, len(FEATURES)))
+        distance, price, total_surface, covered_surface, address = matrix[0]
+        self.assertAlmostEqual(distance, 111.195, places=2)
+        self.assertAlmostEqual(price, 0.2)
+        self.assertEqual(total_surface, 0.0)
+        self.assertTrue(math.isnan(covered_surface))
+        self.assertAlmostEqual(address, 4 / 6)
+
+        distance, price, total_surface, covered_surface, address = matrix[1]
+        self.assertTrue(math.isnan(distance))
+        self.assertTrue(math.isnan(price))
+        self.assertEqual((total_surface, covered_surface), (0.0, 0.0))
+        self.assertTrue(math.isnan(address))
+        self.assertEqual(matrix[2, 4], 0.0)
+
+    def test_chunks_and_index(self):
+        """Test that chunks give the same matrix and the index reads back."""
+        handler = FeatureHandler()
+        handler.write(self.filename, self.datafile, self.duplicates, self.non_dups)
+        expected = np.load(self.filename)
+
+        table = URITable()
+        duplicates = PairBatch.from_pairs(self.duplicates, table)
+        non_dups = PairBatch.from_pairs(self.non_dups, table)
+        handler = FeatureHandler(chunk_size=1)
+        handler.write(self.filename, self.datafile, duplicates, non_dups)
+
+        np.testing.assert_array_equal(np.load(self.filename), expected)
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(self.directory.name, "train.features.index.csv")
+            )
+        )
+        self.assertEqual(list(handler.read_dups(self.filename)), self.duplicates)
+        self.assertEqual(list(handler.read_non_dups(self.filename)), self.non_dups)
+
+    def test_quoted_index(self):
+        """Test that the index quotes URIs as `csv.writer` does."""
+        with open(self.datafile, "a") as f:
+            f.write('"x,""1""",1,1,1,x,\n')
+        pairs = [('x,"1"', f"{PREFIX}a")]
+        FeatureHandler().write(self.filename, self.datafile, pairs, [])
+
+        expected = io.StringIO()
+        csv.writer(expected).writerows([["id1", "id2", "duplicate"], [*pairs[0], 1]])
+        with open(
+            os.path.join(self.directory.name, "train.features.index.csv"), newline=""
+        ) as f:
+            self.assertEqual(f.read(), expected.getvalue())
+
+    def test_missing_listing(self):
+        """Test that a pair of a listing without data is reported."""
+        with self.assertRaises(KeyError):
+            FeatureHandler().write(
+                self.filename, self.datafile, [(f"{PREFIX}a", f"{PREFIX}z")], []
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from convert.src.handlers.dedupe import DedupeHandler
+from convert.src.handlers.interned import PairBatch, URITable
+
+
+class TestPairBatch(unittest.TestCase):
+    """Test the batches of interned pairs."""
+
+    def test_intern(self):
+        """Test that each distinct URI is numbered once."""
+        table = URITable()
+
+        self.assertEqual([table.intern(uri) for uri in "ABA"], [0, 1, 0])
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table[1], "B")
+
+    def test_from_pairs(self):
+        """Test that a batch iterates as the pairs it was built from."""
+        pairs = [("A", "B"), ("B", "C"), ("A", "C")]
+        batch = PairBatch.from_pairs(pairs, URITable())
+
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(list(batch), pairs)
+        self.assertEqual(list(batch.numbers()), [(0, 1), (1, 2), (0, 2)])
+        self.assertEqual(batch.to_numpy().tolist(), [[0, 1], [1, 2], [0, 2]])
+
+
+class TestDedupeHandlerBatches(unittest.TestCase):
+    """Test that the dedupe writer accepts batches of interned pairs."""
+
+    def setUp(self):
+        """Write a data file with a record that no pair references."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.datafile = os.path.join(self.directory.name, "data.csv")
+        with open(self.datafile, "w") as f:
+            f.write("uri,title,price\nA,Casa,100\nB,casa ,100.0\nC,Depto,\nD,x,1\n")
+
+    def tearDown(self):
+        """Remove the data file and the outputs."""
+        self.directory.cleanup()
+
+    def test_write_batches(self):
+        """Test that batches are written as the pairs they hold."""
+        duplicates, non_dups = [("A", "B")], [("A", "C"), ("B", "C")]
+        table = URITable()
+        outputs = []
+        for name, dups, non in [
+            ("tuples", duplicates, non_dups),
+            (
+                "batches",
+                PairBatch.from_pairs(duplicates, table),
+                PairBatch.from_pairs(non_dups, table),
+            ),
+        ]:
+            filename = os.path.join(self.directory.name, f"{name}.json")
+            DedupeHandler().write(filename, self.datafile, dups, non)
+            with open(filename) as f:
+                outputs.append(f.read())
+
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_write_missing_record(self):
+        """Test that a URI missing from the data file is reported."""
+        table = URITable()
+        with self.assertRaises(KeyError):
+            DedupeHandler().write(
+                os.path.join(self.directory.name, "out.json"),
+                self.datafile,
+                PairBatch.from_pairs([("A", "Z")], table),
+                PairBatch(table),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
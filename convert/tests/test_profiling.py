@@ -0,0 +1,94 @@
+import os
+import random
+import tempfile
+import unittest
+
+from convert.src.handlers.profiling import (
+    HyperLogLog,
+    TDigest,
+    profile_data,
+    read_cluster_uris,
+)
+
+
+class TestSketches(unittest.TestCase):
+    """Test the sketches of the profile."""
+
+    def test_tdigest_quantiles(self):
+        """Test that quantiles are close in rank, and the extremes exact."""
+        rng = random.Random(0)
+        values = [rng.lognormvariate(10, 1) for _ in range(100_000)]
+        digest = TDigest(100)
+        for value in values:
+            digest.add(value)
+
+        values.sort()
+        self.assertLessEqual(len(digest.means), 100)
+        self.assertEqual(digest.quantile(0), values[0])
+        self.assertEqual(digest.quantile(1), values[-1])
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            rank = sum(value <= digest.quantile(q) for value in values) / len(values)
+            self.assertAlmostEqual(rank, q, delta=0.005)
+
+    def test_hyperloglog(self):
+        """Test that distinct values are estimated within the expected error."""
+        sketch = HyperLogLog(12)
+        for i in range(50_000):
+            sketch.add(f"casa {i % 20_000}")
+
+        self.assertLess(
+            abs(sketch.estimate() - 20_000), 3 * sketch.relative_error * 20_000
+        )
+
+
+class TestProfileData(unittest.TestCase):
+    """Test the single-pass profile of the listings."""
+
+    def test_profile(self):
+        """Test the counts of empty and unparseable values and of labels."""
+        rows = [
+            {"uri": "a", "price": "100", "age": "3", "coordinates": "(1.0, 2.0)"},
+            {"uri": "b", "price": "consultar", "age": "2.5", "coordinates": ""},
+            {"uri": "c", "price": "", "age": " ", "coordinates": "(1.0)"},
+            {"uri": "d", "price": "300", "age": "7", "coordinates": "(3.0, 4.0)"},
+        ]
+
+        profile = profile_data(rows, {"a", "b", "x"})
+
+        self.assertEqual(profile["rows"], 4)
+        self.assertEqual(
+            profile["labels"],
+            {
+                "uris": 3,
+                "unreferenced_rows": 2,
+                "unreferenced_rate": 0.5,
+                "missing_uris": 1,
+            },
+        )
+        price = profile["columns"]["price"]
+        self.assertEqual(price["type"], "float")
+        self.assertEqual((price["nulls"], price["unparseable"]), (1, 1))
+        self.assertEqual(price["null_rate"], 0.25)
+        self.assertEqual(price["value"]["count"], 2)
+        self.assertEqual(price["value"]["mean"], 200.0)
+        self.assertEqual(price["distinct"], 3)
+        age = profile["columns"]["age"]
+        self.assertEqual((age["nulls"], age["unparseable"]), (1, 1))
+        coordinates = profile["columns"]["coordinates"]
+        self.assertEqual((coordinates["nulls"], coordinates["unparseable"]), (1, 1))
+        self.assertEqual(coordinates["longitude"]["max"], 4.0)
+        self.assertEqual(profile["columns"]["uri"]["type"], "text")
+        self.assertNotIn("labels", profile_data(rows))
+
+    def test_read_cluster_uris(self):
+        """Test that the URIs of every cluster are read."""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "labels.csv")
+            with open(filename, "w") as f:
+                f.write("a;b\nc;d;e\n")
+
+            self.assertEqual(list(read_cluster_uris(filename)), list("abcde"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import unittest
+
+from convert.src.handlers.registry import Capabilities, HandlerRegistry, HandlerSpec
+
+
+class FakeHandler:
+    """A third-party handler that declares its own capabilities."""
+
+    capabilities = Capabilities(streaming=True)
+
+
+class TestHandlerRegistry(unittest.TestCase):
+    """Test the lazy handler registry."""
+
+    def test_names_do_not_import_handlers(self):
+        """Test that listing the handlers does not import them."""
+        registry = HandlerRegistry(group=None)
+        sys.modules.pop("convert.src.handlers.dedupe", None)
+
+        self.assertEqual(
+            sorted(registry),
+            [
+                "cluster",
+                "dedupe",
+                "dedupe-json",
+                "duke",
+                "features",
+                "jedai",
+                "sqlite",
+            ],
+        )
+        self.assertFalse(registry.capabilities("dedupe").streaming)
+        self.assertNotIn("convert.src.handlers.dedupe", sys.modules)
+
+    def test_lookup_imports_handler(self):
+        """Test that looking up a handler imports its class."""
+        registry = HandlerRegistry(group=None)
+
+        handler = registry["duke"]
+
+        self.assertEqual(handler.__name__, "DukeHandler")
+        self.assertEqual(handler().extension, ".duke.csv")
+
+    def test_register(self):
+        """Test that registered handlers declare capabilities in their class."""
+        registry = HandlerRegistry(group=None)
+        registry.register("fake", HandlerSpec(f"{__name__}:FakeHandler"))
+
+        self.assertIs(registry["fake"], FakeHandler)
+        self.assertEqual(registry.capabilities("fake"), FakeHandler.capabilities)
+        self.assertEqual(
+            registry.capabilities("jedai"),
+            Capabilities(streaming=True, compacts_uris=True),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import collections
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from convert.src.handlers.dedupe import DedupeHandler
+from convert.src.handlers.cluster import UnionFind
+from convert.src.handlers.sampling import (
+    ClusterSamples,
+    sample_training_pairs,
+    share,
+    site_pair,
+)
+
+PREFIX = "https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_"
+
+
+class TestSampleTrainingPairs(unittest.TestCase):
+    """Test the capped, balanced sample of training pairs."""
+
+    def setUp(self):
+        """
+        Create a large cluster and many small ones of matches, and
+        distincts of two site pairs.
+        """
+        big = [f"{PREFIX}site1_big{i}" for i in range(30)]
+        self.duplicates = [
+            (first, second) for i, first in enumerate(big) for second in big[i + 1 :]
+        ] + [(f"{PREFIX}site1_{i}", f"{PREFIX}site2_{i}") for i in range(20)]
+        self.non_dups = [
+            (f"{PREFIX}site1_{i}", f"{PREFIX}site3_{i}") for i in range(200)
+        ] + [(f"{PREFIX}site2_{i}", f"{PREFIX}site2_x{i}") for i in range(5)]
+
+    def test_share(self):
+        """Test that small strata give their unused share to the others."""
+        self.assertEqual(
+            share({"a": 2, "b": 10, "c": 10}, 12), {"a": 2, "b": 5, "c": 5}
+        )
+        self.assertEqual(share({"a": 2, "b": 3}, 100), {"a": 2, "b": 3})
+
+    def test_site_pair(self):
+        """Test that the sites of a pair are sorted."""
+        self.assertEqual(
+            site_pair((f"{PREFIX}site3_1", f"{PREFIX}site1_2")), "site1-site3"
+        )
+
+    def test_sample(self):
+        """Test the size, balance and stratification of the sample."""
+        matches, distincts, stats = sample_training_pairs(
+            self.duplicates, self.non_dups, 40, match_ratio=0.5, seed=3
+        )
+
+        self.assertEqual(len(matches), 20)
+        self.assertEqual(len(distincts), 20)
+        self.assertTrue(set(matches) <= set(self.duplicates))
+        self.assertEqual(
+            collections.Counter(map(site_pair, distincts)),
+            {"site1-site3": 15, "site2-site2": 5},
+        )
+        # The 20 small clusters are not crowded out by the large one.
+        self.assertEqual(stats["match"]["clusters"], 20)
+        self.assertEqual(stats["match"]["seen"], len(self.duplicates))
+        self.assertEqual(stats["distinct"]["kept"], 20)
+
+        self.assertEqual(
+            sample_training_pairs(self.duplicates, self.non_dups, 40, seed=3),
+            (matches, distincts, stats),
+        )
+
+    def test_clusters_across_site_pairs(self):
+        """Test that clusters take turns across the whole match budget."""
+        uris = [f"{PREFIX}site1_{i}" for i in range(5)]
+        duplicates = [(uris[0], uris[1]), (uris[1], uris[2]), (uris[0], uris[2])]
+        duplicates.append((uris[3], uris[4]))
+        for seed in range(20):
+            matches, _, stats = sample_training_pairs(duplicates, [], 2, 1, seed)
+            self.assertIn((uris[3], uris[4]), matches)
+            self.assertEqual(stats["match"]["clusters"], 2)
+
+    def test_merged_clusters(self):
+        """Test that the pairs of merged clusters are sampled uniformly."""
+        uris = [f"{PREFIX}site1_{i}" for i in range(8)]
+        # Two chains of four pairs each, joined by a last pair.
+        duplicates = [(uris[i], uris[i + 1]) for i in range(7)]
+        counts = collections.Counter(
+            pair
+            for seed in range(700)
+            for pair in sample_training_pairs(duplicates, [], 2, 1, seed)[0]
+        )
+        self.assertEqual(set(counts), set(duplicates))
+        for pair in duplicates:
+            self.assertAlmostEqual(counts[pair] / 700, 2 / 7, delta=0.07)
+
+    def test_samples_within_budget(self):
+        """Test that the samples of all the clusters stay within the budget."""
+        rng = random.Random(0)
+        forest = UnionFind()
+        clusters = ClusterSamples(10, rng)
+        for _ in range(2000):
+            pair = (str(rng.randrange(300)), str(rng.randrange(300)))
+            first = forest.find(forest.add(pair[0]))
+            second = forest.find(forest.add(pair[1]))
+            root = forest.union(*pair)
+            clusters.merge(first, second, root)
+            clusters.add(root, pair)
+
+            samples = clusters.clusters()
+            self.assertLessEqual(sum(map(len, samples)), 10)
+            self.assertEqual(sum(map(len, samples)), clusters.kept)
+
+        self.assertEqual(clusters.kept, 10)
+
+    def test_match_ratio(self):
+        """Test that match ratios outside [0, 1] are rejected."""
+        with self.assertRaises(ValueError):
+            sample_training_pairs(self.duplicates, self.non_dups, 10, 1.5)
+
+    def test_write_capped(self):
+        """Test that the dedupe writer caps the pairs and saves the stats."""
+        with tempfile.TemporaryDirectory() as directory:
+            datafile = os.path.join(directory, "data.csv")
+            uris = {uri for pair in self.duplicates + self.non_dups for uri in pair}
+            with open(datafile, "w") as f:
+                f.write("uri,title\n")
+                f.writelines(f"{uri},x\n" for uri in sorted(uris))
+
+            filename = os.path.join(directory, "train.dedupe.json")
+            DedupeHandler(max_pairs=10, seed=1).write(
+                filename, datafile, self.duplicates, self.non_dups
+            )
+
+            with open(filename) as f:
+                training = json.load(f)
+            with open(os.path.join(directory, "train.dedupe.stats.json")) as f:
+                stats = json.load(f)
+
+        self.assertEqual(len(training["match"]), 5)
+        self.assertEqual(len(training["distinct"]), 5)
+        self.assertEqual(stats["seed"], 1)
+        self.assertEqual(stats["match"]["kept"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from convert.src.handlers.sqlite import SQLiteHandler, SQLiteStore
+
+
+class TestSQLiteHandler(unittest.TestCase):
+    """Test the SQLite handler and store."""
+
+    def setUp(self):
+        """Create a data file and the path of a database."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.datafile = os.path.join(self.directory.name, "data.csv")
+        self.database = os.path.join(self.directory.name, "pairs.sqlite")
+
+        with open(self.datafile, "w") as f:
+            f.write("uri,price,city\nA,100,la plata\nB,,la plata\nC,120.5,\n")
+
+    def tearDown(self):
+        """Remove the temporary files."""
+        self.directory.cleanup()
+
+    def test_write_and_read(self):
+        """Test that written pairs are read back in canonical order."""
+        handler = SQLiteHandler()
+        handler.write(
+            self.database,
+            self.datafile,
+            [("B", "A"), ("A", "B"), ("C", "C")],
+            [("A", "C")],
+        )
+
+        self.assertEqual(list(handler.read_dups(self.database)), [("A", "B")])
+        self.assertEqual(list(handler.read_non_dups(self.database)), [("A", "C")])
+
+    def test_two_runs(self):
+        """Test that two runs are written into one database and compared."""
+        SQLiteHandler(run="labels").write(
+            self.database, self.datafile, [("A", "B"), ("B", "C")], []
+        )
+        SQLiteHandler(run="duke").write(
+            self.database, self.datafile, [("B", "A"), ("A", "C")], []
+        )
+
+        with SQLiteStore(self.database) as store:
+            self.assertEqual(store.runs(), ["duke", "labels"])
+            self.assertEqual(store.runs_with("A", "B"), ["duke", "labels"])
+            self.assertEqual(store.runs_with("C", "B"), ["labels"])
+            self.assertEqual(store.runs_with("A", "C"), ["duke"])
+            (records,) = store.connection.execute("SELECT COUNT(*) FROM records")
+            self.assertEqual(records, (3,))
+
+        self.assertEqual(
+            list(SQLiteHandler(run="duke").read_dups(self.database)),
+            [("A", "B"), ("A", "C")],
+        )
+
+    def test_load_records_columns(self):
+        """Test that only missing records are loaded, with the same columns."""
+        other = os.path.join(self.directory.name, "other.csv")
+        with open(other, "w") as f:
+            f.write("city,uri,price\nmdp,A,1\nmdp,D,2\n")
+        wrong = os.path.join(self.directory.name, "wrong.csv")
+        with open(wrong, "w") as f:
+            f.write("uri,rooms\nE,3\n")
+
+        with SQLiteStore(self.database) as store:
+            store.load_records(self.datafile)
+            store.load_records(other)
+
+            self.assertEqual(
+                store.connection.execute(
+                    "SELECT uri, price, city FROM records ORDER BY uri"
+                ).fetchall(),
+                [
+                    ("A", 100, "la plata"),
+                    ("B", None, "la plata"),
+                    ("C", 120.5, None),
+                    ("D", 2, "mdp"),
+                ],
+            )
+            with self.assertRaises(ValueError):
+                store.load_records(wrong)
+
+    def test_runs_with(self):
+        """Test that the runs that found a pair are listed."""
+        with SQLiteStore(self.database) as store:
+            store.add_pairs("duke", [("A", "B")])
+            store.add_pairs("jedai", [("B", "A"), ("B", "C")])
+
+            self.assertEqual(store.runs(), ["duke", "jedai"])
+            self.assertEqual(store.runs_with("B", "A"), ["duke", "jedai"])
+            self.assertEqual(store.runs_with("C", "B"), ["jedai"])
+            self.assertEqual(store.runs_with("A", "C"), [])
+
+    def test_pairs_with_records(self):
+        """Test that pairs are joined with the attributes of their records."""
+        with SQLiteStore(self.database) as store:
+            store.load_records(self.datafile)
+            store.add_pairs("labels", [("A", "C"), ("A", "Z")])
+
+            self.assertEqual(
+                list(store.pairs_with_records("labels")),
+                [
+                    (
+                        {"uri": "A", "price": 100, "city": "la plata"},
+                        {"uri": "C", "price": 120.5, "city": None},
+                    )
+                ],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
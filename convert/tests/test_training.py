@@ -0,0 +1,107 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from convert.src.handlers import training
+from convert.src.handlers.dedupe import DedupeHandler
+from convert.src.handlers.training import DedupeTrainingHandler, iter_training_pairs
+
+PREFIX = "https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_"
+
+
+class TestDedupeTrainingHandler(unittest.TestCase):
+    """Test the incremental reader of dedupe's training JSON."""
+
+    def setUp(self):
+        """Write a data file and a training file of its records."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.datafile = os.path.join(self.directory.name, "data.csv")
+        self.filename = os.path.join(self.directory.name, "train.dedupe.json")
+        with open(self.datafile, "w") as f:
+            f.write("uri,title,coordinates\n")
+            for i in range(50):
+                f.write(f'{PREFIX}site1_A{i},Casa {i},"(-34.{i}, -58.{i})"\n')
+
+        self.duplicates = [
+            (f"{PREFIX}site1_A{i}", f"{PREFIX}site1_A{i + 1}") for i in range(0, 50, 2)
+        ]
+        self.non_dups = [
+            (f"{PREFIX}site1_A{i}", f"{PREFIX}site1_A{49 - i}") for i in range(20)
+        ]
+        DedupeHandler().write(
+            self.filename, self.datafile, self.duplicates, self.non_dups
+        )
+
+    def tearDown(self):
+        """Remove the files."""
+        self.directory.cleanup()
+
+    def test_iter_training_pairs(self):
+        """Test that items are parsed across chunk boundaries."""
+        items = list(iter_training_pairs(self.filename, chunk_size=7))
+
+        self.assertEqual(
+            [key for key, _ in items],
+            ["match"] * len(self.duplicates) + ["distinct"] * len(self.non_dups),
+        )
+        first, _ = items[0][1]
+        self.assertEqual(first["title"], "casa 0")
+        self.assertEqual(first["coordinates"], (-34.0, -58.0))
+
+    def test_read_restores_uris(self):
+        """Test that the original URIs are restored from the data file."""
+        handler = DedupeTrainingHandler(datafile=self.datafile)
+
+        self.assertEqual(list(handler.read_dups(self.filename)), self.duplicates)
+        self.assertEqual(list(handler.read_non_dups(self.filename)), self.non_dups)
+
+    def test_read_parses_once(self):
+        """Test that the matches and distincts are read in one parse."""
+        handler = DedupeTrainingHandler(datafile=self.datafile)
+        with mock.patch.object(
+            training, "iter_training_pairs", wraps=iter_training_pairs
+        ) as parse:
+            non_dups = list(handler.read_non_dups(self.filename))
+            duplicates = list(handler.read_dups(self.filename))
+
+        self.assertEqual((duplicates, non_dups), (self.duplicates, self.non_dups))
+        self.assertEqual(parse.call_count, 1)
+        # Reading an array again parses the file again.
+        self.assertEqual(list(handler.read_dups(self.filename)), self.duplicates)
+
+    def test_read_without_datafile(self):
+        """Test that the normalized URIs are read without a data file."""
+        handler = DedupeTrainingHandler()
+
+        self.assertEqual(
+            next(handler.read_dups(self.filename)),
+            (self.duplicates[0][0].lower(), self.duplicates[0][1].lower()),
+        )
+
+    def test_invalid_file(self):
+        """Test that a truncated file is reported."""
+        with open(self.filename, "w") as f:
+            f.write('{"match": [')
+
+        with self.assertRaises(ValueError):
+            list(iter_training_pairs(self.filename))
+
+    def test_malformed_file_fails_fast(self):
+        """Test that a malformed pair is reported without reading on."""
+        text = '{"match": [[{"uri": "a"} {"uri": "b"}]' + " " * 2**20 + "]}"
+        f = io.StringIO(text)
+        buffer = training._Buffer(f, 16)
+        buffer.expect("{")
+        buffer.decode()
+        buffer.expect(":")
+        buffer.expect("[")
+
+        with self.assertRaises(ValueError):
+            buffer.decode()
+        self.assertLess(f.tell(), 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
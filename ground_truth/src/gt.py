@@ -2,11 +2,26 @@
 Create a ground truth file of listings and `owl:sameAs` links between
 the listings
 """
+
 import argparse
+import array
+import collections
+import concurrent.futures
 import csv
 import itertools
+import math
+import os
 import random
-from typing import Iterator
+import re
+import shutil
+from typing import IO, Iterable, Iterator, Optional
+
+# Finds the source site of a listing in its URI, which `site_combination`
+# uses to stratify the clusters, e.g. "site2" in "...#listing_site2_A1132".
+SITE: re.Pattern = re.compile(r"listing_(site\d+)_")
+
+# The size of the buffer of the output files.
+BUFFER_SIZE: int = 2**20
 
 
 def main() -> None:
@@ -41,20 +56,39 @@ def main() -> None:
     args: argparse.Namespace = read_args()
 
     # Generate output labels file based on input labels file
-    with open(args.input_labels, "r") as input_labels:
-        with open(args.output_labels, "w") as output_labels:
-            labels = csv.reader(input_labels)
-            labels = [duplicates[0].split(";") for duplicates in labels]
-
-            duplicates, uniques = select_labels(labels, args.randomize)
-
-            writer = csv.writer(output_labels)
-            writer.writerows(format_duplicates(duplicates))
-
-            for _ in range(len(duplicates)):
-                writer.writerow(next(format_non_duplicates(duplicates, uniques)))
+    duplicates, uniques = sample_labels(
+        LabelsFile(args.input_labels),
+        args.ratio,
+        args.randomize,
+        args.seed,
+        args.stratify,
+    )
 
-            del labels
+    negatives = NonDuplicates(duplicates, uniques)
+    if args.count_non_duplicates:
+        print(negatives.count())
+        return
+
+    with open(args.output_labels, "w", buffering=BUFFER_SIZE) as output_labels:
+        writer = csv.writer(output_labels)
+        writer.writerows(format_duplicates(duplicates))
+
+        if args.all_non_duplicates:
+            write_non_duplicates(output_labels, negatives, args.jobs)
+        elif args.spread_non_duplicates:
+            writer.writerows(
+                ["-", first, second, 0]
+                for first, second in negatives.sample(
+                    len(duplicates),
+                    random.Random(args.seed) if args.randomize else None,
+                )
+            )
+        else:
+            writer.writerows(
+                ["-", first, second, 0]
+                for first, second in itertools.islice(negatives, len(duplicates))
+            )
+    del negatives
 
     # Generate output data file from selected listing IDs
     uris: set = set(itertools.chain.from_iterable(duplicates)) | set(uniques)
@@ -125,67 +159,306 @@ def format_non_duplicates(
         ["-", E, G, 0]
         ["-", F, G, 0]
 
-    Change this function and `format_duplicates` in order to
-    change the format of the output labels file.
+    Change this function, `format_duplicates` and `write_non_duplicates`
+    in order to change the format of the output labels file.
 
     Call this function if you intend to represent each non-duplicated
     pair of items. Be aware that this will result in a large number of
     non-duplicated pairs, resulting in a gigantic output labels file.
     Instead, consider trying to represent only duplicated lines, and
     assume that all other lines are non-duplicated.
+
+    The clusters and the unique listings must be disjoint. See
+    `NonDuplicates` for the order of the pairs.
     """
+    for first, second in NonDuplicates(duplicates, uniques):
+        yield ["-", first, second, 0]
 
-    def _format_non_duplicates(first: str, second: str) -> list:
-        return ["-", first, second, 0]
 
-    # Duplicates are not equal to unique listings: A != B
-    for dup in itertools.chain.from_iterable(duplicates):
-        for unique in uniques:
-            yield _format_non_duplicates(dup, unique)
+class NonDuplicates:
+    """
+    Every non-duplicated pair of the listings of some clusters of
+    duplicates and some unique listings, enumerated by index arithmetic.
+
+    The listings are numbered so that each cluster is contiguous and
+    the unique listings are clusters of their own. Row `i` holds the
+    pairs of listing `i` with every listing after its cluster, so it has
+    `len(self) - end` pairs, with `end` the index after its cluster, and
+    the pairs of a range of rows can be counted and generated without
+    comparing listings.
+    """
 
-    # Duplicates are not equal to different duplicates: A != D
-    for dups in duplicates:
-        for other_dup in (
-            item
-            for item in itertools.chain.from_iterable(duplicates)
-            if item not in dups
-        ):
-            yield _format_non_duplicates(dups[0], other_dup)
+    def __init__(self, duplicates: list[list[str]], uniques: list[str]) -> None:
+        self.items: list[str] = list(itertools.chain.from_iterable(duplicates))
+        self.items.extend(uniques)
+        # The index after the cluster of each listing.
+        self.ends: array.array = array.array("q")
+        for dups in duplicates:
+            self.ends.extend(itertools.repeat(len(self.ends) + len(dups), len(dups)))
+        self.ends.extend(range(len(self.ends) + 1, len(self.items) + 1))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        return self.rows(0, len(self))
+
+    def count(self, start: int = 0, stop: Optional[int] = None) -> int:
+        """
+        Return the number of pairs in the rows from `start` to `stop`,
+        or in every row, without generating them.
+        """
+        stop = len(self) if stop is None else stop
+        return len(self) * (stop - start) - sum(self.ends[start:stop])
+
+    def rows(self, start: int, stop: int) -> Iterator[tuple[str, str]]:
+        """
+        Yield the pairs of the rows from `start` to `stop`.
+        """
+        for i in range(start, stop):
+            first: str = self.items[i]
+            for second in self.items[self.ends[i] :]:
+                yield first, second
+
+    def sample(
+        self, size: int, rng: Optional[random.Random] = None
+    ) -> Iterator[tuple[str, str]]:
+        """
+        Yield `size` pairs, or every pair if there are fewer, spread
+        across every row: a uniform sample of the pairs if `rng` is
+        given, or pairs at an even stride through them otherwise.
+
+        The pairs are picked by their index, counting the pairs of each
+        row, so only the picked pairs are generated.
+        """
+        total: int = self.count()
+        size = min(size, total)
+        if rng is not None:
+            picked: list[int] = sorted(rng.sample(range(total), size))
+        else:
+            picked = [(2 * k + 1) * total // (2 * size) for k in range(size)]
+
+        row: int = 0
+        # The index of the first pair of the row.
+        first: int = 0
+        for index in picked:
+            while index >= first + len(self) - self.ends[row]:
+                first += len(self) - self.ends[row]
+                row += 1
+            yield self.items[row], self.items[self.ends[row] + index - first]
+
+    def partition(self, parts: int) -> list[tuple[int, int]]:
+        """
+        Split the rows into at most `parts` contiguous ranges with about
+        the same number of pairs each.
+
+        Return the `(start, stop)` of each range, e.g.:
+            [ (0, 2), (2, 7) ]
+        """
+        total: int = self.count()
+        bounds: list[int] = [0]
+        pairs: int = 0
+        for i, end in enumerate(self.ends):
+            pairs += len(self) - end
+            if pairs * parts >= total * len(bounds) and len(bounds) < parts:
+                bounds.append(i + 1)
+        bounds.append(len(self))
+
+        return [
+            (start, stop)
+            for start, stop in itertools.pairwise(bounds)
+            if self.count(start, stop)
+        ]
 
-    # Unique listings are not equal to each other: F != G
-    for unique in itertools.combinations(uniques, 2):
-        yield _format_non_duplicates(unique[0], unique[1])
 
+def _csv_field(value: str) -> str:
+    """Quote a field like `csv.writer` does by default."""
+    if any(char in value for char in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
 
-def select_labels(
-    labels: list[list[str]], randomize: bool
-) -> tuple[list[list[str]], list[str]]:
+    return value
+
+
+def _write_non_duplicate_rows(
+    output: IO[str], negatives: NonDuplicates, start: int, stop: int
+) -> None:
     """
-    Given a list of duplicates that contains the following links:
-        A <-> B <-> X
-        C <-> D
-        E <-> F
-        G <-> H
+    Write the rows from `start` to `stop`. The listings are quoted once,
+    and the pairs of each row are joined into a single string.
+    """
+    fields: list[str] = [_csv_field(uri) for uri in negatives.items]
+    tails: list[str] = [field + ",0\r\n" for field in fields]
+    for i in range(start, stop):
+        if negatives.ends[i] < len(negatives):
+            first: str = "-," + fields[i] + ","
+            output.write(first + first.join(tails[negatives.ends[i] :]))
+
 
-    Remove some of the duplicates to ensure the output
-    contains both duplicated and unique listings.
+def _write_non_duplicate_part(
+    negatives: NonDuplicates, start: int, stop: int, file_path: str
+) -> str:
+    """Write the rows from `start` to `stop` to a part file."""
+    with open(file_path, "w", buffering=BUFFER_SIZE) as f:
+        _write_non_duplicate_rows(f, negatives, start, stop)
 
-    If `randomize` is True, the label selection will be randomized.
-    Otherwise, the first half of the labels will be selected.
+    return file_path
+
+
+def write_non_duplicates(
+    output: IO[str], negatives: NonDuplicates, jobs: int = 1
+) -> None:
+    """
+    Write every non-duplicated pair to `output`, in the format and the
+    order of `format_non_duplicates`.
 
-    Return a list of links that contains (e.g.) the following links:
-        A <-> B <-> X
-        E <-> F
+    If `jobs` is greater than 1, the rows are split in as many ranges,
+    which worker processes write to part files next to `output` that are
+    then appended to it in order.
     """
-    if randomize:
-        random.shuffle(labels)
-        uniques: list[str] = [
-            random.choice(dups) for dups in labels[len(labels) // 2 :]
+    if jobs <= 1:
+        _write_non_duplicate_rows(output, negatives, 0, len(negatives))
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        futures = [
+            executor.submit(
+                _write_non_duplicate_part,
+                negatives,
+                start,
+                stop,
+                f"{output.name}.part{i}",
+            )
+            for i, (start, stop) in enumerate(negatives.partition(jobs))
         ]
-    else:
-        uniques: list[str] = [dups[0] for dups in labels[len(labels) // 2 :]]
+        for future in futures:
+            part: str = future.result()
+            with open(part, "r", newline="") as f:
+                shutil.copyfileobj(f, output, BUFFER_SIZE)
+            os.remove(part)
+
+
+class LabelsFile:
+    """
+    The clusters of duplicates of a labels file, one per line with its
+    listings separated by ";", read as they are iterated.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path: str = file_path
+
+    def __iter__(self) -> Iterator[list[str]]:
+        with open(self.file_path, "r") as f:
+            for row in csv.reader(f):
+                yield row[0].split(";")
 
-    return labels[: len(labels) // 2], uniques
+
+def site_combination(dups: list[str]) -> str:
+    """
+    Given a cluster of duplicates like the following:
+        [ ...#listing_site3_1, ...#listing_site1_2, ...#listing_site3_3 ]
+
+    Return the combination of source sites of its listings:
+        "site1-site3"
+    """
+    return "-".join(
+        sorted(
+            {
+                match.group(1) if (match := SITE.search(uri)) else "unknown"
+                for uri in dups
+            }
+        )
+    )
+
+
+def sample_labels(
+    labels: Iterable[list[str]],
+    ratio: float = 0.5,
+    randomize: bool = True,
+    seed: Optional[int] = None,
+    stratify: bool = False,
+) -> tuple[list[list[str]], list[str]]:
+    """
+    Keep a `ratio` of the clusters of duplicates and a unique listing
+    from each of the rest, in a single pass over the labels.
+
+    The clusters are selected with the sequential pivotal method: a
+    single cluster is pending, holding the probability left by the
+    clusters seen, and each new cluster settles it against the pending
+    one, so that one of both is kept, or dropped, and the other becomes
+    the pending one. Every cluster is kept with probability `ratio`, and
+    `ratio` times the number of clusters, rounded up or down, are kept.
+    If `stratify` is True, every combination of source sites has its own
+    pending cluster, so that it keeps its share. Besides the output, a
+    single cluster per combination is held in memory.
+
+    If `randomize` is False, the first `ratio` of the clusters, rounded
+    down, are kept, with the first listing of each of the rest as the
+    unique one. As the share only grows with the clusters seen, the
+    oldest clusters not kept yet are kept as it does; the rest are held
+    until the end.
+
+    Return the kept clusters and the unique listings, e.g.:
+        [ [ A, B, X ], [ E, F ] ], [ C, G ]
+    """
+    stratum = site_combination if stratify else (lambda dups: "")
+    rng: Optional[random.Random] = random.Random(seed) if randomize else None
+    duplicates: list[list[str]] = []
+    uniques: list[str] = []
+
+    def settle(dups: list[str], keep: bool) -> None:
+        if keep:
+            duplicates.append(dups)
+        else:
+            uniques.append(rng.choice(dups) if rng else dups[0])
+
+    if rng is None:
+        seen: collections.Counter = collections.Counter()
+        # The clusters of each stratum that are not kept yet, in order.
+        waiting: dict[str, collections.deque] = {}
+        for dups in labels:
+            key: str = stratum(dups)
+            seen[key] += 1
+            queue: collections.deque = waiting.setdefault(key, collections.deque())
+            queue.append(dups)
+            while len(queue) > seen[key] - math.floor(ratio * seen[key]):
+                settle(queue.popleft(), True)
+
+        for queue in waiting.values():
+            for dups in queue:
+                settle(dups, False)
+
+        return duplicates, uniques
+
+    # The pending cluster of each stratum and its probability of being kept.
+    pending: dict[str, tuple[list[str], float]] = {}
+    for dups in labels:
+        key = stratum(dups)
+        if key not in pending:
+            pending[key] = (dups, ratio)
+            continue
+
+        other, weight = pending[key]
+        total: float = weight + ratio
+        if total < 1:
+            # One of both is dropped, and the other takes its probability.
+            if rng.random() * total < ratio:
+                settle(other, False)
+                pending[key] = (dups, total)
+            else:
+                settle(dups, False)
+                pending[key] = (other, total)
+        elif rng.random() * (2 - total) < 1 - ratio:
+            # One of both is kept, and the other takes what is left.
+            settle(other, True)
+            pending[key] = (dups, total - 1)
+        else:
+            settle(dups, True)
+            pending[key] = (other, total - 1)
+
+    for dups, weight in pending.values():
+        settle(dups, rng.random() < weight)
+
+    return duplicates, uniques
 
 
 def read_args() -> argparse.Namespace:
@@ -200,6 +473,47 @@ def read_args() -> argparse.Namespace:
         help="randomize the data selection",
     )
 
+    parser.add_argument(
+        "--ratio",
+        default=0.5,
+        help="fraction of the clusters of duplicates to keep",
+        type=float,
+    )
+    parser.add_argument(
+        "--seed",
+        default=None,
+        help="seed of the random data selection",
+        type=int,
+    )
+    parser.add_argument(
+        "--stratify",
+        action="store_true",
+        help="keep the ratio within each combination of source sites",
+    )
+
+    parser.add_argument(
+        "--all-non-duplicates",
+        action="store_true",
+        help="write every non-duplicated pair to the output labels file",
+    )
+    parser.add_argument(
+        "--spread-non-duplicates",
+        action="store_true",
+        help="pick the non-duplicated pairs from every listing, instead of the first ones",
+    )
+    parser.add_argument(
+        "--count-non-duplicates",
+        action="store_true",
+        help="print the number of non-duplicated pairs and write nothing",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=1,
+        help="worker processes that write the non-duplicated pairs",
+        type=int,
+    )
+
     parser.add_argument(
         "--input-labels",
         default="input/labels.csv",
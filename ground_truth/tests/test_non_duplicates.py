@@ -0,0 +1,112 @@
+import csv
+import itertools
+import os
+import random
+import tempfile
+import unittest
+
+from src.gt import NonDuplicates, write_non_duplicates
+
+
+class TestNonDuplicates(unittest.TestCase):
+    """
+    Test suite for the enumeration of every non-duplicated pair
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up clusters of different sizes and some unique listings
+        """
+        self.duplicates = [["A", "B", "C"], ["D", "E"], ["H", "I", "J", "K"]]
+        self.uniques = ["F", "G", 'L,"1"']
+        self.negatives = NonDuplicates(self.duplicates, self.uniques)
+
+        cluster = {uri: i for i, dups in enumerate(self.duplicates) for uri in dups}
+        self.expected = {
+            frozenset(pair)
+            for pair in itertools.combinations(
+                list(itertools.chain.from_iterable(self.duplicates)) + self.uniques, 2
+            )
+            if pair[0] not in cluster or cluster[pair[0]] != cluster.get(pair[1])
+        }
+
+    def test_every_pair_once(self):
+        """
+        Test that every non-duplicated pair is enumerated exactly once
+        """
+        pairs = [frozenset(pair) for pair in self.negatives]
+
+        self.assertEqual(len(pairs), len(self.expected))
+        self.assertEqual(set(pairs), self.expected)
+
+    def test_count(self):
+        """
+        Test that the pairs are counted exactly, in total and per row range
+        """
+        self.assertEqual(self.negatives.count(), len(self.expected))
+        self.assertEqual(
+            self.negatives.count(2, 7), len(list(self.negatives.rows(2, 7)))
+        )
+        self.assertEqual(NonDuplicates([], []).count(), 0)
+
+    def test_sample(self):
+        """
+        Test that sampled pairs are distinct non-duplicated pairs
+        spread across the rows, not the pairs of the first listing
+        """
+        pairs = list(self.negatives)
+        for rng in (None, random.Random(7)):
+            sample = list(self.negatives.sample(5, rng))
+
+            self.assertEqual(len(set(sample)), 5)
+            self.assertLessEqual({frozenset(pair) for pair in sample}, self.expected)
+            self.assertGreater(len({first for first, _ in sample}), 2)
+            self.assertEqual(sample, sorted(sample, key=pairs.index))
+
+        self.assertEqual(
+            [pairs.index(pair) for pair in self.negatives.sample(4)], [7, 21, 35, 49]
+        )
+        self.assertEqual(list(self.negatives.sample(100)), pairs)
+        self.assertEqual(list(NonDuplicates([], []).sample(3)), [])
+
+    def test_partition(self):
+        """
+        Test that the row ranges cover every row with balanced counts
+        """
+        ranges = self.negatives.partition(3)
+
+        self.assertLessEqual(len(ranges), 3)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(self.negatives))
+        for (_, stop), (start, _) in itertools.pairwise(ranges):
+            self.assertEqual(stop, start)
+        self.assertEqual(
+            sum(self.negatives.count(start, stop) for start, stop in ranges),
+            self.negatives.count(),
+        )
+
+    def test_write_in_parallel(self):
+        """
+        Test that worker processes write the same file as a single one
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            contents = []
+            for jobs in (1, 2):
+                file_path = os.path.join(directory, f"labels{jobs}.csv")
+                with open(file_path, "w") as f:
+                    f.write("+,A,B,0\n")
+                    write_non_duplicates(f, self.negatives, jobs)
+                with open(file_path, "r", newline="") as f:
+                    contents.append(f.read())
+            self.assertEqual(
+                sorted(os.listdir(directory)), ["labels1.csv", "labels2.csv"]
+            )
+
+        self.assertEqual(contents[0], contents[1])
+        rows = list(csv.reader(contents[0].splitlines()))
+        self.assertEqual(rows[0], ["+", "A", "B", "0"])
+        self.assertEqual({frozenset(row[1:3]) for row in rows[1:]}, self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
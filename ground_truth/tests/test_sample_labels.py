@@ -0,0 +1,99 @@
+import collections
+import unittest
+
+from src.gt import sample_labels, site_combination
+
+PREFIX = "https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_"
+
+
+class TestSampleLabels(unittest.TestCase):
+    """
+    Test suite for the sample_labels function in gt.py
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test case with clusters of two site combinations
+        """
+        self.labels = [
+            [f"{PREFIX}site1_{i}a", f"{PREFIX}site2_{i}b"] for i in range(60)
+        ] + [[f"{PREFIX}site3_{i}a", f"{PREFIX}site3_{i}b"] for i in range(40)]
+
+    def test_site_combination(self):
+        """
+        Test that the combination has the distinct sites, sorted
+        """
+        self.assertEqual(
+            site_combination([f"{PREFIX}site3_1", f"{PREFIX}site1_2", "other"]),
+            "site1-site3-unknown",
+        )
+
+    def test_sample_labels_deterministic(self):
+        """
+        Test that the deterministic selection keeps the first half of the
+        clusters, in a single pass
+        """
+        labels = [
+            ["A", "B", "C"],
+            ["D", "E"],
+            ["F", "G", "H", "I"],
+            ["J", "K", "L"],
+            ["M", "N"],
+        ]
+
+        self.assertEqual(
+            sample_labels(iter(labels), randomize=False),
+            ([["A", "B", "C"], ["D", "E"]], ["F", "J", "M"]),
+        )
+        self.assertEqual(
+            sample_labels(iter(labels), 0.8, randomize=False),
+            (labels[:4], ["M"]),
+        )
+
+    def test_sample_labels_single_pass(self):
+        """
+        Test that the labels are read once, so they can be streamed, that
+        the kept share is rounded either way and that every cluster has
+        the same chance of being kept
+        """
+        for ratio in (0.1, 0.37, 0.5, 0.9):
+            duplicates, uniques = sample_labels(iter(self.labels), ratio, seed=3)
+            self.assertIn(len(duplicates), (int(ratio * 100), int(ratio * 100) + 1))
+            self.assertEqual(len(duplicates) + len(uniques), 100)
+
+        kept = collections.Counter()
+        for seed in range(2000):
+            duplicates, _ = sample_labels(iter(self.labels[:10]), 0.3, seed=seed)
+            kept.update(dups[0] for dups in duplicates)
+        for dups in self.labels[:10]:
+            self.assertAlmostEqual(kept[dups[0]] / 2000, 0.3, delta=0.05)
+
+    def test_sample_labels_random(self):
+        """
+        Test that each cluster is either kept or has a unique listing,
+        and that the same seed gives the same selection
+        """
+        duplicates, uniques = sample_labels(self.labels, 0.3, seed=7)
+
+        self.assertEqual(len(duplicates), 30)
+        self.assertEqual(len(uniques), 70)
+        for dups in self.labels:
+            kept = dups in duplicates
+            self.assertNotEqual(kept, any(uri in uniques for uri in dups))
+
+        self.assertEqual(sample_labels(self.labels, 0.3, seed=7), (duplicates, uniques))
+
+    def test_sample_labels_stratified(self):
+        """
+        Test that each site combination keeps its share of clusters
+        """
+        duplicates, _ = sample_labels(self.labels, 0.25, seed=1, stratify=True)
+
+        self.assertEqual(
+            collections.Counter(map(site_combination, duplicates)),
+            {"site1-site2": 15, "site3": 10},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
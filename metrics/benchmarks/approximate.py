@@ -0,0 +1,81 @@
+"""
+Validate the approximate metrics against the exact ones on synthetic
+pairs files, reporting the error, the bounds and the time taken.
+
+Usage (from the `metrics` directory):
+    python -m benchmarks.approximate [-n PAIRS] [-m 1 4 16]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.sharded import write_pairs
+from src.metrics import (
+    calculate_confusion_matrix,
+    calculate_metrics,
+    read_pairs_from_file,
+)
+from src.sketches import (
+    RowsFromFile,
+    approximate_metrics,
+    estimate_counts,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--pairs", type=int, default=1_000_000)
+    parser.add_argument(
+        "-m", "--memory", type=int, nargs="+", default=[1, 4, 16], help="MiB"
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    ids = 4 * args.pairs
+    true_pairs = [(rng.randrange(ids), rng.randrange(ids)) for _ in range(args.pairs)]
+    algorithm_pairs = rng.sample(true_pairs, args.pairs // 2) + [
+        (rng.randrange(ids), rng.randrange(ids)) for _ in range(args.pairs // 2)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        true_file = os.path.join(directory, "true.csv")
+        algorithm_file = os.path.join(directory, "algorithm.csv")
+        write_pairs(true_file, true_pairs)
+        write_pairs(algorithm_file, algorithm_pairs)
+
+        start = time.perf_counter()
+        exact = calculate_metrics(
+            calculate_confusion_matrix(
+                read_pairs_from_file(true_file), read_pairs_from_file(algorithm_file)
+            )
+        )
+        baseline = time.perf_counter() - start
+
+        print(f"{args.pairs} pairs per file")
+        print(
+            f"{'mode':<10} {'seconds':>8} {'metric':<10} {'value':>7} {'error':>7} {'bounds':>17}"
+        )
+        for name, value in zip(exact._fields, exact):
+            print(f"{'exact':<10} {baseline:>8.2f} {name:<10} {value:>7.4f}")
+
+        for memory in args.memory:
+            start = time.perf_counter()
+            counts = estimate_counts(
+                RowsFromFile(true_file), RowsFromFile(algorithm_file), memory * 2**20
+            )
+            metrics = approximate_metrics(counts)
+            elapsed = time.perf_counter() - start
+            for name, value, estimate in zip(exact._fields, exact, metrics):
+                inside = estimate.low <= value <= estimate.high
+                print(
+                    f"{f'{memory} MiB':<10} {elapsed:>8.2f} {name:<10}"
+                    f" {estimate.value:>7.4f} {estimate.value - value:>+7.4f}"
+                    f" [{estimate.low:.4f}, {estimate.high:.4f}]{'' if inside else ' !'}"
+                )
+
+
+if __name__ == "__main__":
+    main()
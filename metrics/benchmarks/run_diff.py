@@ -0,0 +1,112 @@
+"""
+Benchmark the diff of two runs against set differences of the pairs
+read by `read_pairs_from_file`, on synthetic pairs files.
+
+Each mode is timed, and then run again to trace its peak memory, since
+tracing slows it down.
+
+Usage (from the `metrics` directory):
+    python -m benchmarks.run_diff [-n PAIRS]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from src.metrics import read_pairs_from_file
+from src.run_diff import PairCodec, diff_runs, read_keys, write_changes
+
+from .sharded import write_pairs
+
+
+def with_sets(files: dict[str, str]) -> list[int]:
+    """Count the changes with set differences of the pairs of each run."""
+    true_pos = read_pairs_from_file(files["true"])
+    old_pos = read_pairs_from_file(files["old"])
+    new_pos = read_pairs_from_file(files["new"])
+    gained, lost = new_pos - old_pos, old_pos - new_pos
+    return [
+        len(gained & true_pos),
+        len(gained - true_pos),
+        len(lost & true_pos),
+        len(lost - true_pos),
+    ]
+
+
+def with_merge(files: dict[str, str]) -> list[int]:
+    """Count the changes with the sorted merge, writing them to a file."""
+    codec = PairCodec()
+    changes = diff_runs(
+        read_keys(files["true"], codec),
+        read_keys(files["old"], codec),
+        read_keys(files["new"], codec),
+    )
+    with open(files["diff"], "w", newline="") as f:
+        write_changes(f, codec, changes)
+
+    return [len(keys) for keys in changes.values()]
+
+
+def measure(mode: Callable, files: dict[str, str]) -> tuple[list[int], float, int]:
+    """Return the result of a mode, its seconds and its peak bytes."""
+    start = time.perf_counter()
+    result = mode(files)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    mode(files)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--pairs", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    ids = 4 * args.pairs
+    true_pairs = [(rng.randrange(ids), rng.randrange(ids)) for _ in range(args.pairs)]
+    old_pairs = rng.sample(true_pairs, args.pairs // 2) + [
+        (rng.randrange(ids), rng.randrange(ids)) for _ in range(args.pairs // 2)
+    ]
+    # The new run keeps 90% of the links of the old one, and finds others.
+    new_pairs = (
+        rng.sample(old_pairs, 9 * args.pairs // 10)
+        + rng.sample(true_pairs, args.pairs // 20)
+        + [(rng.randrange(ids), rng.randrange(ids)) for _ in range(args.pairs // 20)]
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = {
+            name: os.path.join(directory, f"{name}.csv")
+            for name in ("true", "old", "new", "diff")
+        }
+        for name, pairs in (
+            ("true", true_pairs),
+            ("old", old_pairs),
+            ("new", new_pairs),
+        ):
+            write_pairs(files[name], pairs)
+
+        expected, *sets = measure(with_sets, files)
+        found, *merge = measure(with_merge, files)
+        assert found == expected, f"{found} != {expected}"
+
+        print(f"{args.pairs} pairs per file, {sum(found)} changed links")
+        print(f"{'mode':<16} {'seconds':>8} {'peak MiB':>9}")
+        for mode, (elapsed, peak) in (
+            ("set differences", sets),
+            ("sorted merge", merge),
+        ):
+            print(f"{mode:<16} {elapsed:>8.2f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
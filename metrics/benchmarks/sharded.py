@@ -0,0 +1,73 @@
+"""
+Benchmark the sharded confusion matrix computation against the single
+process one, on synthetic pairs files.
+
+Usage (from the `metrics` directory):
+    python -m benchmarks.sharded [-n PAIRS] [-w 1 2 4 8 16]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.metrics import calculate_confusion_matrix, read_pairs_from_file
+from src.sharded import calculate_confusion_matrix_sharded
+
+PREFIX: str = (
+    "https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_site"
+)
+
+
+def write_pairs(path: str, pairs: list[tuple[int, int]]) -> None:
+    """Write pairs of synthetic listing URIs to a CSV file."""
+    with open(path, "w") as f:
+        for first, second in pairs:
+            f.write(
+                f"{PREFIX}{first % 3 + 1}_{first},{PREFIX}{second % 3 + 1}_{second}\n"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--pairs", type=int, default=1_000_000)
+    parser.add_argument(
+        "-w", "--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16]
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    ids = 4 * args.pairs
+    true_pairs = [(rng.randrange(ids), rng.randrange(ids)) for _ in range(args.pairs)]
+    algorithm_pairs = rng.sample(true_pairs, args.pairs // 2) + [
+        (rng.randrange(ids), rng.randrange(ids)) for _ in range(args.pairs // 2)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        true_file = os.path.join(directory, "true.csv")
+        algorithm_file = os.path.join(directory, "algorithm.csv")
+        write_pairs(true_file, true_pairs)
+        write_pairs(algorithm_file, algorithm_pairs)
+
+        start = time.perf_counter()
+        expected = calculate_confusion_matrix(
+            read_pairs_from_file(true_file), read_pairs_from_file(algorithm_file)
+        )
+        baseline = time.perf_counter() - start
+
+        print(f"{os.cpu_count()} CPUs, {args.pairs} pairs per file")
+        print(f"{'mode':<16} {'seconds':>8} {'speedup':>8}")
+        print(f"{'single process':<16} {baseline:>8.2f} {1:>8.2f}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            cm = calculate_confusion_matrix_sharded(true_file, algorithm_file, workers)
+            elapsed = time.perf_counter() - start
+            assert cm == expected, f"{cm} != {expected}"
+            print(
+                f"{f'{workers} workers':<16} {elapsed:>8.2f} {baseline / elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
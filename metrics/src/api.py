@@ -0,0 +1,204 @@
+"""
+In-process API to measure the precision, recall, and F1-score of many
+candidate link sets against the same true positive matches.
+
+Build a `TruthIndex` once and score candidate link sets with it. IDs are
+interned into integers and each pair is encoded as a single 64-bit key,
+so scoring is done with NumPy set operations instead of Python sets.
+
+Example:
+    index = TruthIndex(read_pairs_from_file("true.csv"))
+    cms = index.score_many([links_a, links_b, links_c])
+    metrics = calculate_metrics_batch(cms)
+"""
+
+from collections.abc import Iterable
+from typing import Optional
+
+import numpy as np
+
+from .metrics import ConfusionMatrix
+
+# Candidate links: an iterable of ID pairs, an (n, 2) array of string IDs
+# or an (n, 2) array of IDs interned by the index.
+Links = Iterable[Iterable[str]] | np.ndarray
+
+
+class TruthIndex:
+    """
+    An index of the true positive matches, reusable across evaluations.
+    """
+
+    def __init__(self, true_pos: Links) -> None:
+        """
+        Intern the IDs of the true positive matches and encode them.
+
+        Args:
+            true_pos (Links): the true positive matches.
+        """
+        self.ids: dict[str, int] = {}
+        self.keys: np.ndarray = np.unique(self.encode(true_pos, self.ids))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def intern(
+        self,
+        links: Iterable[Iterable[str]] | np.ndarray,
+        unknown: Optional[dict[str, int]] = None,
+    ) -> np.ndarray:
+        """
+        Map the IDs of some links to integers.
+
+        IDs that are not in the true positive matches get integers after
+        those of the index, in `unknown`, which is new for each call
+        unless given. The index itself is never changed, so scoring many
+        candidates does not grow it, and arrays interned by separate
+        calls must not be scored together.
+
+        Args:
+            links (Iterable[Iterable[str]] | np.ndarray): pairs of IDs.
+            unknown (Optional[dict[str, int]]): the integers of the IDs
+                that are not in the index, which are added to it.
+
+        Returns:
+            np.ndarray: an (n, 2) array of interned IDs. A pair with a
+            single ID, such as a frozenset of a self-link, is mapped to
+            a pair of equal IDs.
+        """
+        known: dict[str, int] = self.ids
+        unknown = {} if unknown is None else unknown
+        # The index interns its own IDs into `self.ids` when it is built.
+        offset: int = 0 if unknown is known else len(known)
+
+        def code(id: str) -> int:
+            number = known.get(id)
+            if number is None:
+                number = unknown.setdefault(id, offset + len(unknown))
+            return number
+
+        interned: list[int] = []
+        for link in links:
+            link = list(link)
+            first: int = code(link[0])
+            interned.append(first)
+            interned.append(code(link[-1]) if link[1:] else first)
+
+        return np.array(interned, dtype=np.int64).reshape(-1, 2)
+
+    def encode(
+        self, links: Links, unknown: Optional[dict[str, int]] = None
+    ) -> np.ndarray:
+        """
+        Encode each link as a single integer that does not depend on the
+        orientation of the link.
+
+        Args:
+            links (Links): the links to encode. Integer arrays must hold
+                IDs interned by a single call to `intern`.
+            unknown (Optional[dict[str, int]]): as in `intern`.
+
+        Returns:
+            np.ndarray: a 1-D array with the key of each link.
+        """
+        if not (isinstance(links, np.ndarray) and links.dtype.kind in "iu"):
+            links = self.intern(links, unknown)
+
+        links = np.asarray(links, dtype=np.int64).reshape(-1, 2)
+        return (np.minimum(links[:, 0], links[:, 1]) << 32) | np.maximum(
+            links[:, 0], links[:, 1]
+        )
+
+    def score(self, algorithm_pos: Links) -> ConfusionMatrix:
+        """
+        Calculate the confusion matrix of a candidate link set.
+
+        Args:
+            algorithm_pos (Links): the algorithm positive matches.
+                Repeated links are counted once.
+
+        Returns:
+            ConfusionMatrix: the confusion matrix as a namedtuple with
+            tp, fp, fn.
+        """
+        keys: np.ndarray = np.unique(self.encode(algorithm_pos))
+        tp = int(np.isin(keys, self.keys, assume_unique=True).sum())
+        return ConfusionMatrix(tp=tp, fp=len(keys) - tp, fn=len(self.keys) - tp)
+
+    def score_many(self, candidates: Iterable[Links]) -> np.ndarray:
+        """
+        Calculate the confusion matrices of many candidate link sets.
+
+        Args:
+            candidates (Iterable[Links]): the candidate link sets.
+
+        Returns:
+            np.ndarray: a (k, 3) array with the tp, fp and fn of each
+            candidate link set.
+        """
+        return np.array(
+            [self.score(algorithm_pos) for algorithm_pos in candidates],
+            dtype=np.int64,
+        ).reshape(-1, 3)
+
+    def score_thresholds(
+        self, links: Links, scores: np.ndarray, thresholds: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate the confusion matrices of the link sets obtained by
+        keeping the candidate links scored at or above each threshold.
+
+        Args:
+            links (Links): the candidate links, without repetitions.
+            scores (np.ndarray): the score of each candidate link.
+            thresholds (np.ndarray): the thresholds to evaluate.
+
+        Returns:
+            np.ndarray: a (k, 3) array with the tp, fp and fn of each
+            threshold.
+        """
+        keys: np.ndarray = self.encode(links)
+        order: np.ndarray = np.argsort(-np.asarray(scores), kind="stable")
+        sorted_scores: np.ndarray = -np.asarray(scores)[order]
+
+        # Number of true links among the n best scored candidates.
+        found: np.ndarray = np.concatenate(
+            ([0], np.cumsum(np.isin(keys[order], self.keys)))
+        )
+        kept: np.ndarray = np.searchsorted(
+            sorted_scores, -np.asarray(thresholds), side="right"
+        )
+        tp: np.ndarray = found[kept]
+        return np.stack([tp, kept - tp, len(self.keys) - tp], axis=-1)
+
+
+def calculate_metrics_batch(cms: np.ndarray) -> np.ndarray:
+    """
+    Calculate precision, recall and F1-score of many confusion matrices
+    at once.
+
+    Args:
+        cms (np.ndarray): an (..., 3) array of confusion matrices, with
+            tp, fp and fn in the last axis.
+
+    Returns:
+        np.ndarray: an (..., 3) array with the precision, recall and
+        F1-score of each confusion matrix, which are 0.0 when undefined,
+        as in `calculate_metrics`.
+    """
+    cms = np.asarray(cms, dtype=np.float64)
+    tp, fp, fn = cms[..., 0], cms[..., 1], cms[..., 2]
+
+    def divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        return np.divide(
+            numerator,
+            denominator,
+            out=np.zeros_like(numerator),
+            where=denominator > 0,
+        )
+
+    precision = divide(tp, tp + fp)
+    recall = divide(tp, tp + fn)
+    f1_score = divide(2 * precision * recall, precision + recall)
+
+    return np.stack([precision, recall, f1_score], axis=-1)
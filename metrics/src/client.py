@@ -0,0 +1,157 @@
+"""
+Client of the evaluation server, with the same flags as `metrics.py`.
+
+The true positives file names a truth loaded by the server. The
+algorithm positives file is read by the server, if it is under the root
+directory of the server, or uploaded with `--upload` otherwise. When the
+server rejects a request, the error it gives is shown.
+
+Usage (from the `metrics` directory):
+    python -m src.client -t data/true.csv -a algorithm.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from .metrics import ConfusionMatrix, Metrics, print_metrics
+
+
+def evaluate(
+    url: str,
+    algorithm_positives_file: str,
+    truth: Optional[str] = None,
+    upload: bool = False,
+) -> tuple[ConfusionMatrix, Metrics]:
+    """
+    Ask the evaluation server to evaluate algorithm positive matches.
+
+    Args:
+        url (str): the URL of the server.
+        algorithm_positives_file (str): path to the file with the
+            algorithm positive matches.
+        truth (Optional[str]): the name of the truth to evaluate against,
+            or None if the server has a single one.
+        upload (bool): whether to send the file contents instead of its
+            path.
+
+    Returns:
+        tuple[ConfusionMatrix, Metrics]: the confusion matrix and the
+        metrics computed by the server.
+    """
+    query: dict[str, str] = {} if truth is None else {"truth": truth}
+    if upload:
+        with open(algorithm_positives_file, "rb") as f:
+            body: bytes = f.read()
+    else:
+        query["algorithm_positives_file"] = os.path.abspath(algorithm_positives_file)
+        body = b""
+
+    request = urllib.request.Request(
+        f"{url}/evaluate?{urlencode(query)}",
+        data=body,
+        method="POST",
+        headers={"Content-Type": "text/csv"},
+    )
+    with urllib.request.urlopen(request) as response:
+        result: dict[str, Any] = json.load(response)
+
+    return ConfusionMatrix(**result["confusion_matrix"]), Metrics(**result["metrics"])
+
+
+def error_message(error: urllib.error.HTTPError) -> str:
+    """
+    Return the error given by the server in the body of a response.
+
+    Args:
+        error (urllib.error.HTTPError): the error response.
+
+    Returns:
+        str: the status of the response and the `error` of its JSON
+        body, or the body itself if it has none.
+    """
+    body: str = error.read().decode(errors="replace")
+    try:
+        body = json.loads(body)["error"]
+    except (ValueError, TypeError, KeyError):
+        pass
+
+    return f"{error.code} {error.reason}: {body}"
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Calculates precision, recall and f1-score with a running evaluation server"
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=str,
+        default=None,
+        help="name of the truth loaded by the server; optional if it has a single one",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the algorithm positive matches",
+    )
+    parser.add_argument(
+        "-u",
+        "--url",
+        type=str,
+        default="http://127.0.0.1:8642",
+        help="URL of the evaluation server",
+    )
+    parser.add_argument(
+        "--upload",
+        action="store_true",
+        help="send the algorithm positive matches instead of their path",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    if not os.path.exists(args.algorithm_positives_file):
+        raise argparse.ArgumentTypeError(
+            f"File {args.algorithm_positives_file} does not exist"
+        )
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    try:
+        cm, metrics = evaluate(
+            args.url,
+            args.algorithm_positives_file,
+            args.true_positives_file,
+            args.upload,
+        )
+    except urllib.error.HTTPError as error:
+        print(f"The server could not evaluate: {error_message(error)}", file=sys.stderr)
+        sys.exit(1)
+    except urllib.error.URLError as error:
+        print(
+            f"Could not reach the server at {args.url}: {error.reason}", file=sys.stderr
+        )
+        sys.exit(1)
+
+    print_metrics(cm, metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Module to export the errors of a duplicate detection algorithm, i.e.
+its false positive and false negative matches, side by side with the
+attributes of both listings of each match.
+
+The listings are looked up in the data file through a byte-offset index
+keyed by `uri`, so the data file is never loaded into memory.
+
+Usage (from the `metrics` directory):
+    python -m src.error_analysis -t true.csv -a algorithm.csv -d data.csv -o errors.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+from collections.abc import Iterator
+from typing import IO, Any, Optional
+
+from .metrics import read_pairs_from_file
+
+
+class RecordIndex:
+    """
+    A byte-offset index over a CSV data file, keyed by the values of one
+    of its columns.
+
+    Only the offset of each record is kept in memory. Records are read
+    from the file when they are looked up.
+    """
+
+    def __init__(self, file_path: str, key: str = "uri") -> None:
+        """
+        Index a data file in a single pass.
+
+        Args:
+            file_path (str): path to a CSV data file with a header row.
+            key (str): the column to index the records by.
+        """
+        self.file: IO[bytes] = open(file_path, "rb")
+        self.fieldnames: list[str] = self._parse(self._read_record())
+        self.offsets: dict[str, int] = {}
+
+        column: int = self.fieldnames.index(key)
+        while True:
+            offset: int = self.file.tell()
+            record: bytes = self._read_record()
+            if not record:
+                break
+
+            if record.strip():
+                self.offsets[self._parse(record)[column]] = offset
+
+    def __enter__(self) -> "RecordIndex":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, key: str) -> dict[str, str]:
+        self.file.seek(self.offsets[key])
+        return dict(zip(self.fieldnames, self._parse(self._read_record())))
+
+    def get(self, key: str) -> Optional[dict[str, str]]:
+        """
+        Return the record with the given key, or None if there is none.
+
+        Args:
+            key (str): the key of the record.
+        """
+        return self[key] if key in self.offsets else None
+
+    def close(self) -> None:
+        """Close the data file."""
+        self.file.close()
+
+    def _read_record(self) -> bytes:
+        """
+        Read the record at the current position of the file, which may
+        span several lines if it has quoted line breaks.
+        """
+        record: bytes = self.file.readline()
+        while record.count(b'"') % 2:
+            line: bytes = self.file.readline()
+            if not line:
+                break
+            record += line
+
+        return record
+
+    @staticmethod
+    def _parse(record: bytes) -> list[str]:
+        return next(csv.reader(io.StringIO(record.decode("utf-8"))))
+
+
+def error_pairs(
+    true_pos: set[frozenset[str]], algorithm_pos: set[frozenset[str]]
+) -> Iterator[tuple[str, str, str]]:
+    """
+    Yield the false positive and false negative matches, sorted.
+
+    Args:
+        true_pos (set): a set with the true positive matches.
+        algorithm_pos (set): a set with the algorithm positive matches.
+
+    Yields:
+        tuple[str, str, str]: the kind of error ("fp" or "fn") and the
+        IDs of the match.
+    """
+    for error, pairs in (
+        ("fp", algorithm_pos - true_pos),
+        ("fn", true_pos - algorithm_pos),
+    ):
+        for pair in sorted(sorted(pair) for pair in pairs):
+            yield error, pair[0], pair[-1]
+
+
+def diff_records(
+    first: Optional[dict[str, str]], second: Optional[dict[str, str]]
+) -> dict[str, tuple[Optional[str], Optional[str]]]:
+    """
+    Compare the attributes of two records.
+
+    Args:
+        first (Optional[dict[str, str]]): a record, or None if missing.
+        second (Optional[dict[str, str]]): another record, or None if
+            missing.
+
+    Returns:
+        dict: the attributes whose values differ, mapped to the values
+        of both records.
+    """
+    first, second = first or {}, second or {}
+    return {
+        field: (first.get(field), second.get(field))
+        for field in sorted(first.keys() | second.keys())
+        if field != "uri" and first.get(field) != second.get(field)
+    }
+
+
+def write_errors(
+    output: IO[str],
+    errors: Iterator[tuple[str, str, str]],
+    records: RecordIndex,
+    output_format: str = "csv",
+    diff: bool = False,
+) -> int:
+    """
+    Write the errors joined with the attributes of both records.
+
+    In CSV, each attribute of the data file gets two columns, suffixed
+    with "_1" and "_2", and the optional "diff" column lists the
+    attributes that differ. In JSONL, each line has the kind of error,
+    both IDs, both records and an optional "diff" object.
+
+    Args:
+        output (IO[str]): the file to write to.
+        errors (Iterator[tuple[str, str, str]]): the errors, as yielded
+            by `error_pairs`.
+        records (RecordIndex): the index of the data file.
+        output_format (str): either "csv" or "jsonl".
+        diff (bool): whether to add the differences between the records.
+
+    Returns:
+        int: the number of errors written.
+    """
+    fields: list[str] = [field for field in records.fieldnames if field != "uri"]
+    if output_format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(
+            ["error", "id1", "id2"]
+            + [f"{field}_{n}" for field in fields for n in (1, 2)]
+            + (["diff"] if diff else [])
+        )
+
+    written: int = 0
+    for error, id1, id2 in errors:
+        first, second = records.get(id1), records.get(id2)
+
+        if output_format == "csv":
+            writer.writerow(
+                [error, id1, id2]
+                + [
+                    (record or {}).get(field, "")
+                    for field in fields
+                    for record in (first, second)
+                ]
+                + ([";".join(diff_records(first, second))] if diff else [])
+            )
+        else:
+            line: dict[str, Any] = {
+                "error": error,
+                "id1": id1,
+                "id2": id2,
+                "record1": first,
+                "record2": second,
+            }
+            if diff:
+                line["diff"] = diff_records(first, second)
+            output.write(json.dumps(line) + "\n")
+
+        written += 1
+
+    return written
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Exports the false positive and false negative matches with the attributes of both listings"
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the true positive matches",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the algorithm positive matches",
+    )
+    parser.add_argument(
+        "-d",
+        "--data_file",
+        type=str,
+        required=True,
+        help="path to the CSV file with the attributes of each listing",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        type=str,
+        required=True,
+        help="path to the file to write the errors to",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["csv", "jsonl"],
+        default=None,
+        help="output format; inferred from the output file extension by default",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="add the attributes that differ between both listings",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    for file_path in [
+        args.true_positives_file,
+        args.algorithm_positives_file,
+        args.data_file,
+    ]:
+        if not os.path.exists(file_path):
+            raise argparse.ArgumentTypeError(f"File {file_path} does not exist")
+
+    if args.format is None:
+        args.format = "jsonl" if args.output_file.endswith(".jsonl") else "csv"
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    true_positives = read_pairs_from_file(args.true_positives_file)
+    algorithm_positives = read_pairs_from_file(args.algorithm_positives_file)
+
+    with RecordIndex(args.data_file) as records:
+        with open(args.output_file, "w", newline="") as output:
+            written = write_errors(
+                output,
+                error_pairs(true_positives, algorithm_positives),
+                records,
+                args.format,
+                args.diff,
+            )
+
+    print(f"Errors written: {written}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""
+Module to run a duplicate detection tool over repeated trials, measuring
+its runtime and memory together with the quality of its matches.
+
+The tool is run from a command template whose `{name}` placeholders are
+filled in with the given variables, such as the input files of a
+dataset. The template is split into arguments as a shell would before
+they are filled in, so each value is a single argument even if it has
+spaces or quotes, and other braces, such as those of JSON arguments or
+awk scripts, are kept as they are. A tool that cannot be started, such
+as a missing binary, counts as a failed trial. The matches are written to `{output}`, or to the
+standard output if the template does not use it, and compared with the
+true positive matches as in `metrics.py`. Each trial measures the wall
+time, the CPU time and the peak resident set size of the tool, as
+reported by `wait4` for the tool and the processes it waits for.
+
+The summary of the trials of a tool on a dataset is added to a
+comparison table, which has a row per tool and dataset size and is
+replaced when the same tool is run again on a dataset of the same size.
+
+Usage (from the `metrics` directory):
+    python -m src.harness -c "java -jar duke.jar --linkfile={output} {config}" \\
+        -s config=duke.xml -t true.csv --tool duke --size 10000 -f duke \\
+        -n 5 --table results.csv
+"""
+
+import argparse
+import collections
+import contextlib
+import csv
+import itertools
+import os
+import re
+import shlex
+import statistics
+import subprocess
+import tempfile
+import time
+import warnings
+from typing import Any, Optional
+
+from .metrics import (
+    ConfusionMatrix,
+    calculate_confusion_matrix,
+    calculate_metrics,
+    read_pairs_from_file,
+    read_rows,
+)
+
+# A placeholder of a variable in a command template.
+PLACEHOLDER = re.compile(r"\{([A-Za-z_]\w*)\}")
+
+Trial = collections.namedtuple("Trial", ["wall", "cpu", "peak_rss", "returncode"])
+
+FORMATS = ("pairs", "duke", "cluster")
+
+COLUMNS = [
+    "tool",
+    "size",
+    "trials",
+    "failures",
+    "wall_mean",
+    "wall_stdev",
+    "wall_min",
+    "cpu_mean",
+    "peak_rss_mib",
+    "tp",
+    "fp",
+    "fn",
+    "precision",
+    "recall",
+    "f1_score",
+]
+
+
+def run_trial(command: list[str], stdout: Optional[str] = None) -> Trial:
+    """
+    Run a command and measure its resources.
+
+    Args:
+        command (list[str]): the command and its arguments.
+        stdout (Optional[str]): path to the file to write the standard
+            output of the command to, or None to inherit it.
+
+    Returns:
+        Trial: the wall and CPU time, in seconds, the peak resident set
+        size, in bytes, and the return code of the command. If the
+        command cannot be started, its return code is 127 if it does not
+        exist and 126 otherwise, as in a shell, and it used no resources.
+    """
+    with contextlib.ExitStack() as stack:
+        out = stack.enter_context(open(stdout, "w")) if stdout else None
+        start: float = time.perf_counter()
+        try:
+            process = subprocess.Popen(command, stdout=out)
+        except OSError as error:
+            warnings.warn(f"Could not run {command[0]}: {error}")
+            returncode: int = 127 if isinstance(error, FileNotFoundError) else 126
+            return Trial(time.perf_counter() - start, 0.0, 0, returncode)
+
+        _, status, usage = os.wait4(process.pid, 0)
+        wall: float = time.perf_counter() - start
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return Trial(
+        wall=wall,
+        cpu=usage.ru_utime + usage.ru_stime,
+        # ru_maxrss is in KiB on Linux.
+        peak_rss=usage.ru_maxrss * 1024,
+        returncode=process.returncode,
+    )
+
+
+def read_matches(file_path: str, output_format: str) -> set[frozenset[str]]:
+    """
+    Read the matches written by a tool, expanding their CURIEs if the
+    output declares prefixes, whatever its format.
+
+    Args:
+        file_path (str): path to the output of the tool.
+        output_format (str): "pairs" for one match per line, as in
+            `metrics.py` and the JedAI format of `convert.py`, "duke"
+            for Duke's link files, in which matches start with "+", or
+            "cluster" for a CSV with a `Cluster ID` and a `uri` column,
+            such as the output of dedupe.
+
+    Returns:
+        set[frozenset[str]]: the matches, as `read_pairs_from_file`
+        returns them.
+    """
+    if output_format == "pairs":
+        return read_pairs_from_file(file_path)
+
+    with open(file_path, "r") as f:
+        rows = read_rows(f)
+        if output_format == "duke":
+            return {frozenset(row[1:3]) for row in rows if row and row[0] == "+"}
+
+        header: list[str] = next(rows, [])
+        cluster, uri = header.index("Cluster ID"), header.index("uri")
+        clusters: dict[str, list[str]] = {}
+        for row in rows:
+            clusters.setdefault(row[cluster], []).append(row[uri])
+
+    return {
+        frozenset(pair)
+        for uris in clusters.values()
+        for pair in itertools.combinations(uris, 2)
+    }
+
+
+def run_trials(
+    template: str,
+    variables: dict[str, str],
+    true_pos: set,
+    trials: int = 3,
+    warmup: int = 0,
+    output_format: str = "pairs",
+) -> list[tuple[Trial, Optional[ConfusionMatrix]]]:
+    """
+    Run a tool over repeated trials and evaluate the matches of each one.
+
+    Args:
+        template (str): the command template of the tool.
+        variables (dict[str, str]): the values of its placeholders,
+            which are filled in after the template is split into
+            arguments. `output` is set to a new file for each trial.
+            Braces that are not the placeholder of a variable are kept.
+        true_pos (set): the true positive matches.
+        trials (int): the number of measured trials.
+        warmup (int): the number of trials to run first, unmeasured,
+            e.g. to warm up caches.
+        output_format (str): the format of the output of the tool, as
+            in `read_matches`.
+
+    Returns:
+        list[tuple[Trial, Optional[ConfusionMatrix]]]: each trial and
+        the confusion matrix of its matches, or None if the tool failed,
+        could not be started or wrote no output.
+    """
+    results: list[tuple[Trial, Optional[ConfusionMatrix]]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        output: str = os.path.join(directory, "output")
+        values: dict[str, str] = {**variables, "output": output}
+        command: list[str] = [
+            PLACEHOLDER.sub(
+                lambda match: values.get(match.group(1), match.group(0)), argument
+            )
+            for argument in shlex.split(template)
+        ]
+        stdout: Optional[str] = None if "{output}" in template else output
+
+        for i in range(warmup + trials):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(output)
+
+            trial: Trial = run_trial(command, stdout)
+            if i < warmup:
+                continue
+
+            cm: Optional[ConfusionMatrix] = None
+            if trial.returncode == 0 and os.path.exists(output):
+                cm = calculate_confusion_matrix(
+                    true_pos, read_matches(output, output_format)
+                )
+            results.append((trial, cm))
+
+    return results
+
+
+def summarize(
+    tool: str, size: str, results: list[tuple[Trial, Optional[ConfusionMatrix]]]
+) -> dict[str, Any]:
+    """
+    Summarize the trials of a tool in a row of the comparison table.
+
+    Times are summarized over the successful trials, and the peak
+    resident set size is the largest of them. The confusion matrix and
+    the metrics are the mean over the successful trials, which is the
+    result of each one for a deterministic tool.
+
+    Args:
+        tool (str): the name of the tool.
+        size (str): the size of the dataset.
+        results (list[tuple[Trial, Optional[ConfusionMatrix]]]): the
+            trials, as returned by `run_trials`.
+
+    Returns:
+        dict[str, Any]: the row, with a value for each of `COLUMNS`.
+        Its measurements are empty if every trial failed.
+    """
+    row: dict[str, Any] = dict.fromkeys(COLUMNS, "")
+    successful = [(trial, cm) for trial, cm in results if cm is not None]
+    row.update(
+        tool=tool,
+        size=size,
+        trials=len(results),
+        failures=len(results) - len(successful),
+    )
+    if not successful:
+        return row
+
+    walls: list[float] = [trial.wall for trial, _ in successful]
+    cms: list[ConfusionMatrix] = [cm for _, cm in successful]
+    metrics = [calculate_metrics(cm) for cm in cms]
+    row.update(
+        wall_mean=round(statistics.fmean(walls), 3),
+        wall_stdev=round(statistics.stdev(walls), 3) if len(walls) > 1 else 0.0,
+        wall_min=round(min(walls), 3),
+        cpu_mean=round(statistics.fmean(trial.cpu for trial, _ in successful), 3),
+        peak_rss_mib=round(max(trial.peak_rss for trial, _ in successful) / 2**20, 1),
+    )
+    for field in ConfusionMatrix._fields:
+        row[field] = round(statistics.fmean(getattr(cm, field) for cm in cms), 1)
+    for field in ("precision", "recall", "f1_score"):
+        row[field] = round(statistics.fmean(getattr(m, field) for m in metrics), 4)
+
+    return row
+
+
+def _size_key(row: dict[str, Any]) -> tuple:
+    size: str = str(row["size"])
+    return (int(size), "") if size.isdigit() else (float("inf"), size)
+
+
+def update_table(file_path: str, row: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Add a row to a comparison table, replacing the row of the same tool
+    and dataset size, if any. Rows are sorted by size and tool.
+
+    Args:
+        file_path (str): path to the CSV file of the table. It is
+            created if it does not exist.
+        row (dict[str, Any]): the row to add.
+
+    Returns:
+        list[dict[str, Any]]: the rows of the table.
+    """
+    rows: list[dict[str, Any]] = []
+    if os.path.exists(file_path):
+        with open(file_path, "r", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    rows = [
+        other
+        for other in rows
+        if (other["tool"], str(other["size"])) != (row["tool"], str(row["size"]))
+    ]
+    rows.append(row)
+    rows.sort(key=lambda other: (_size_key(other), other["tool"]))
+
+    with open(file_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    return rows
+
+
+def print_table(rows: list[dict[str, Any]]) -> None:
+    """
+    Print the rows of a comparison table, aligned in columns.
+
+    Args:
+        rows (list[dict[str, Any]]): the rows of the table.
+    """
+    widths: dict[str, int] = {
+        column: max([len(column)] + [len(str(row[column])) for row in rows])
+        for column in COLUMNS
+    }
+    print("  ".join(column.rjust(widths[column]) for column in COLUMNS))
+    for row in rows:
+        print("  ".join(str(row[column]).rjust(widths[column]) for column in COLUMNS))
+
+
+def parse_variable(value: str) -> tuple[str, str]:
+    """
+    Parse a variable given as NAME=VALUE.
+
+    Args:
+        value (str): the variable.
+
+    Returns:
+        tuple[str, str]: its name and value.
+    """
+    name, separator, variable = value.partition("=")
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"Invalid variable {value!r}, use NAME=VALUE")
+
+    return name, variable
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Runs a duplicate detection tool over repeated trials and compares its runtime, memory and quality"
+    )
+    parser.add_argument(
+        "-c",
+        "--command",
+        type=str,
+        required=True,
+        help="command template of the tool; {output} is the file to write the matches to, or the standard output is used",
+    )
+    parser.add_argument(
+        "-s",
+        "--set",
+        type=parse_variable,
+        action="append",
+        default=[],
+        help="NAME=VALUE of a placeholder of the command template; may be repeated",
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the true positive matches",
+    )
+    parser.add_argument(
+        "--tool", type=str, required=True, help="name of the tool in the table"
+    )
+    parser.add_argument(
+        "--size",
+        type=str,
+        required=True,
+        help="size of the dataset in the table, such as its number of listings",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        choices=FORMATS,
+        default="pairs",
+        help="format of the output of the tool",
+    )
+    parser.add_argument(
+        "-n", "--trials", type=int, default=3, help="number of measured trials"
+    )
+    parser.add_argument(
+        "-w",
+        "--warmup",
+        type=int,
+        default=0,
+        help="number of unmeasured trials to run first",
+    )
+    parser.add_argument(
+        "--table",
+        type=str,
+        default="comparison.csv",
+        help="path to the CSV file of the comparison table",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    if not os.path.exists(args.true_positives_file):
+        raise argparse.ArgumentTypeError(
+            f"File {args.true_positives_file} does not exist"
+        )
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    results = run_trials(
+        args.command,
+        dict(args.set),
+        read_pairs_from_file(args.true_positives_file),
+        args.trials,
+        args.warmup,
+        args.format,
+    )
+    print_table(update_table(args.table, summarize(args.tool, args.size, results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Incrementally re-evaluate a duplicate detection algorithm from the
+links added to and removed from its previous run.
+
+The evaluation state is a SQLite database that stores the true positive
+matches, the algorithm positive matches of the last run and its
+confusion matrix, so each update costs time proportional to the number
+of changed links rather than to the size of the runs.
+
+Delta file format:
+The delta files should contain one changed link per line, prefixed by
+"+" if the link was added or by "-" if it was removed:
++,ID1,ID2
+-,ID3,ID4
+...
+
+Like the other pairs files, a delta file may declare prefixes at its
+top, in which case its CURIEs are expanded before they are compared with
+the stored links.
+
+Usage (from the `metrics` directory):
+    python -m src.incremental -s state.sqlite -t true.csv -a run1.csv
+    python -m src.incremental -s state.sqlite -d delta.csv
+    python -m src.incremental -s state.sqlite -a run2.csv
+"""
+
+import argparse
+import os
+import sqlite3
+from collections.abc import Iterable, Iterator
+
+from .metrics import (
+    ConfusionMatrix,
+    calculate_metrics,
+    print_metrics,
+    read_pairs_from_file,
+    read_rows,
+)
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS truth (
+    id1 TEXT NOT NULL,
+    id2 TEXT NOT NULL,
+    PRIMARY KEY (id1, id2)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS run (
+    id1 TEXT NOT NULL,
+    id2 TEXT NOT NULL,
+    PRIMARY KEY (id1, id2)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS counts (
+    tp INTEGER NOT NULL,
+    fp INTEGER NOT NULL,
+    fn INTEGER NOT NULL
+);
+
+CREATE TEMP TABLE IF NOT EXISTS added (
+    id1 TEXT NOT NULL,
+    id2 TEXT NOT NULL,
+    PRIMARY KEY (id1, id2)
+) WITHOUT ROWID;
+
+CREATE TEMP TABLE IF NOT EXISTS removed (
+    id1 TEXT NOT NULL,
+    id2 TEXT NOT NULL,
+    PRIMARY KEY (id1, id2)
+) WITHOUT ROWID;
+"""
+
+
+def canonical(pairs: Iterable[Iterable[str]]) -> Iterator[tuple[str, str]]:
+    """
+    Order the IDs of each pair, so that a pair is stored once regardless
+    of its orientation.
+
+    Pairs with a single ID, such as the frozensets of self-links read by
+    `read_pairs_from_file`, are stored as a pair of equal IDs.
+
+    Args:
+        pairs (Iterable[Iterable[str]]): the pairs to canonicalize.
+
+    Returns:
+        Iterator[tuple[str, str]]: the pairs with their smallest ID
+        first.
+    """
+    for pair in pairs:
+        pair = sorted(pair)
+        yield pair[0], pair[-1]
+
+
+def read_delta_from_file(
+    file_path: str,
+) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+    """
+    Read a CSV file of added and removed links.
+
+    Args:
+        file_path (str): path to a CSV file of "+,ID1,ID2" and
+            "-,ID1,ID2" rows. Its CURIEs are expanded if it declares
+            prefixes.
+
+    Returns:
+        A tuple with the list of added links and the list of removed
+        links.
+    """
+    added: list[tuple[str, str]] = []
+    removed: list[tuple[str, str]] = []
+    with open(file_path, "r") as f:
+        for row in read_rows(f):
+            if row[0] == "+":
+                added.append((row[1], row[2]))
+            elif row[0] == "-":
+                removed.append((row[1], row[2]))
+            else:
+                raise ValueError(f"Unknown change {row[0]!r} in {file_path}")
+
+    return added, removed
+
+
+class EvaluationState:
+    """
+    The persistent state of an incremental evaluation.
+
+    It stores the true positive matches, the algorithm positive matches
+    of the last run and the confusion matrix of that run.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Open (and create, if needed) the state database.
+
+        Args:
+            file_path (str): path to the state database.
+        """
+        self.connection: sqlite3.Connection = sqlite3.connect(file_path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "EvaluationState":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection to the state database."""
+        self.connection.close()
+
+    @property
+    def confusion_matrix(self) -> ConfusionMatrix:
+        """
+        Return the confusion matrix of the last run.
+
+        Raises:
+            LookupError: if no true positive matches have been loaded.
+        """
+        row = self.connection.execute("SELECT tp, fp, fn FROM counts").fetchone()
+        if row is None:
+            raise LookupError("The evaluation state has no true positives")
+
+        return ConfusionMatrix(*row)
+
+    def load_truth(self, true_pos: Iterable[Iterable[str]]) -> ConfusionMatrix:
+        """
+        Replace the true positive matches and forget the last run.
+
+        Args:
+            true_pos (Iterable[Iterable[str]]): the true positive matches.
+
+        Returns:
+            ConfusionMatrix: the confusion matrix of an empty run.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM truth")
+            self.connection.execute("DELETE FROM run")
+            self.connection.execute("DELETE FROM counts")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO truth VALUES (?, ?)", canonical(true_pos)
+            )
+            self.connection.execute(
+                "INSERT INTO counts SELECT 0, 0, COUNT(*) FROM truth"
+            )
+
+        return self.confusion_matrix
+
+    def apply_delta(
+        self, added: Iterable[Iterable[str]], removed: Iterable[Iterable[str]]
+    ) -> ConfusionMatrix:
+        """
+        Update the last run and its confusion matrix with the links
+        added to and removed from it.
+
+        Removed links that are not in the last run and added links that
+        already are are ignored. Removals are applied before additions.
+
+        Args:
+            added (Iterable[Iterable[str]]): the links added to the run.
+            removed (Iterable[Iterable[str]]): the links removed from the
+                run.
+
+        Returns:
+            ConfusionMatrix: the updated confusion matrix.
+        """
+        tp, fp, fn = self.confusion_matrix
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO removed VALUES (?, ?)", canonical(removed)
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO added VALUES (?, ?)", canonical(added)
+            )
+
+            # Removing a true match turns a tp into a fn; removing a wrong
+            # one drops a fp.
+            lost, lost_tp = self.connection.execute(
+                "SELECT COUNT(*), COUNT(truth.id1) FROM removed "
+                "JOIN run USING (id1, id2) LEFT JOIN truth USING (id1, id2)"
+            ).fetchone()
+            self.connection.executemany(
+                "DELETE FROM run WHERE id1 = ? AND id2 = ?",
+                self.connection.execute("SELECT id1, id2 FROM removed").fetchall(),
+            )
+
+            # Adding a true match turns a fn into a tp; adding a wrong one
+            # adds a fp.
+            self.connection.execute(
+                "DELETE FROM added WHERE EXISTS (SELECT 1 FROM run "
+                "WHERE run.id1 = added.id1 AND run.id2 = added.id2)"
+            )
+            gained, gained_tp = self.connection.execute(
+                "SELECT COUNT(*), COUNT(truth.id1) FROM added "
+                "LEFT JOIN truth USING (id1, id2)"
+            ).fetchone()
+            self.connection.execute("INSERT INTO run SELECT id1, id2 FROM added")
+
+            tp += gained_tp - lost_tp
+            fp += (gained - gained_tp) - (lost - lost_tp)
+            fn += lost_tp - gained_tp
+            self.connection.execute(
+                "UPDATE counts SET tp = ?, fp = ?, fn = ?", (tp, fp, fn)
+            )
+            self.connection.execute("DELETE FROM added")
+            self.connection.execute("DELETE FROM removed")
+
+        return ConfusionMatrix(tp=tp, fp=fp, fn=fn)
+
+    def apply_run(self, algorithm_pos: Iterable[Iterable[str]]) -> ConfusionMatrix:
+        """
+        Replace the last run with a new one, updating the confusion
+        matrix with the difference between both runs.
+
+        Args:
+            algorithm_pos (Iterable[Iterable[str]]): the algorithm
+                positive matches of the new run.
+
+        Returns:
+            ConfusionMatrix: the confusion matrix of the new run.
+        """
+        with self.connection:
+            self.connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS new_run "
+                "(id1 TEXT NOT NULL, id2 TEXT NOT NULL, PRIMARY KEY (id1, id2)) "
+                "WITHOUT ROWID"
+            )
+            self.connection.execute("DELETE FROM new_run")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO new_run VALUES (?, ?)", canonical(algorithm_pos)
+            )
+            added = self.connection.execute(
+                "SELECT id1, id2 FROM new_run EXCEPT SELECT id1, id2 FROM run"
+            ).fetchall()
+            removed = self.connection.execute(
+                "SELECT id1, id2 FROM run EXCEPT SELECT id1, id2 FROM new_run"
+            ).fetchall()
+            self.connection.execute("DELETE FROM new_run")
+
+        return self.apply_delta(added, removed)
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Incrementally recalculates precision, recall and f1-score from the changes between algorithm runs"
+    )
+    parser.add_argument(
+        "-s",
+        "--state_file",
+        type=str,
+        required=True,
+        help="path to the evaluation state database, created if it does not exist",
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=str,
+        help="path to the file with the true positive matches; replaces the stored ones and forgets the last run",
+    )
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "-a",
+        "--algorithm_positives_file",
+        type=str,
+        help="path to the file with the algorithm positive matches of the new run",
+    )
+    group.add_argument(
+        "-d",
+        "--delta_file",
+        type=str,
+        help="path to the file with the links added to and removed from the last run",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    for file_path in [
+        args.true_positives_file,
+        args.algorithm_positives_file,
+        args.delta_file,
+    ]:
+        if file_path is not None and not os.path.exists(file_path):
+            raise argparse.ArgumentTypeError(f"File {file_path} does not exist")
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    with EvaluationState(args.state_file) as state:
+        if args.true_positives_file is not None:
+            state.load_truth(read_pairs_from_file(args.true_positives_file))
+
+        if args.algorithm_positives_file is not None:
+            state.apply_run(read_pairs_from_file(args.algorithm_positives_file))
+        elif args.delta_file is not None:
+            state.apply_delta(*read_delta_from_file(args.delta_file))
+
+        cm = state.confusion_matrix
+
+    print_metrics(cm, calculate_metrics(cm))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,32 +8,139 @@ ID1,ID2
 ID2,ID3
 ID4,ID5
 ...
+
+IDs may be compacted as CURIEs, declaring their prefixes at the top of
+the file, as written by `convert.py --compact`:
+@prefix l: <https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_>
+l:site1_1,l:site2_2
+...
 """
 
 
 import argparse
 import collections
 import csv
+import itertools
 import os
+import re
+import sqlite3
+from collections.abc import Iterable, Iterator
+from typing import IO
 
 ConfusionMatrix = collections.namedtuple("ConfusionMatrix", ["tp", "fp", "fn"])
 Metrics = collections.namedtuple("Metrics", ["precision", "recall", "f1_score"])
 
+# A line of the prefix header written by `convert.py --compact`. Every
+# module of `metrics` reads pairs files through the helpers below.
+PREFIX_LINE = re.compile(r"@prefix ([A-Za-z_][\w.-]*)?: <([^>]*)>\s*")
+
+# Separates the IDs of a pair in its key. IDs never contain it.
+SEPARATOR = "\x1f"
+
+
+def read_prefixes(f: IO[str]) -> dict[str, str]:
+    """
+    Read the prefixes declared at the top of a file, leaving it at the
+    first line after them.
+
+    Args:
+        f (IO[str]): a file, at its start.
 
-def read_pairs_from_file(file_path: str) -> set[frozenset[str]]:
+    Returns:
+        dict[str, str]: the IRI of each prefix name, which is empty if
+        the file declares none.
+    """
+    prefixes: dict[str, str] = {}
+    while True:
+        position = f.tell()
+        match = PREFIX_LINE.fullmatch(f.readline())
+        if not match:
+            f.seek(position)
+            return prefixes
+
+        prefixes[match.group(1) or ""] = match.group(2)
+
+
+def expand_curie(curie: str, prefixes: dict[str, str]) -> str:
+    """
+    Expand a CURIE into its URI.
+
+    Args:
+        curie (str): the CURIE, or an ID that was not compacted.
+        prefixes (dict[str, str]): the IRI of each prefix name.
+
+    Returns:
+        str: the URI, or the ID if it has no known prefix.
+    """
+    name, separator, local = curie.partition(":")
+    iri = prefixes.get(name) if separator else None
+    return curie if iri is None else iri + local
+
+
+def read_rows(lines: Iterable[str]) -> Iterator[list[str]]:
+    """
+    Read the rows of a pairs file, expanding their CURIEs if the file
+    declares prefixes.
+
+    Unlike `read_prefixes`, this does not seek, so it also reads lines
+    that are streamed, such as the body of a request.
+
+    Args:
+        lines (Iterable[str]): the lines of the file, from its start.
+
+    Yields:
+        list[str]: the IDs of each row, expanded into URIs.
+    """
+    lines = iter(lines)
+    prefixes: dict[str, str] = {}
+    for line in lines:
+        match = PREFIX_LINE.fullmatch(line)
+        if not match:
+            lines = itertools.chain([line], lines)
+            break
+
+        prefixes[match.group(1) or ""] = match.group(2)
+
+    for row in csv.reader(lines):
+        yield [expand_curie(id, prefixes) for id in row] if prefixes else row
+
+
+def read_pairs_from_file(file_path: str, expand: bool = True) -> set[frozenset[str]]:
     """
     Reads a CSV file containing pairs of IDs and returns a set of
     frozensets.
 
     Parameters:
     file_path (str): Path to a CSV file containing pairs of IDs.
+    expand (bool): Whether to expand the CURIEs of a file with prefixes.
+        Files compacted with the same prefixes can be compared without
+        expanding them, which is faster.
 
     Returns:
     A set of frozensets, each containing two IDs.
     """
     with open(file_path, "r") as f:
+        prefixes = read_prefixes(f)
         reader = csv.reader(f)
-        return {frozenset(row) for row in reader}
+        if not expand or not prefixes:
+            return {frozenset(row) for row in reader}
+
+        return {frozenset(expand_curie(id, prefixes) for id in row) for row in reader}
+
+
+def pair_key(row: list[str]) -> str:
+    """
+    Return a key that identifies a row as `read_pairs_from_file` does,
+    i.e. regardless of the order and repetition of its IDs.
+
+    Args:
+        row (list[str]): the IDs of a row.
+
+    Returns:
+        str: the sorted distinct IDs of the row, separated by
+        `SEPARATOR`.
+    """
+    return SEPARATOR.join(sorted(set(row)))
 
 
 def calculate_confusion_matrix(true_pos: set, algorithm_pos: set) -> ConfusionMatrix:
@@ -55,6 +162,45 @@ def calculate_confusion_matrix(true_pos: set, algorithm_pos: set) -> ConfusionMa
     )
 
 
+def calculate_confusion_matrix_sql(
+    connection: sqlite3.Connection, true_run: str, algorithm_run: str
+) -> ConfusionMatrix:
+    """
+    Calculate the confusion matrix of two runs stored in a SQLite
+    database, using SQL set operations.
+
+    The database must have a `pairs` table with `run`, `id1`, `id2`
+    and `duplicate` columns, in which the IDs of each pair are ordered,
+    such as the databases written by the `sqlite` strategy of
+    `convert.py`.
+
+    Args:
+        connection (sqlite3.Connection): a connection to the database.
+        true_run (str): the name of the run with the true positive
+            matches.
+        algorithm_run (str): the name of the run with the algorithm
+            positive matches.
+
+    Returns:
+        ConfusionMatrix: the confusion matrix as a namedtuple with tp,
+        fp, fn.
+    """
+    positives = "SELECT id1, id2 FROM pairs WHERE run = :{} AND duplicate = 1"
+    true_pos, algorithm_pos = positives.format("true"), positives.format("algorithm")
+
+    tp, fp, fn = connection.execute(
+        f"""
+        SELECT
+            (SELECT COUNT(*) FROM ({true_pos} INTERSECT {algorithm_pos})),
+            (SELECT COUNT(*) FROM ({algorithm_pos} EXCEPT {true_pos})),
+            (SELECT COUNT(*) FROM ({true_pos} EXCEPT {algorithm_pos}))
+        """,
+        {"true": true_run, "algorithm": algorithm_run},
+    ).fetchone()
+
+    return ConfusionMatrix(tp=tp, fp=fp, fn=fn)
+
+
 def calculate_metrics(cm: ConfusionMatrix) -> Metrics:
     """
     Calculate precision, recall and F1-score given the confusion
@@ -79,6 +225,22 @@ def calculate_metrics(cm: ConfusionMatrix) -> Metrics:
     return Metrics(precision=precision, recall=recall, f1_score=f1_score)
 
 
+def print_metrics(cm: ConfusionMatrix, metrics: Metrics) -> None:
+    """
+    Print the number of correct links found and the metrics.
+
+    Args:
+        cm (ConfusionMatrix): the confusion matrix as a namedtuple with
+            tp, fp, fn.
+        metrics (Metrics): the metrics as a namedtuple with precision,
+            recall, f1_score.
+    """
+    print(f"Correct links found: {cm.tp} / {cm.tp + cm.fn}")
+    print(f"Precision: {metrics.precision:.3f}")
+    print(f"Recall: {metrics.recall:.3f}")
+    print(f"F1-score: {metrics.f1_score:.3f}")
+
+
 def parse_args() -> argparse.Namespace:
     """
     Parse command line arguments.
@@ -101,10 +263,22 @@ def parse_args() -> argparse.Namespace:
         type=str,
         help="path to the file with the algorithm positive matches",
     )
+    parser.add_argument(
+        "-D",
+        "--database",
+        type=str,
+        default=None,
+        help="path to a SQLite database written by convert.py; if given, -t and -a are names of runs in the database",
+    )
 
     args: argparse.Namespace = parser.parse_args()
 
-    for file_path in [args.true_positives_file, args.algorithm_positives_file]:
+    if args.database is not None:
+        files = [args.database]
+    else:
+        files = [args.true_positives_file, args.algorithm_positives_file]
+
+    for file_path in files:
         if not os.path.exists(file_path):
             raise argparse.ArgumentTypeError(f"File {file_path} does not exist")
 
@@ -114,16 +288,26 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args: argparse.Namespace = parse_args()
 
-    true_positives = read_pairs_from_file(args.true_positives_file)
-    algorithm_positives = read_pairs_from_file(args.algorithm_positives_file)
+    if args.database is not None:
+        connection = sqlite3.connect(args.database)
+        cm = calculate_confusion_matrix_sql(
+            connection, args.true_positives_file, args.algorithm_positives_file
+        )
+        connection.close()
+    else:
+        with open(args.true_positives_file) as t, open(
+            args.algorithm_positives_file
+        ) as a:
+            expand: bool = read_prefixes(t) != read_prefixes(a)
 
-    cm = calculate_confusion_matrix(true_positives, algorithm_positives)
-    metrics = calculate_metrics(cm)
+        true_positives = read_pairs_from_file(args.true_positives_file, expand)
+        algorithm_positives = read_pairs_from_file(
+            args.algorithm_positives_file, expand
+        )
 
-    print(f"Correct links found: {cm.tp} / {cm.tp + cm.fn}")
-    print(f"Precision: {metrics.precision:.3f}")
-    print(f"Recall: {metrics.recall:.3f}")
-    print(f"F1-score: {metrics.f1_score:.3f}")
+        cm = calculate_confusion_matrix(true_positives, algorithm_positives)
+
+    print_metrics(cm, calculate_metrics(cm))
 
 
 if __name__ == "__main__":
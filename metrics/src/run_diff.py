@@ -0,0 +1,314 @@
+"""
+Module to compare the matches of two runs of a duplicate detection
+algorithm, e.g. before and after a change to the matcher, and to label
+each link that changed against the true positive matches.
+
+The IDs of the three files are interned into integers and each pair is
+encoded as a single 64-bit key, regardless of its orientation, as the
+`TruthIndex` of `api.py` does. The sorted keys of both runs are merged
+to find the links gained and lost by the new run, and each one is
+labeled as:
+    new_tp: a true match found only by the new run.
+    new_fp: a false match found only by the new run.
+    lost_tp: a true match found only by the old run.
+    removed_fp: a false match found only by the old run.
+
+The changes are written to a CSV file in chunks, grouped by label, with
+a `change,id1,id2` header.
+
+The input files must have one pair per line, as described in
+`metrics.py`.
+
+Usage (from the `metrics` directory):
+    python -m src.run_diff -t true.csv -a old.csv -b new.csv -o diff.csv
+"""
+
+import argparse
+import csv
+import itertools
+import os
+from typing import IO, Optional
+
+import numpy as np
+
+from .metrics import ConfusionMatrix, calculate_metrics, read_rows
+
+CHANGES = ("new_tp", "new_fp", "lost_tp", "removed_fp")
+
+CHUNK_SIZE = 2**16
+
+
+class PairCodec:
+    """
+    Interns IDs into integers and encodes each pair of them as a single
+    64-bit key that does not depend on the orientation of the pair.
+    """
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        # New IDs are interned into consecutive integers, so this is the
+        # number of distinct IDs.
+        self.size: int = 0
+        self.names: Optional[np.ndarray] = None
+
+    def encode(self, rows: list[list[str]]) -> np.ndarray:
+        """
+        Encode a chunk of rows, each identified by its distinct IDs as
+        `read_pairs_from_file` does. A row with a single distinct ID is
+        a self-link, and a blank row, which is the empty set there, is
+        the link of an empty ID.
+
+        Args:
+            rows (list[list[str]]): the IDs of each row.
+
+        Returns:
+            np.ndarray: the key of each row.
+
+        Raises:
+            ValueError: if a row has more than two distinct IDs, or the
+                IDs do not fit in 32 bits.
+        """
+        codes: dict[str, int] = self.ids
+        interned: list[int] = []
+        for row in rows:
+            # Two IDs are a pair even if they are equal, as a self-link.
+            ids: list[str] = row if len(row) == 2 else list(dict.fromkeys(row)) or [""]
+            if len(ids) > 2:
+                raise ValueError(f"Expected a pair of IDs, got {row!r}")
+
+            for id in (ids[0], ids[-1]):
+                code: Optional[int] = codes.get(id)
+                if code is None:
+                    code = codes[id] = len(codes)
+                interned.append(code)
+
+        if len(codes) > 2**32:
+            raise ValueError("Too many IDs to encode pairs in 64 bits")
+        if len(codes) > self.size:
+            self.size = len(codes)
+            self.names = None
+
+        pairs: np.ndarray = np.array(interned, dtype=np.int64).reshape(-1, 2)
+        return (np.minimum(pairs[:, 0], pairs[:, 1]) << 32) | np.maximum(
+            pairs[:, 0], pairs[:, 1]
+        )
+
+    def decode(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Decode keys into the IDs of their pairs.
+
+        Args:
+            keys (np.ndarray): keys returned by `encode`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the first and the second ID
+            of each pair.
+        """
+        if self.names is None:
+            self.names = np.empty(self.size, dtype=object)
+            self.names[np.fromiter(self.ids.values(), dtype=np.int64)] = list(self.ids)
+
+        return self.names[keys >> 32], self.names[keys & 0xFFFFFFFF]
+
+
+def sorted_unique(keys: np.ndarray) -> np.ndarray:
+    """
+    Sort keys and drop their repetitions.
+
+    Args:
+        keys (np.ndarray): the keys.
+
+    Returns:
+        np.ndarray: the sorted distinct keys.
+    """
+    keys = np.sort(keys)
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+
+def read_keys(file_path: str, codec: PairCodec) -> np.ndarray:
+    """
+    Read the pairs of a file in chunks as sorted keys, parsing and
+    expanding their rows as `read_pairs_from_file` does.
+
+    Args:
+        file_path (str): path to a CSV file containing pairs of IDs.
+        codec (PairCodec): the codec of the pairs.
+
+    Returns:
+        np.ndarray: the sorted distinct keys of the pairs.
+
+    Raises:
+        ValueError: if a row is not a pair of IDs.
+    """
+    chunks: list[np.ndarray] = [np.empty(0, dtype=np.int64)]
+    with open(file_path, "r") as f:
+        rows = read_rows(f)
+        while chunk := list(itertools.islice(rows, CHUNK_SIZE)):
+            try:
+                chunks.append(codec.encode(chunk))
+            except ValueError as error:
+                raise ValueError(f"{file_path}: {error}") from None
+
+    return sorted_unique(np.concatenate(chunks))
+
+
+def contains(keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Return which values are in some keys.
+
+    Args:
+        keys (np.ndarray): sorted keys.
+        values (np.ndarray): the values to look up.
+
+    Returns:
+        np.ndarray: a boolean array, True for the values in the keys.
+    """
+    if not len(keys):
+        return np.zeros(len(values), dtype=bool)
+
+    positions: np.ndarray = np.searchsorted(keys, values)
+    return keys[np.minimum(positions, len(keys) - 1)] == values
+
+
+def diff_runs(
+    true: np.ndarray, old: np.ndarray, new: np.ndarray
+) -> dict[str, np.ndarray]:
+    """
+    Find and label the links that changed between two runs.
+
+    Args:
+        true (np.ndarray): the sorted distinct keys of the true
+            positive matches.
+        old (np.ndarray): the sorted distinct keys of the old run.
+        new (np.ndarray): the sorted distinct keys of the new run.
+
+    Returns:
+        dict[str, np.ndarray]: the sorted keys of each of `CHANGES`.
+    """
+    gained: np.ndarray = new[~contains(old, new)]
+    lost: np.ndarray = old[~contains(new, old)]
+    gained_true: np.ndarray = contains(true, gained)
+    lost_true: np.ndarray = contains(true, lost)
+
+    return {
+        "new_tp": gained[gained_true],
+        "new_fp": gained[~gained_true],
+        "lost_tp": lost[lost_true],
+        "removed_fp": lost[~lost_true],
+    }
+
+
+def confusion_matrix(true: np.ndarray, keys: np.ndarray) -> ConfusionMatrix:
+    """
+    Calculate the confusion matrix of a run.
+
+    Args:
+        true (np.ndarray): the sorted distinct keys of the true
+            positive matches.
+        keys (np.ndarray): the sorted distinct keys of the run.
+
+    Returns:
+        ConfusionMatrix: the confusion matrix as a namedtuple with tp,
+        fp, fn.
+    """
+    tp = int(contains(true, keys).sum())
+    return ConfusionMatrix(tp=tp, fp=len(keys) - tp, fn=len(true) - tp)
+
+
+def write_changes(
+    output: IO[str], codec: PairCodec, changes: dict[str, np.ndarray]
+) -> None:
+    """
+    Write the links that changed, decoding their keys into IDs a chunk
+    at a time.
+
+    Args:
+        output (IO[str]): the file to write to.
+        codec (PairCodec): the codec of the pairs.
+        changes (dict[str, np.ndarray]): the keys of each change, as
+            returned by `diff_runs`.
+    """
+    writer = csv.writer(output)
+    writer.writerow(["change", "id1", "id2"])
+    for change in CHANGES:
+        keys: np.ndarray = changes[change]
+        for start in range(0, len(keys), CHUNK_SIZE):
+            firsts, seconds = codec.decode(keys[start : start + CHUNK_SIZE])
+            writer.writerows(
+                (change, first, second) for first, second in zip(firsts, seconds)
+            )
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compares the matches of two runs and labels the gained and lost links given the true positives"
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the true positive matches",
+    )
+    parser.add_argument(
+        "-a",
+        "--old_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the matches of the old run",
+    )
+    parser.add_argument(
+        "-b",
+        "--new_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the matches of the new run",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        type=str,
+        required=True,
+        help="path to the CSV file to write the changed links to",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    for file_path in [
+        args.true_positives_file,
+        args.old_positives_file,
+        args.new_positives_file,
+    ]:
+        if not os.path.exists(file_path):
+            raise argparse.ArgumentTypeError(f"File {file_path} does not exist")
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    codec = PairCodec()
+    true: np.ndarray = read_keys(args.true_positives_file, codec)
+    old: np.ndarray = read_keys(args.old_positives_file, codec)
+    new: np.ndarray = read_keys(args.new_positives_file, codec)
+    changes: dict[str, np.ndarray] = diff_runs(true, old, new)
+
+    with open(args.output_file, "w", newline="") as f:
+        write_changes(f, codec, changes)
+
+    for change in CHANGES:
+        print(f"{change}: {len(changes[change])}")
+    for name, keys in (("old", old), ("new", new)):
+        metrics = calculate_metrics(confusion_matrix(true, keys))
+        print(f"{name} F1-score: {metrics.f1_score:.4f}")
+
+
+if __name__ == "__main__":
+    main()
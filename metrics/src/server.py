@@ -0,0 +1,321 @@
+"""
+A long-running local evaluation server that keeps the true positive
+matches in memory, so that each evaluation only parses the algorithm
+positive matches.
+
+Endpoints:
+    POST /evaluate?truth=NAME&algorithm_positives_file=PATH
+        Evaluate the matches of a file under the root directory of the
+        server. Files can only be read by path when the server is
+        started with a root.
+    POST /evaluate?truth=NAME
+        Evaluate the matches streamed in the request body, in the same
+        CSV format as the algorithm positives file, including its prefix
+        header, if any.
+    GET /truths
+        List the loaded true positive matches.
+    GET /stats
+        Report the latency of the requests served.
+
+`truth` may be omitted when a single truth is loaded. Responses are
+JSON objects.
+
+Usage (from the `metrics` directory):
+    python -m src.server -t data/true.csv -t other=data/other.csv -p 8642 --root data
+"""
+
+import argparse
+import collections
+import json
+import os
+import statistics
+import threading
+import time
+from collections.abc import Iterator
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import IO, Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .metrics import (
+    calculate_confusion_matrix,
+    calculate_metrics,
+    read_pairs_from_file,
+    read_rows,
+)
+
+
+class LatencyStats:
+    """
+    The latencies of the most recent requests of each endpoint.
+    """
+
+    def __init__(self, size: int = 10000) -> None:
+        """
+        Args:
+            size (int): the number of latencies kept per endpoint.
+        """
+        self.size: int = size
+        self.lock: threading.Lock = threading.Lock()
+        self.counts: collections.Counter = collections.Counter()
+        self.latencies: dict[str, collections.deque] = {}
+
+    def add(self, endpoint: str, seconds: float) -> None:
+        """
+        Record the latency of a request.
+
+        Args:
+            endpoint (str): the endpoint of the request.
+            seconds (float): the time taken to serve the request.
+        """
+        with self.lock:
+            self.counts[endpoint] += 1
+            self.latencies.setdefault(
+                endpoint, collections.deque(maxlen=self.size)
+            ).append(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Summarize the latencies of each endpoint, in milliseconds.
+
+        Returns:
+            dict: the number of requests and the mean, median, 95th
+            percentile and maximum latency of each endpoint.
+        """
+        with self.lock:
+            latencies = {key: sorted(value) for key, value in self.latencies.items()}
+            counts = dict(self.counts)
+
+        return {
+            endpoint: {
+                "count": counts[endpoint],
+                "mean_ms": statistics.fmean(values) * 1000,
+                "p50_ms": values[len(values) // 2] * 1000,
+                "p95_ms": values[min(len(values) - 1, len(values) * 95 // 100)] * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+            for endpoint, values in latencies.items()
+        }
+
+
+class EvaluationServer(ThreadingHTTPServer):
+    """
+    An HTTP server, serving each request in its own thread, that holds
+    the true positive matches it evaluates against.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        truths: dict[str, set[frozenset[str]]],
+        root: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            address (tuple[str, int]): the host and port to listen on.
+            truths (dict[str, set[frozenset[str]]]): the true positive
+                matches, by name.
+            root (Optional[str]): the directory that algorithm positives
+                files may be read from, or None to only accept uploads.
+        """
+        super().__init__(address, EvaluationHandler)
+        self.truths: dict[str, set[frozenset[str]]] = truths
+        self.root: Optional[str] = None if root is None else os.path.realpath(root)
+        self.stats: LatencyStats = LatencyStats()
+
+    def resolve(self, file_path: str) -> str:
+        """
+        Resolve the path of an algorithm positives file under the root.
+
+        Args:
+            file_path (str): the path requested, absolute or relative to
+                the root.
+
+        Returns:
+            str: the real path of the file.
+
+        Raises:
+            PermissionError: if the server has no root or the file is
+                outside of it.
+        """
+        if self.root is None:
+            raise PermissionError(
+                "Reading files is disabled; upload the matches or start the server with --root"
+            )
+
+        path: str = os.path.realpath(os.path.join(self.root, file_path))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise PermissionError(f"{file_path} is outside of the root directory")
+
+        return path
+
+
+class EvaluationHandler(BaseHTTPRequestHandler):
+    """Serve the requests of an `EvaluationServer`."""
+
+    server: EvaluationServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/truths":
+            self._respond(
+                HTTPStatus.OK,
+                {name: len(pairs) for name, pairs in self.server.truths.items()},
+            )
+        elif url.path == "/stats":
+            self._respond(HTTPStatus.OK, self.server.stats.summary())
+        else:
+            self._respond(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {url.path}"})
+
+    def do_POST(self) -> None:
+        start: float = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path != "/evaluate":
+            self._respond(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {url.path}"})
+            return
+
+        try:
+            self._evaluate(parse_qs(url.query))
+        finally:
+            self.server.stats.add(url.path, time.perf_counter() - start)
+
+    def _evaluate(self, query: dict[str, list[str]]) -> None:
+        try:
+            name: str = self._truth_name(query)
+            if "algorithm_positives_file" in query:
+                algorithm_positives = read_pairs_from_file(
+                    self.server.resolve(query["algorithm_positives_file"][0])
+                )
+            else:
+                length = int(self.headers.get("Content-Length", 0))
+                algorithm_positives = {
+                    frozenset(row) for row in read_rows(_lines(self.rfile, length))
+                }
+        except PermissionError as error:
+            self._respond(HTTPStatus.FORBIDDEN, {"error": str(error)})
+            return
+        except (LookupError, OSError, ValueError) as error:
+            self._respond(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+            return
+
+        cm = calculate_confusion_matrix(self.server.truths[name], algorithm_positives)
+        self._respond(
+            HTTPStatus.OK,
+            {
+                "truth": name,
+                "confusion_matrix": cm._asdict(),
+                "metrics": calculate_metrics(cm)._asdict(),
+            },
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Do not log each request to the standard error."""
+
+    def _truth_name(self, query: dict[str, list[str]]) -> str:
+        if "truth" in query:
+            name = query["truth"][0]
+            if name not in self.server.truths:
+                raise LookupError(f"Unknown truth {name}")
+            return name
+
+        if len(self.server.truths) != 1:
+            raise LookupError("A truth must be given when several are loaded")
+
+        return next(iter(self.server.truths))
+
+    def _respond(self, status: HTTPStatus, body: Any) -> None:
+        content: bytes = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def _lines(file: IO[bytes], length: int) -> Iterator[str]:
+    """Yield the lines of the next `length` bytes of a binary file."""
+    while length > 0:
+        line: bytes = file.readline(length)
+        if not line:
+            break
+        length -= len(line)
+        yield line.decode()
+
+
+def parse_truth(value: str) -> tuple[str, str]:
+    """
+    Parse a truth given as "NAME=PATH", or as "PATH" to name it by its
+    path.
+
+    Names cannot contain "=", while paths can: the value is split at its
+    first "=", unless it is the path of an existing file.
+
+    Args:
+        value (str): the truth argument.
+
+    Returns:
+        tuple[str, str]: the name and the path of the truth.
+    """
+    name, separator, path = value.partition("=")
+    if not separator or not name or os.path.exists(value):
+        return value, value
+
+    return name, path
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Serves precision, recall and f1-score against preloaded true positives"
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=parse_truth,
+        action="append",
+        required=True,
+        help="[NAME=]path to a file with true positive matches; may be repeated",
+    )
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1", help="host to listen on"
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=8642, help="port to listen on"
+    )
+    parser.add_argument(
+        "--root",
+        type=str,
+        default=None,
+        help="directory that algorithm positives files may be read from by path; by default, matches must be uploaded",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    for _, file_path in args.true_positives_file:
+        if not os.path.exists(file_path):
+            raise argparse.ArgumentTypeError(f"File {file_path} does not exist")
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    truths = {
+        name: read_pairs_from_file(file_path)
+        for name, file_path in args.true_positives_file
+    }
+    with EvaluationServer((args.host, args.port), truths, args.root) as server:
+        print(f"Serving {', '.join(truths)} on http://{args.host}:{server.server_port}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
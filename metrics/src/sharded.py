@@ -0,0 +1,303 @@
+"""
+Module to calculate the confusion matrix of a duplicate detection
+algorithm with several worker processes.
+
+Both input files are split into byte ranges, which workers parse in
+parallel, writing each canonical pair to one of N shard files chosen by
+a hash of the pair. Then a worker per shard intersects the true and
+algorithm pairs of its shard, and the per-shard counts are added up.
+Since equal pairs always land in the same shard, the result is the same
+as the one of `calculate_confusion_matrix`.
+
+The input files must have one pair per line, as described in
+`metrics.py`. The prefix header of a compacted file is read before the
+file is split, and every worker expands the CURIEs of its range.
+
+Usage (from the `metrics` directory):
+    python -m src.sharded -t true.csv -a algorithm.csv -w 8
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import zlib
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Optional
+
+from .metrics import (
+    PREFIX_LINE,
+    ConfusionMatrix,
+    calculate_metrics,
+    expand_curie,
+    pair_key,
+    print_metrics,
+)
+
+
+def read_header(file_path: str) -> tuple[dict[str, str], int]:
+    """
+    Read the prefixes declared at the top of a pairs file.
+
+    Args:
+        file_path (str): path to the file.
+
+    Returns:
+        tuple[dict[str, str], int]: the IRI of each prefix name, and the
+        offset of the first line after the header.
+    """
+    prefixes: dict[str, str] = {}
+    with open(file_path, "rb") as f:
+        while True:
+            offset: int = f.tell()
+            match = PREFIX_LINE.fullmatch(f.readline().decode())
+            if not match:
+                return prefixes, offset
+
+            prefixes[match.group(1) or ""] = match.group(2)
+
+
+def split_file(file_path: str, chunks: int, start: int = 0) -> list[tuple[int, int]]:
+    """
+    Split a file into byte ranges that start and end at line breaks.
+
+    Args:
+        file_path (str): path to the file.
+        chunks (int): the maximum number of ranges.
+        start (int): the offset to split the file from, such as the end
+            of its header.
+
+    Returns:
+        list[tuple[int, int]]: the non-empty [start, end) ranges.
+    """
+    size: int = os.path.getsize(file_path)
+    offsets: list[int] = [start]
+    with open(file_path, "rb") as f:
+        for chunk in range(1, chunks):
+            f.seek(max(start + (size - start) * chunk // chunks, offsets[-1]))
+            f.readline()
+            offsets.append(min(f.tell(), size))
+
+    offsets.append(size)
+    return [(start, end) for start, end in zip(offsets, offsets[1:]) if start < end]
+
+
+def _read_range(file_path: str, start: int, end: int) -> Iterator[str]:
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            line: bytes = f.readline()
+            if not line:
+                break
+            yield line.decode()
+
+
+def partition(
+    file_path: str,
+    start: int,
+    end: int,
+    shards: int,
+    prefix: str,
+    prefixes: Optional[dict[str, str]] = None,
+) -> list[str]:
+    """
+    Parse a byte range of a pairs file and write the key of each pair to
+    the shard file of its hash.
+
+    Args:
+        file_path (str): path to the pairs file.
+        start (int): the offset where the range starts.
+        end (int): the offset where the range ends.
+        shards (int): the number of shards.
+        prefix (str): the prefix of the paths of the shard files.
+        prefixes (Optional[dict[str, str]]): the prefixes declared by
+            the file, to expand its CURIEs with.
+
+    Returns:
+        list[str]: the paths of the shard files, by shard.
+    """
+    paths: list[str] = [f"{prefix}-{shard}" for shard in range(shards)]
+    outputs = [open(path, "w") for path in paths]
+    try:
+        for row in csv.reader(_read_range(file_path, start, end)):
+            if prefixes:
+                row = [expand_curie(id, prefixes) for id in row]
+            key: str = pair_key(row)
+            outputs[zlib.crc32(key.encode()) % shards].write(key + "\n")
+    finally:
+        for output in outputs:
+            output.close()
+
+    return paths
+
+
+def _read_keys(paths: list[str]) -> set[str]:
+    keys: set[str] = set()
+    for path in paths:
+        with open(path, "r") as f:
+            keys.update(line[:-1] for line in f)
+
+    return keys
+
+
+def count_shard(true_paths: list[str], algorithm_paths: list[str]) -> ConfusionMatrix:
+    """
+    Calculate the confusion matrix of a shard.
+
+    Args:
+        true_paths (list[str]): the shard files of the true positives.
+        algorithm_paths (list[str]): the shard files of the algorithm
+            positives.
+
+    Returns:
+        ConfusionMatrix: the confusion matrix of the shard.
+    """
+    true_pos: set[str] = _read_keys(true_paths)
+    algorithm_pos: set[str] = _read_keys(algorithm_paths)
+    tp: int = len(true_pos & algorithm_pos)
+
+    return ConfusionMatrix(tp=tp, fp=len(algorithm_pos) - tp, fn=len(true_pos) - tp)
+
+
+def calculate_confusion_matrix_sharded(
+    true_positives_file: str,
+    algorithm_positives_file: str,
+    workers: int,
+    shards: Optional[int] = None,
+    directory: Optional[str] = None,
+) -> ConfusionMatrix:
+    """
+    Calculate the confusion matrix of two pairs files with several
+    worker processes.
+
+    Args:
+        true_positives_file (str): path to the file with the true
+            positive matches.
+        algorithm_positives_file (str): path to the file with the
+            algorithm positive matches.
+        workers (int): the number of worker processes. With a single
+            worker, everything runs in the calling process.
+        shards (Optional[int]): the number of shards; `workers` by
+            default.
+        directory (Optional[str]): the directory for the shard files, or
+            None for the default temporary directory.
+
+    Returns:
+        ConfusionMatrix: the confusion matrix as a namedtuple with tp,
+        fp, fn.
+    """
+    shards = shards or workers
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        with _executor(workers) as executor:
+            futures = {}
+            for side, file_path in (
+                ("true", true_positives_file),
+                ("algorithm", algorithm_positives_file),
+            ):
+                prefixes, header_end = read_header(file_path)
+                futures[side] = [
+                    executor.submit(
+                        partition,
+                        file_path,
+                        start,
+                        end,
+                        shards,
+                        os.path.join(tmp, f"{side}-{chunk}"),
+                        prefixes,
+                    )
+                    for chunk, (start, end) in enumerate(
+                        split_file(file_path, workers, header_end)
+                    )
+                ]
+            paths = {
+                side: [future.result() for future in side_futures]
+                for side, side_futures in futures.items()
+            }
+
+            cms = executor.map(
+                count_shard,
+                [[chunk[shard] for chunk in paths["true"]] for shard in range(shards)],
+                [
+                    [chunk[shard] for chunk in paths["algorithm"]]
+                    for shard in range(shards)
+                ],
+            )
+            return ConfusionMatrix(*(sum(column) for column in zip(*cms)))
+
+
+class _SerialExecutor(Executor):
+    """An executor that runs each call in the calling process."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def _executor(workers: int) -> Executor:
+    return _SerialExecutor() if workers == 1 else ProcessPoolExecutor(workers)
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Calculates precision, recall and f1-score given true and algorithm positives, with several processes"
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the true positive matches",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the algorithm positive matches",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes",
+    )
+    parser.add_argument(
+        "-s",
+        "--shards",
+        type=int,
+        default=None,
+        help="number of shards; the number of workers by default",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    for file_path in [args.true_positives_file, args.algorithm_positives_file]:
+        if not os.path.exists(file_path):
+            raise argparse.ArgumentTypeError(f"File {file_path} does not exist")
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    cm = calculate_confusion_matrix_sharded(
+        args.true_positives_file,
+        args.algorithm_positives_file,
+        args.workers,
+        args.shards,
+    )
+    print_metrics(cm, calculate_metrics(cm))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Approximate precision, recall, and F1-score in a fixed amount of memory,
+for pair files too large to evaluate exactly.
+
+The true positive matches are summarized by a Bloom filter, which
+answers whether an algorithm positive match is a true one, and the
+number of distinct matches of each kind is estimated with HyperLogLog
+sketches. Estimates come with bounds of two standard errors.
+
+The input files must have one pair per line, as described in
+`metrics.py`. The true positives file is read twice.
+
+Usage (from the `metrics` directory):
+    python -m src.sketches -t true.csv -a algorithm.csv -m 16
+"""
+
+import argparse
+import collections
+import hashlib
+import math
+import os
+import warnings
+from collections.abc import Iterable, Iterator
+
+from .metrics import ConfusionMatrix, Metrics, pair_key, read_rows
+
+Estimate = collections.namedtuple("Estimate", ["value", "low", "high"])
+ApproximateCounts = collections.namedtuple(
+    "ApproximateCounts", ["tp", "algorithm", "true"]
+)
+
+# Number of standard errors covered by the bounds of the estimates.
+Z: float = 2.0
+
+# The smallest Bloom filter of the true positives, in bytes.
+MIN_FILTER_BYTES: int = 2**10
+
+# Above this false positive rate the filter is too full for its hits to
+# tell true positives apart, and the rate is clamped to it.
+MAX_FALSE_POSITIVE_RATE: float = 0.5
+
+
+def hash_key(key: str) -> int:
+    """
+    Hash a key into 128 uniformly distributed bits.
+
+    Args:
+        key (str): the key to hash.
+
+    Returns:
+        int: the hash of the key.
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=16).digest())
+
+
+class BloomFilter:
+    """
+    A Bloom filter over 128-bit hashes, with a fixed number of bits.
+    """
+
+    def __init__(self, bits: int, hashes: int) -> None:
+        """
+        Args:
+            bits (int): the size of the filter, in bits.
+            hashes (int): the number of bits set per item.
+        """
+        self.bits: int = max(8, bits - bits % 8)
+        self.hashes: int = hashes
+        self.array: bytearray = bytearray(self.bits // 8)
+
+    @classmethod
+    def for_capacity(cls, memory: int, capacity: int) -> "BloomFilter":
+        """
+        Create a filter of a given memory with the number of hashes that
+        minimizes its false positive rate for a number of items.
+
+        Args:
+            memory (int): the size of the filter, in bytes.
+            capacity (int): the expected number of items.
+        """
+        hashes = round(memory * 8 / max(capacity, 1) * math.log(2))
+        return cls(memory * 8, min(max(hashes, 1), 32))
+
+    def _positions(self, hashed: int) -> Iterator[int]:
+        first, second = hashed >> 64, (hashed & (2**64 - 1)) | 1
+        return ((first + i * second) % self.bits for i in range(self.hashes))
+
+    def add(self, hashed: int) -> None:
+        """
+        Add an item, given its hash.
+
+        Args:
+            hashed (int): the 128-bit hash of the item.
+        """
+        for position in self._positions(hashed):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, hashed: int) -> bool:
+        return all(
+            self.array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(hashed)
+        )
+
+    @property
+    def false_positive_rate(self) -> float:
+        """
+        Estimate the false positive rate from the fraction of bits set.
+        """
+        ones = sum(byte.bit_count() for byte in self.array)
+        return (ones / self.bits) ** self.hashes
+
+
+class HyperLogLog:
+    """
+    A HyperLogLog sketch of the number of distinct items.
+    """
+
+    def __init__(self, precision: int = 14) -> None:
+        """
+        Args:
+            precision (int): the number of bits of the hash that select a
+                register. The sketch has 2**precision one-byte registers.
+        """
+        self.precision: int = precision
+        self.registers: bytearray = bytearray(2**precision)
+
+    def add(self, hashed: int) -> None:
+        """
+        Add an item, given its hash.
+
+        Args:
+            hashed (int): the 128-bit hash of the item. Its lowest 64
+                bits are used.
+        """
+        hashed &= 2**64 - 1
+        register = hashed >> (64 - self.precision)
+        rest = hashed & (2 ** (64 - self.precision) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    @property
+    def relative_error(self) -> float:
+        """Return the relative standard error of the estimates."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def __len__(self) -> int:
+        return round(self.estimate())
+
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct items added.
+
+        Returns:
+            float: the estimated number of distinct items.
+        """
+        m = len(self.registers)
+        raw = (0.7213 / (1 + 1.079 / m)) * m**2 / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+
+        return raw
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return min(numerator / denominator, 1.0) if denominator > 0 else 0.0
+
+
+def estimate_counts(
+    true_rows: Iterable[list[str]],
+    algorithm_rows: Iterable[list[str]],
+    memory: int,
+    precision: int = 14,
+) -> ApproximateCounts:
+    """
+    Estimate the number of true positives and of distinct true and
+    algorithm positive matches in a fixed amount of memory.
+
+    Three HyperLogLog sketches count the distinct true, algorithm and
+    apparently true algorithm positives; the rest of the memory is used
+    by the Bloom filter of the true positives. The apparently true
+    algorithm positives include the false positives of the filter, which
+    are discounted with its estimated false positive rate.
+
+    Args:
+        true_rows (Iterable[list[str]]): the rows of the true positives
+            file. They are iterated twice: to size the filter and to
+            fill it.
+        algorithm_rows (Iterable[list[str]]): the rows of the algorithm
+            positives file.
+        memory (int): the memory for the sketches, in bytes.
+        precision (int): the precision of the HyperLogLog sketches.
+
+    Returns:
+        ApproximateCounts: the estimated counts, with bounds of two
+        standard errors.
+
+    Raises:
+        ValueError: if the memory leaves less than `MIN_FILTER_BYTES`
+            for the Bloom filter.
+    """
+    filter_memory: int = memory - 3 * 2**precision
+    if filter_memory < MIN_FILTER_BYTES:
+        raise ValueError(
+            f"At least {3 * 2**precision + MIN_FILTER_BYTES} bytes of memory are"
+            f" needed with a precision of {precision}"
+        )
+
+    true_count, algorithm_count, hits_count = (HyperLogLog(precision) for _ in range(3))
+    for row in true_rows:
+        true_count.add(hash_key(pair_key(row)))
+
+    bloom = BloomFilter.for_capacity(filter_memory, len(true_count))
+    for row in true_rows:
+        bloom.add(hash_key(pair_key(row)))
+
+    for row in algorithm_rows:
+        hashed = hash_key(pair_key(row))
+        algorithm_count.add(hashed)
+        if hashed in bloom:
+            hits_count.add(hashed)
+
+    error = Z * true_count.relative_error
+    rate = bloom.false_positive_rate
+    if rate > MAX_FALSE_POSITIVE_RATE:
+        warnings.warn(
+            f"The Bloom filter is saturated (false positive rate {rate:.2f}), so"
+            " the true positives are unreliable; give the sketches more memory"
+        )
+        rate = MAX_FALSE_POSITIVE_RATE
+    t, a, h = (
+        sketch.estimate() for sketch in (true_count, algorithm_count, hits_count)
+    )
+
+    def true_positives(hits: float, algorithm: float) -> float:
+        return min(max((hits - rate * algorithm) / (1 - rate), 0.0), a, t)
+
+    return ApproximateCounts(
+        tp=Estimate(
+            true_positives(h, a),
+            true_positives(h * (1 - error), a * (1 + error)),
+            true_positives(h * (1 + error), a * (1 - error)),
+        ),
+        algorithm=Estimate(a, a * (1 - error), a * (1 + error)),
+        true=Estimate(t, t * (1 - error), t * (1 + error)),
+    )
+
+
+def approximate_confusion_matrix(counts: ApproximateCounts) -> ConfusionMatrix:
+    """
+    Estimate the confusion matrix from the estimated counts.
+
+    Args:
+        counts (ApproximateCounts): the estimated counts.
+
+    Returns:
+        ConfusionMatrix: the confusion matrix, with an `Estimate` of
+        each of tp, fp, fn.
+    """
+    tp, a, t = counts
+    return ConfusionMatrix(
+        tp=tp,
+        fp=Estimate(a.value - tp.value, max(a.low - tp.high, 0), a.high - tp.low),
+        fn=Estimate(t.value - tp.value, max(t.low - tp.high, 0), t.high - tp.low),
+    )
+
+
+def approximate_metrics(counts: ApproximateCounts) -> Metrics:
+    """
+    Estimate precision, recall and F1-score from the estimated counts.
+
+    Args:
+        counts (ApproximateCounts): the estimated counts.
+
+    Returns:
+        Metrics: the metrics, with an `Estimate` of each of precision,
+        recall, f1_score.
+    """
+    tp, a, t = counts
+    return Metrics(
+        precision=Estimate(
+            _ratio(tp.value, a.value), _ratio(tp.low, a.high), _ratio(tp.high, a.low)
+        ),
+        recall=Estimate(
+            _ratio(tp.value, t.value), _ratio(tp.low, t.high), _ratio(tp.high, t.low)
+        ),
+        f1_score=Estimate(
+            _ratio(2 * tp.value, a.value + t.value),
+            _ratio(2 * tp.low, a.high + t.high),
+            _ratio(2 * tp.high, a.low + t.low),
+        ),
+    )
+
+
+class RowsFromFile:
+    """
+    The rows of a CSV file, which can be iterated more than once without
+    holding them in memory. The CURIEs of a compacted file are expanded.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path: str = file_path
+
+    def __iter__(self) -> Iterator[list[str]]:
+        with open(self.file_path, "r") as f:
+            yield from read_rows(f)
+
+
+def print_approximate_metrics(cm: ConfusionMatrix, metrics: Metrics) -> None:
+    """
+    Print the estimated number of correct links found and the estimated
+    metrics, with their bounds.
+
+    Args:
+        cm (ConfusionMatrix): the confusion matrix of estimates.
+        metrics (Metrics): the metrics of estimates.
+    """
+    tp, _, fn = cm
+    print(
+        f"Correct links found: ~{tp.value:.0f} [{tp.low:.0f}, {tp.high:.0f}]"
+        f" / ~{tp.value + fn.value:.0f}"
+    )
+    for name, estimate in [
+        ("Precision", metrics.precision),
+        ("Recall", metrics.recall),
+        ("F1-score", metrics.f1_score),
+    ]:
+        print(f"{name}: {estimate.value:.3f} [{estimate.low:.3f}, {estimate.high:.3f}]")
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Estimates precision, recall and f1-score given true and algorithm positives, in fixed memory"
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the true positive matches",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the algorithm positive matches",
+    )
+    parser.add_argument(
+        "-m",
+        "--memory",
+        type=int,
+        default=16,
+        help="memory for the sketches, in MiB",
+    )
+    parser.add_argument(
+        "-p",
+        "--precision",
+        type=int,
+        default=14,
+        help="precision of the HyperLogLog sketches; the error shrinks by half every two steps",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    for file_path in [args.true_positives_file, args.algorithm_positives_file]:
+        if not os.path.exists(file_path):
+            raise argparse.ArgumentTypeError(f"File {file_path} does not exist")
+
+    if args.memory * 2**20 < 3 * 2**args.precision + MIN_FILTER_BYTES:
+        raise argparse.ArgumentTypeError(
+            f"{args.memory} MiB is too little memory for a precision of {args.precision}"
+        )
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    counts = estimate_counts(
+        RowsFromFile(args.true_positives_file),
+        RowsFromFile(args.algorithm_positives_file),
+        args.memory * 2**20,
+        args.precision,
+    )
+    print_approximate_metrics(
+        approximate_confusion_matrix(counts), approximate_metrics(counts)
+    )
+
+
+if __name__ == "__main__":
+    main()
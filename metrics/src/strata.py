@@ -0,0 +1,245 @@
+"""
+Module to measure the precision, recall, and F1-score of a duplicate
+detection algorithm separately for each stratum of matches, such as the
+pair of source sites of the listings or the pair of values of one of
+their attributes.
+
+Usage (from the `metrics` directory):
+    python -m src.strata -t true.csv -a algorithm.csv
+    python -m src.strata -t true.csv -a algorithm.csv -s property_type -d data.csv
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+from collections.abc import Callable, Iterable
+from typing import IO
+
+from .metrics import (
+    ConfusionMatrix,
+    calculate_metrics,
+    read_pairs_from_file,
+)
+
+SITE: re.Pattern = re.compile(r"listing_(site\d+)_")
+
+Stratum = Callable[[frozenset[str]], str]
+
+
+def site(uri: str) -> str:
+    """
+    Return the source site encoded in the URI of a listing.
+
+    Args:
+        uri (str): the URI of a listing, such as
+            "...pronto.owl#listing_site2_A1132038728".
+
+    Returns:
+        str: the source site, such as "site2", or "unknown".
+    """
+    match = SITE.search(uri)
+    return match.group(1) if match else "unknown"
+
+
+def site_pair(pair: frozenset[str]) -> str:
+    """
+    Return the stratum of a match given by the source sites of its
+    listings, such as "site2-site3".
+
+    Args:
+        pair (frozenset[str]): the IDs of the match.
+
+    Returns:
+        str: the sorted source sites of the match, joined by "-".
+    """
+    sites = sorted(site(uri) for uri in pair)
+    return "-".join([sites[0], sites[-1]])
+
+
+def attribute_pair(attributes: dict[str, str]) -> Stratum:
+    """
+    Return a function that gives the stratum of a match from the values
+    of an attribute of its listings, such as "casa-departamento".
+
+    Args:
+        attributes (dict[str, str]): the value of the attribute for the
+            URI of each listing. Missing listings have an empty value.
+
+    Returns:
+        Stratum: the function that returns the stratum of a match.
+    """
+
+    def stratum(pair: frozenset[str]) -> str:
+        values = sorted(attributes.get(uri, "") for uri in pair)
+        return "-".join([values[0], values[-1]])
+
+    return stratum
+
+
+def read_attribute_from_file(
+    file_path: str, attribute: str, uris: Iterable[str]
+) -> dict[str, str]:
+    """
+    Read the values of an attribute of some listings from a data file.
+
+    Args:
+        file_path (str): path to a CSV file with a `uri` column.
+        attribute (str): the column to read.
+        uris (Iterable[str]): the URIs of the listings to read.
+
+    Returns:
+        dict[str, str]: the value of the attribute for each URI found.
+    """
+    uris = set(uris)
+    with open(file_path, "r") as f:
+        return {
+            row["uri"]: row[attribute].strip()
+            for row in csv.DictReader(f)
+            if row["uri"] in uris
+        }
+
+
+def calculate_stratified_confusion_matrices(
+    true_pos: set, algorithm_pos: set, stratum: Stratum
+) -> dict[str, ConfusionMatrix]:
+    """
+    Calculate the confusion matrix of each stratum in a single pass over
+    the true and algorithm positives.
+
+    Args:
+        true_pos (set): a set with the true positive matches.
+        algorithm_pos (set): a set with the algorithm positive matches.
+        stratum (Stratum): a function that returns the stratum of a
+            match.
+
+    Returns:
+        dict[str, ConfusionMatrix]: the confusion matrix of each stratum,
+        sorted by stratum.
+    """
+    counts: dict[str, list[int]] = {}
+
+    for pair in true_pos:
+        count = counts.setdefault(stratum(pair), [0, 0, 0])
+        count[0 if pair in algorithm_pos else 2] += 1
+
+    for pair in algorithm_pos:
+        if pair not in true_pos:
+            counts.setdefault(stratum(pair), [0, 0, 0])[1] += 1
+
+    return {key: ConfusionMatrix(*counts[key]) for key in sorted(counts)}
+
+
+def write_stratified_metrics(output: IO[str], cms: dict[str, ConfusionMatrix]) -> None:
+    """
+    Write a table with the confusion matrix and the metrics of each
+    stratum, followed by those of all matches.
+
+    Args:
+        output (IO[str]): the file to write to.
+        cms (dict[str, ConfusionMatrix]): the confusion matrix of each
+            stratum.
+    """
+    total = ConfusionMatrix(
+        *(sum(cm[field] for cm in cms.values()) for field in range(3))
+    )
+
+    writer = csv.writer(output)
+    writer.writerow(
+        ["stratum", *ConfusionMatrix._fields, "precision", "recall", "f1_score"]
+    )
+    for key, cm in [*cms.items(), ("all", total)]:
+        metrics = calculate_metrics(cm)
+        writer.writerow([key, *cm, *(f"{value:.3f}" for value in metrics)])
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Calculates precision, recall and f1-score for each stratum of matches"
+    )
+    parser.add_argument(
+        "-t",
+        "--true_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the true positive matches",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm_positives_file",
+        type=str,
+        required=True,
+        help="path to the file with the algorithm positive matches",
+    )
+    parser.add_argument(
+        "-s",
+        "--stratify",
+        type=str,
+        default="site",
+        help="'site' to stratify by the source sites of the listings, or a column of the data file",
+    )
+    parser.add_argument(
+        "-d",
+        "--data_file",
+        type=str,
+        default=None,
+        help="path to the CSV file with the attributes of each listing; required to stratify by a column",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        type=str,
+        default=None,
+        help="path to the file to write the table to; the standard output by default",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.stratify != "site" and args.data_file is None:
+        parser.error(f"stratifying by {args.stratify!r} requires a data file")
+
+    for file_path in [
+        args.true_positives_file,
+        args.algorithm_positives_file,
+        args.data_file,
+    ]:
+        if file_path is not None and not os.path.exists(file_path):
+            raise argparse.ArgumentTypeError(f"File {file_path} does not exist")
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    true_positives = read_pairs_from_file(args.true_positives_file)
+    algorithm_positives = read_pairs_from_file(args.algorithm_positives_file)
+
+    if args.stratify == "site":
+        stratum = site_pair
+    else:
+        uris = set().union(*true_positives, *algorithm_positives)
+        stratum = attribute_pair(
+            read_attribute_from_file(args.data_file, args.stratify, uris)
+        )
+
+    cms = calculate_stratified_confusion_matrices(
+        true_positives, algorithm_positives, stratum
+    )
+
+    if args.output_file is None:
+        write_stratified_metrics(sys.stdout, cms)
+    else:
+        with open(args.output_file, "w", newline="") as output:
+            write_stratified_metrics(output, cms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from src.api import TruthIndex, calculate_metrics_batch
+from src.metrics import (
+    ConfusionMatrix,
+    calculate_confusion_matrix,
+    calculate_metrics,
+)
+
+
+class TestMetricsAPI(unittest.TestCase):
+    """Test the in-process metrics API."""
+
+    def setUp(self):
+        """Index some true positive matches."""
+        self.true_positives = {
+            frozenset(["1", "2"]),
+            frozenset(["2", "3"]),
+            frozenset(["4", "5"]),
+        }
+        self.index = TruthIndex(self.true_positives)
+
+    def test_score(self):
+        """Test that scoring matches the set-based confusion matrix."""
+        algorithm_positives = [("2", "1"), ("1", "2"), ("6", "7"), ("5", "4")]
+
+        self.assertEqual(
+            self.index.score(algorithm_positives),
+            calculate_confusion_matrix(
+                self.true_positives, {frozenset(p) for p in algorithm_positives}
+            ),
+        )
+
+    def test_score_arrays(self):
+        """Test that string and interned arrays are scored alike."""
+        links = np.array([["3", "2"], ["8", "9"]])
+        expected = ConfusionMatrix(tp=1, fp=1, fn=2)
+
+        self.assertEqual(self.index.score(links), expected)
+        self.assertEqual(self.index.score(self.index.intern(links)), expected)
+
+    def test_index_does_not_grow(self):
+        """Test that scoring unknown IDs does not change the index."""
+        ids = dict(self.index.ids)
+        for i in range(100):
+            cm = self.index.score([(f"x{i}", f"y{i}"), ("y", f"x{i}"), ("1", "2")])
+            self.assertEqual(cm, ConfusionMatrix(tp=1, fp=2, fn=2))
+
+        self.assertEqual(self.index.ids, ids)
+        self.assertEqual(
+            self.index.score_many([[("a", "b"), ("b", "a"), ("a", "c")]]).tolist(),
+            [[0, 2, 3]],
+        )
+
+    def test_score_many(self):
+        """Test that many candidate link sets are scored in one call."""
+        cms = self.index.score_many([[("1", "2")], [], [("4", "5"), ("2", "3")]])
+
+        np.testing.assert_array_equal(cms, [[1, 0, 2], [0, 0, 3], [2, 0, 1]])
+
+    def test_score_thresholds(self):
+        """Test that each threshold keeps the links scored at or above it."""
+        links = [("1", "2"), ("6", "7"), ("2", "3")]
+        scores = np.array([0.9, 0.8, 0.5])
+
+        cms = self.index.score_thresholds(links, scores, np.array([1.0, 0.8, 0.5]))
+
+        np.testing.assert_array_equal(cms, [[0, 0, 3], [1, 1, 2], [2, 1, 1]])
+
+    def test_calculate_metrics_batch(self):
+        """Test that batched metrics match `calculate_metrics`."""
+        cms = np.array([[1, 1, 1], [0, 0, 3], [2, 1, 0]])
+
+        np.testing.assert_allclose(
+            calculate_metrics_batch(cms),
+            [calculate_metrics(ConfusionMatrix(*cm)) for cm in cms],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
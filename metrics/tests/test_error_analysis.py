@@ -0,0 +1,90 @@
+import io
+import json
+import pathlib
+import tempfile
+import unittest
+
+from src.error_analysis import RecordIndex, diff_records, error_pairs, write_errors
+
+
+class TestErrorAnalysis(unittest.TestCase):
+    """Test the export of false positive and false negative matches."""
+
+    def setUp(self):
+        """Create a data file with a record that spans several lines."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_file = pathlib.Path(self.directory.name) / "data.csv"
+        self.data_file.write_text(
+            'uri,price,address\n1,100,"calle 1\nla plata"\n2,100,calle 1\n3,90,calle 2\n'
+        )
+        self.records = RecordIndex(str(self.data_file))
+
+    def tearDown(self):
+        """Close the index and remove the data file."""
+        self.records.close()
+        self.directory.cleanup()
+
+    def test_record_index(self):
+        """Test that records are looked up by their uri."""
+        self.assertEqual(len(self.records), 3)
+        self.assertEqual(
+            self.records["1"],
+            {"uri": "1", "price": "100", "address": "calle 1\nla plata"},
+        )
+        self.assertEqual(
+            self.records["3"], {"uri": "3", "price": "90", "address": "calle 2"}
+        )
+        self.assertIsNone(self.records.get("4"))
+
+    def test_error_pairs(self):
+        """Test that the errors are the sorted fp and fn matches."""
+        true_positives = {frozenset(["1", "2"]), frozenset(["4", "5"])}
+        algorithm_positives = {frozenset(["2", "1"]), frozenset(["3", "1"])}
+
+        self.assertEqual(
+            list(error_pairs(true_positives, algorithm_positives)),
+            [("fp", "1", "3"), ("fn", "4", "5")],
+        )
+
+    def test_diff_records(self):
+        """Test that only the attributes that differ are reported."""
+        self.assertEqual(
+            diff_records(self.records["2"], self.records["3"]),
+            {"address": ("calle 1", "calle 2"), "price": ("100", "90")},
+        )
+
+    def test_write_errors_csv(self):
+        """Test that errors are written side by side in CSV."""
+        output = io.StringIO()
+        written = write_errors(
+            output, iter([("fp", "2", "3")]), self.records, "csv", diff=True
+        )
+
+        self.assertEqual(written, 1)
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            [
+                "error,id1,id2,price_1,price_2,address_1,address_2,diff",
+                "fp,2,3,100,90,calle 1,calle 2,address;price",
+            ],
+        )
+
+    def test_write_errors_jsonl(self):
+        """Test that errors are written as JSON lines."""
+        output = io.StringIO()
+        write_errors(output, iter([("fn", "2", "4")]), self.records, "jsonl")
+
+        self.assertEqual(
+            json.loads(output.getvalue()),
+            {
+                "error": "fn",
+                "id1": "2",
+                "id2": "4",
+                "record1": {"uri": "2", "price": "100", "address": "calle 1"},
+                "record2": None,
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
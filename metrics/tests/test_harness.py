@@ -0,0 +1,135 @@
+import json
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from src.harness import read_matches, run_trials, summarize, update_table
+from src.metrics import ConfusionMatrix
+
+# Write two of the true matches and a false one, after allocating memory.
+MATCHER = (
+    f'{sys.executable} -c "import sys; memory = bytearray({{memory}}); '
+    "open(sys.argv[1], 'w').write('1,2\\n3,4\\n5,9\\n')\" {output}"
+)
+
+
+class TestHarness(unittest.TestCase):
+    """Test the harness that runs a tool over repeated trials."""
+
+    def setUp(self):
+        """Create the true positive matches and a directory for the table."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.directory.name)
+        self.true_pos = {frozenset(p) for p in [("1", "2"), ("3", "4"), ("5", "6")]}
+
+    def tearDown(self):
+        """Remove the table."""
+        self.directory.cleanup()
+
+    def test_run_trials(self):
+        """Test that each trial is measured and its matches are evaluated."""
+        results = run_trials(
+            MATCHER, {"memory": str(200 * 2**20)}, self.true_pos, trials=2, warmup=1
+        )
+
+        self.assertEqual(len(results), 2)
+        for trial, cm in results:
+            self.assertEqual(trial.returncode, 0)
+            self.assertGreater(trial.wall, 0)
+            self.assertGreaterEqual(trial.wall, trial.cpu / 2)
+            self.assertGreater(trial.peak_rss, 200 * 2**20)
+            self.assertEqual(cm, ConfusionMatrix(tp=2, fp=1, fn=1))
+
+        row = summarize("fake", "3", results)
+        self.assertEqual((row["trials"], row["failures"]), (2, 0))
+        self.assertEqual((row["tp"], row["fp"], row["fn"]), (2, 1, 1))
+        self.assertAlmostEqual(row["f1_score"], 0.6667)
+        self.assertGreater(row["peak_rss_mib"], 200)
+
+    def test_failures_and_stdout(self):
+        """Test that failed trials are counted and stdout is captured."""
+        results = run_trials(f"{sys.executable} -c 'exit(1)'", {}, self.true_pos, 2)
+        self.assertEqual(summarize("fake", "3", results)["failures"], 2)
+
+        printer = f"{sys.executable} -c 'print(\"+,1,2,0.9\")'"
+        results = run_trials(printer, {}, self.true_pos, 1, output_format="duke")
+        self.assertEqual(results[0][1], ConfusionMatrix(tp=1, fp=0, fn=2))
+
+    def test_read_clusters(self):
+        """Test that clusters are read as every pair of their URIs."""
+        path = self.root / "clusters.csv"
+        path.write_text("Cluster ID,uri\n0,1\n0,2\n0,3\n1,4\n")
+
+        self.assertEqual(
+            read_matches(str(path), "cluster"),
+            {frozenset(p) for p in [("1", "2"), ("1", "3"), ("2", "3")]},
+        )
+
+    def test_read_compacted(self):
+        """Test that the CURIEs of every format are expanded."""
+        expected = {frozenset(["http://x/1", "http://x/2"])}
+        outputs = {
+            "pairs": "x:1,x:2\n",
+            "duke": "+,x:1,x:2,0.9\n-,x:1,x:3,0.1\n",
+            "cluster": "uri,Cluster ID\nx:1,0\nx:2,0\nx:3,1\n",
+        }
+        for output_format, content in outputs.items():
+            path = self.root / f"{output_format}.csv"
+            path.write_text("@prefix x: <http://x/>\n" + content)
+            with self.subTest(output_format):
+                self.assertEqual(read_matches(str(path), output_format), expected)
+
+    def test_variables_with_spaces(self):
+        """Test that each value stays one argument, even with spaces."""
+        path = self.root / "true \"matches\" 'x'.csv"
+        path.write_text("1,2\n")
+        copier = (
+            f'{sys.executable} -c "import shutil, sys; '
+            'shutil.copy(sys.argv[1], sys.argv[2])" {source} {output}'
+        )
+        results = run_trials(copier, {"source": str(path)}, self.true_pos, 1)
+        self.assertEqual(results[0][1], ConfusionMatrix(tp=1, fp=0, fn=2))
+
+    def test_literal_braces(self):
+        """Test that braces that are not placeholders are kept."""
+        path = self.root / "arguments.json"
+        recorder = (
+            f'{sys.executable} -c "import json, sys; '
+            "open(sys.argv[1], 'w').write(json.dumps(sys.argv[2:]))\" "
+            "{log} '{\"a\": {\"b\": 1}}' '{print $1}' {unknown} {value}"
+        )
+        run_trials(recorder, {"log": str(path), "value": "x"}, self.true_pos, 1)
+
+        self.assertEqual(
+            json.loads(path.read_text()),
+            ['{"a": {"b": 1}}', "{print $1}", "{unknown}", "x"],
+        )
+
+    def test_missing_tool(self):
+        """Test that a tool that cannot be started counts as a failure."""
+        missing = str(self.root / "missing-matcher")
+        with self.assertWarns(UserWarning):
+            results = run_trials(f"{missing} {{output}}", {}, self.true_pos, 2)
+
+        self.assertEqual([trial.returncode for trial, _ in results], [127, 127])
+        self.assertEqual(summarize("fake", "3", results)["failures"], 2)
+
+    def test_update_table(self):
+        """Test that rows are replaced by tool and size, and sorted."""
+        table = str(self.root / "comparison.csv")
+        results = [run_trials(MATCHER, {"memory": "0"}, self.true_pos, 1)[0]]
+
+        update_table(table, summarize("duke", "1000", results))
+        update_table(table, summarize("dedupe", "1000", results))
+        update_table(table, summarize("duke", "200", results))
+        rows = update_table(table, summarize("duke", "1000", []))
+
+        self.assertEqual(
+            [(row["tool"], row["size"], row["trials"]) for row in rows],
+            [("duke", "200", "1"), ("dedupe", "1000", "1"), ("duke", "1000", 0)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
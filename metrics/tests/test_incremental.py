@@ -0,0 +1,82 @@
+import pathlib
+import tempfile
+import unittest
+
+from src.incremental import EvaluationState, read_delta_from_file
+from src.metrics import ConfusionMatrix, calculate_confusion_matrix
+
+
+class TestIncrementalEvaluation(unittest.TestCase):
+    """Test the incremental evaluation of algorithm runs."""
+
+    def setUp(self):
+        """Open an evaluation state with some true positives."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.state = EvaluationState(str(pathlib.Path(self.directory.name) / "state"))
+        self.true_positives = {
+            frozenset(["1", "2"]),
+            frozenset(["2", "3"]),
+            frozenset(["4", "5"]),
+        }
+        self.state.load_truth(self.true_positives)
+
+    def tearDown(self):
+        """Close the evaluation state and remove it."""
+        self.state.close()
+        self.directory.cleanup()
+
+    def test_load_truth(self):
+        """Test that a new truth starts from an empty run."""
+        self.assertEqual(self.state.confusion_matrix, ConfusionMatrix(tp=0, fp=0, fn=3))
+
+    def test_apply_delta(self):
+        """Test that deltas update the counts as a full evaluation would."""
+        self.state.apply_delta([("2", "1"), ("6", "7")], [])
+        cm = self.state.apply_delta([("5", "4"), ("1", "2")], [("1", "2"), ("7", "6")])
+
+        # Removals are applied first, so 1-2 is removed and added back.
+        algorithm_positives = {frozenset(["1", "2"]), frozenset(["4", "5"])}
+        self.assertEqual(
+            cm, calculate_confusion_matrix(self.true_positives, algorithm_positives)
+        )
+
+    def test_apply_delta_ignores_unknown_removals(self):
+        """Test that removing links that are not in the run is a no-op."""
+        self.state.apply_delta([("1", "2")], [])
+        cm = self.state.apply_delta([], [("2", "3"), ("8", "9")])
+
+        self.assertEqual(cm, ConfusionMatrix(tp=1, fp=0, fn=2))
+
+    def test_apply_run(self):
+        """Test that a full run is diffed against the stored one."""
+        self.state.apply_run([("1", "2"), ("6", "7")])
+        algorithm_positives = {frozenset(["2", "3"]), frozenset(["8", "9"])}
+        cm = self.state.apply_run(algorithm_positives)
+
+        self.assertEqual(
+            cm, calculate_confusion_matrix(self.true_positives, algorithm_positives)
+        )
+
+    def test_read_delta_from_file(self):
+        """Test that added and removed links are read from a file."""
+        delta_file = pathlib.Path(self.directory.name) / "delta.csv"
+        delta_file.write_text("+,1,2\n-,3,4\n+,5,6\n")
+
+        self.assertEqual(
+            read_delta_from_file(str(delta_file)),
+            ([("1", "2"), ("5", "6")], [("3", "4")]),
+        )
+
+    def test_read_compacted_delta(self):
+        """Test that the CURIEs of a delta match the expanded links."""
+        delta_file = pathlib.Path(self.directory.name) / "delta.csv"
+        delta_file.write_text("@prefix x: <http://x/>\n+,x:1,x:2\n-,x:3,4\n")
+
+        self.assertEqual(
+            read_delta_from_file(str(delta_file)),
+            ([("http://x/1", "http://x/2")], [("http://x/3", "4")]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
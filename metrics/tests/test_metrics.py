@@ -1,5 +1,6 @@
 import argparse
 import pathlib
+import sqlite3
 import unittest
 from io import StringIO
 from unittest.mock import patch
@@ -8,6 +9,7 @@ from src.metrics import (
     ConfusionMatrix,
     Metrics,
     calculate_confusion_matrix,
+    calculate_confusion_matrix_sql,
     calculate_metrics,
     main,
     read_pairs_from_file,
@@ -43,6 +45,25 @@ class TestDuplicateDetectionMetrics(unittest.TestCase):
             pairs, expected_pairs, msg="Pairs read from file are incorrect"
         )
 
+    def test_read_compacted_pairs(self):
+        """Test that CURIEs are expanded with the prefixes of the file."""
+        compacted_file = pathlib.Path("data") / "test_compacted_positives.csv"
+        compacted_file.write_text("@prefix l: <http://x/listing_>\nl:1,l:2\nl:3,4\n")
+        try:
+            self.assertEqual(
+                read_pairs_from_file(compacted_file),
+                {
+                    frozenset(["http://x/listing_1", "http://x/listing_2"]),
+                    frozenset(["http://x/listing_3", "4"]),
+                },
+            )
+            self.assertEqual(
+                read_pairs_from_file(compacted_file, expand=False),
+                {frozenset(["l:1", "l:2"]), frozenset(["l:3", "4"])},
+            )
+        finally:
+            compacted_file.unlink()
+
     def test_calculate_confusion_matrix(self):
         """Test that the confusion matrix is calculated correctly."""
         true_positives = {frozenset(["1", "2"]), frozenset(["4", "5"])}
@@ -52,6 +73,28 @@ class TestDuplicateDetectionMetrics(unittest.TestCase):
         cm = calculate_confusion_matrix(true_positives, algorithm_positives)
         self.assertEqual(cm, expected_cm)
 
+    def test_calculate_confusion_matrix_sql(self):
+        """Test that the confusion matrix is calculated correctly in SQL."""
+        connection = sqlite3.connect(":memory:")
+        connection.execute(
+            "CREATE TABLE pairs (run TEXT, id1 TEXT, id2 TEXT, duplicate INTEGER)"
+        )
+        connection.executemany(
+            "INSERT INTO pairs VALUES (?, ?, ?, ?)",
+            [
+                ("true", "1", "2", 1),
+                ("true", "4", "5", 1),
+                ("algorithm", "1", "2", 1),
+                ("algorithm", "6", "7", 1),
+                ("algorithm", "4", "5", 0),
+            ],
+        )
+        expected_cm = ConfusionMatrix(tp=1, fp=1, fn=1)
+
+        cm = calculate_confusion_matrix_sql(connection, "true", "algorithm")
+        self.assertEqual(cm, expected_cm)
+        connection.close()
+
     def test_calculate_metrics(self):
         """Test that the metrics are calculated correctly."""
         cm = ConfusionMatrix(tp=1, fp=1, fn=1)
@@ -74,6 +117,7 @@ class TestDuplicateDetectionMetrics(unittest.TestCase):
         mock_parse_args.return_value = argparse.Namespace(
             true_positives_file=self.true_positives_file,
             algorithm_positives_file=self.algorithm_positives_file,
+            database=None,
         )
 
         main()
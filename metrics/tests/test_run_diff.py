@@ -0,0 +1,160 @@
+import csv
+import io
+import pathlib
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.metrics import calculate_confusion_matrix, read_pairs_from_file
+from src.run_diff import (
+    CHANGES,
+    PairCodec,
+    confusion_matrix,
+    diff_runs,
+    read_keys,
+    write_changes,
+)
+
+
+class TestRunDiff(unittest.TestCase):
+    """Test the diff of the matches of two runs."""
+
+    def setUp(self):
+        """Create a directory for the pairs files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.directory.name)
+
+    def tearDown(self):
+        """Remove the pairs files."""
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        path = self.root / name
+        path.write_text(text)
+        return str(path)
+
+    def diff(self, true_file, old_file, new_file):
+        codec = PairCodec()
+        true = read_keys(true_file, codec)
+        old = read_keys(old_file, codec)
+        new = read_keys(new_file, codec)
+        output = io.StringIO()
+        write_changes(output, codec, diff_runs(true, old, new))
+        output.seek(0)
+        return true, old, new, list(csv.reader(output))
+
+    def test_labels(self):
+        """Test that each changed link is labeled, whatever its orientation."""
+        true_file = self.write("true.csv", "1,2\n3,4\n5,6\n")
+        old_file = self.write("old.csv", "1,2\n4,3\n7,8\n9,10\n")
+        new_file = self.write("new.csv", "2,1\n5,6\n10,9\n11,12\n11,12\n")
+
+        _, _, _, rows = self.diff(true_file, old_file, new_file)
+
+        self.assertEqual(rows[0], ["change", "id1", "id2"])
+        self.assertEqual(
+            [(row[0], frozenset(row[1:])) for row in rows[1:]],
+            [
+                ("new_tp", frozenset(["5", "6"])),
+                ("new_fp", frozenset(["11", "12"])),
+                ("lost_tp", frozenset(["3", "4"])),
+                ("removed_fp", frozenset(["7", "8"])),
+            ],
+        )
+
+    def test_codec(self):
+        """Test that pairs are encoded regardless of their orientation."""
+        codec = PairCodec()
+        keys = codec.encode([["a", "b"], ["b", "a"], ["c"], ["c", "d", "c"]])
+        keys = np.concatenate([keys, codec.encode([["d", "c"]])])
+
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(keys[0], keys[1])
+        self.assertEqual(keys[3], keys[4])
+        firsts, seconds = codec.decode(keys[2:4])
+        self.assertEqual(list(zip(firsts, seconds)), [("c", "c"), ("c", "d")])
+        with self.assertRaises(ValueError):
+            codec.encode([["a", "b", "c"]])
+
+    def test_codec_size(self):
+        """Test that the codec grows with the distinct IDs, not the chunks."""
+        codec = PairCodec()
+        rows = [[str(i % 50), str(i % 7)] for i in range(1000)]
+        for _ in range(10):
+            keys = codec.encode(rows)
+
+        self.assertEqual(codec.size, 50)
+        self.assertEqual(sorted(codec.ids.values()), list(range(50)))
+        firsts, seconds = codec.decode(keys[:3])
+        self.assertEqual(
+            list(zip(firsts, seconds)), [("0", "0"), ("1", "1"), ("2", "2")]
+        )
+
+    def test_rows_as_read_pairs_from_file(self):
+        """Test that rows are read as `read_pairs_from_file` reads them."""
+        true_file = self.write("true.csv", '1,2\n3\n\n"4,5",6\n')
+        old_file = self.write("old.csv", '2,1\n3,3\n"4,5",6\n')
+        new_file = self.write("new.csv", "\n3\n7,7,8\n")
+
+        true, old, new, _ = self.diff(true_file, old_file, new_file)
+
+        true_pos = read_pairs_from_file(true_file)
+        for keys, file in ((old, old_file), (new, new_file)):
+            self.assertEqual(
+                confusion_matrix(true, keys),
+                calculate_confusion_matrix(true_pos, read_pairs_from_file(file)),
+            )
+
+        bad_file = self.write("bad.csv", "1,2,3\n")
+        with self.assertRaisesRegex(ValueError, "bad.csv"):
+            read_keys(bad_file, PairCodec())
+
+    def test_curies(self):
+        """Test that CURIEs are expanded before comparing the runs."""
+        true_file = self.write("true.csv", "https://x/1,https://x/2\n")
+        old_file = self.write("old.csv", "@prefix l: <https://x/>\nl:1,l:2\n")
+        new_file = self.write("new.csv", "https://x/2,https://x/1\n")
+
+        _, _, _, rows = self.diff(true_file, old_file, new_file)
+
+        self.assertEqual(rows, [["change", "id1", "id2"]])
+
+    def test_matches_set_differences(self):
+        """Test that the diff is the one of the sets of both runs."""
+        rng = random.Random(0)
+
+        def pairs(n):
+            return "".join(
+                f"{rng.randrange(60)},{rng.randrange(60)}\n" for _ in range(n)
+            )
+
+        true_file = self.write("true.csv", pairs(300))
+        old_file = self.write("old.csv", pairs(300))
+        new_file = self.write("new.csv", pairs(300))
+
+        true, old, new, rows = self.diff(true_file, old_file, new_file)
+
+        true_pos = read_pairs_from_file(true_file)
+        old_pos = read_pairs_from_file(old_file)
+        new_pos = read_pairs_from_file(new_file)
+        expected = {
+            "new_tp": (new_pos - old_pos) & true_pos,
+            "new_fp": (new_pos - old_pos) - true_pos,
+            "lost_tp": (old_pos - new_pos) & true_pos,
+            "removed_fp": (old_pos - new_pos) - true_pos,
+        }
+        for change in CHANGES:
+            found = [frozenset(row[1:]) for row in rows[1:] if row[0] == change]
+            self.assertEqual(len(found), len(expected[change]))
+            self.assertEqual(set(found), expected[change])
+
+        self.assertEqual(
+            confusion_matrix(true, new),
+            calculate_confusion_matrix(true_pos, new_pos),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
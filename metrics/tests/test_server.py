@@ -0,0 +1,128 @@
+import json
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from src.client import error_message, evaluate
+from src.metrics import ConfusionMatrix, Metrics
+from src.server import EvaluationServer, parse_truth
+
+
+class TestEvaluationServer(unittest.TestCase):
+    """Test the evaluation server and its client."""
+
+    def setUp(self):
+        """Start a server with a truth and write an algorithm file."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.algorithm_positives_file = (
+            pathlib.Path(self.directory.name) / "algorithm.csv"
+        )
+        self.algorithm_positives_file.write_text("1,2\n4,5\n6,7")
+
+        truth = {frozenset(["1", "2"]), frozenset(["2", "3"]), frozenset(["4", "5"])}
+        self.server = EvaluationServer(
+            ("127.0.0.1", 0), {"true": truth}, self.directory.name
+        )
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the server and remove the algorithm file."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.directory.cleanup()
+
+    def wait_for_stats(self, count):
+        """Wait for the latency of `count` evaluations, which is recorded
+        right after each response is sent."""
+        for _ in range(100):
+            stats = self.server.stats.summary()
+            if stats.get("/evaluate", {}).get("count", 0) >= count:
+                break
+            time.sleep(0.01)
+        return stats
+
+    def test_parse_truth(self):
+        """Test that truths are named by their path unless named."""
+        self.assertEqual(
+            parse_truth("data/true.csv"), ("data/true.csv", "data/true.csv")
+        )
+        self.assertEqual(parse_truth("gt=data/true.csv"), ("gt", "data/true.csv"))
+        self.assertEqual(parse_truth("gt=data/a=b.csv"), ("gt", "data/a=b.csv"))
+
+    def test_evaluate(self):
+        """Test that files are evaluated by path and by upload alike."""
+        expected = (
+            ConfusionMatrix(tp=2, fp=1, fn=1),
+            Metrics(precision=2 / 3, recall=2 / 3, f1_score=2 / 3),
+        )
+
+        self.assertEqual(
+            evaluate(self.url, str(self.algorithm_positives_file)), expected
+        )
+        self.assertEqual(
+            evaluate(self.url, str(self.algorithm_positives_file), "true", upload=True),
+            expected,
+        )
+
+    def test_upload_compacted_file(self):
+        """Test that the CURIEs of an uploaded compacted file are expanded."""
+        self.algorithm_positives_file.write_text("@prefix i: <>\ni:1,i:2\n4,i:5\n")
+
+        self.assertEqual(
+            evaluate(self.url, str(self.algorithm_positives_file), upload=True)[0],
+            ConfusionMatrix(tp=2, fp=0, fn=1),
+        )
+
+    def test_concurrent_requests_and_stats(self):
+        """Test that concurrent requests are served and timed."""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda _: evaluate(self.url, str(self.algorithm_positives_file)),
+                    range(8),
+                )
+            )
+
+        self.assertEqual(len(set(results)), 1)
+        self.wait_for_stats(8)
+        with urllib.request.urlopen(f"{self.url}/stats") as response:
+            stats = json.load(response)
+        self.assertEqual(stats["/evaluate"]["count"], 8)
+
+    def test_unknown_truth(self):
+        """Test that evaluating against an unknown truth fails, and is timed."""
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            evaluate(self.url, str(self.algorithm_positives_file), "other")
+        self.assertRegex(error_message(error.exception), r"^400 Bad Request: .*other")
+
+        self.assertEqual(self.wait_for_stats(1)["/evaluate"]["count"], 1)
+
+    def test_files_outside_root(self):
+        """Test that only files under the root of the server are read."""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("1,2\n")
+            f.flush()
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                evaluate(self.url, f.name)
+            self.assertEqual(error.exception.code, 403)
+
+            self.server.root = None
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                evaluate(self.url, str(self.algorithm_positives_file))
+            self.assertEqual(error.exception.code, 403)
+            self.assertEqual(
+                evaluate(self.url, f.name, upload=True)[0],
+                ConfusionMatrix(tp=1, fp=0, fn=2),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
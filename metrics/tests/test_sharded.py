@@ -0,0 +1,93 @@
+import pathlib
+import random
+import tempfile
+import unittest
+
+from src.metrics import calculate_confusion_matrix, read_pairs_from_file
+from src.sharded import calculate_confusion_matrix_sharded, pair_key, split_file
+
+
+class TestShardedConfusionMatrix(unittest.TestCase):
+    """Test the sharded confusion matrix computation."""
+
+    def setUp(self):
+        """Write two random pairs files with repetitions and reversed pairs."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.true_positives_file = pathlib.Path(self.directory.name) / "true.csv"
+        self.algorithm_positives_file = (
+            pathlib.Path(self.directory.name) / "algorithm.csv"
+        )
+
+        rng = random.Random(0)
+        for path in (self.true_positives_file, self.algorithm_positives_file):
+            rows = [f"{rng.randrange(40)},{rng.randrange(40)}" for _ in range(500)]
+            path.write_text("\n".join(rows))
+
+    def tearDown(self):
+        """Remove the pairs files."""
+        self.directory.cleanup()
+
+    def test_pair_key(self):
+        """Test that keys ignore the order and repetition of IDs."""
+        self.assertEqual(pair_key(["2", "1"]), pair_key(["1", "2"]))
+        self.assertEqual(pair_key(["1", "1"]), "1")
+
+    def test_compacted_files(self):
+        """Test that the CURIEs of compacted files are expanded."""
+        self.true_positives_file.write_text(
+            "@prefix l: <https://x/listing_>\nl:1,l:2\nl:3,l:4\nhttps://x/listing_5,l:6\n"
+        )
+        self.algorithm_positives_file.write_text(
+            "https://x/listing_2,https://x/listing_1\nl:7,l:8\n"
+        )
+        expected = calculate_confusion_matrix(
+            read_pairs_from_file(self.true_positives_file),
+            read_pairs_from_file(self.algorithm_positives_file),
+        )
+        self.assertEqual(tuple(expected), (1, 1, 2))
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                self.assertEqual(
+                    calculate_confusion_matrix_sharded(
+                        str(self.true_positives_file),
+                        str(self.algorithm_positives_file),
+                        workers,
+                        directory=self.directory.name,
+                    ),
+                    expected,
+                )
+
+    def test_split_file(self):
+        """Test that ranges cover the file and end at line breaks."""
+        ranges = split_file(str(self.true_positives_file), 7)
+        content = self.true_positives_file.read_bytes()
+
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(content))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(content[end - 1 : end], b"\n")
+
+    def test_matches_single_process(self):
+        """Test that every number of workers gives the exact same result."""
+        expected = calculate_confusion_matrix(
+            read_pairs_from_file(self.true_positives_file),
+            read_pairs_from_file(self.algorithm_positives_file),
+        )
+
+        for workers, shards in [(1, None), (1, 5), (3, None), (2, 7)]:
+            with self.subTest(workers=workers, shards=shards):
+                self.assertEqual(
+                    calculate_confusion_matrix_sharded(
+                        str(self.true_positives_file),
+                        str(self.algorithm_positives_file),
+                        workers,
+                        shards,
+                    ),
+                    expected,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import pathlib
+import random
+import tempfile
+import unittest
+import warnings
+
+from src.metrics import calculate_confusion_matrix, calculate_metrics
+from src.sketches import (
+    BloomFilter,
+    MIN_FILTER_BYTES,
+    HyperLogLog,
+    RowsFromFile,
+    approximate_confusion_matrix,
+    approximate_metrics,
+    estimate_counts,
+    hash_key,
+)
+
+
+class TestSketches(unittest.TestCase):
+    """Test the approximate metrics computed with sketches."""
+
+    def setUp(self):
+        """Create random true and algorithm positives that share half."""
+        rng = random.Random(0)
+        self.true_rows = [
+            [str(rng.randrange(10**6)), str(rng.randrange(10**6))] for _ in range(20000)
+        ]
+        self.algorithm_rows = rng.sample(self.true_rows, 10000) + [
+            [str(rng.randrange(10**6)), str(rng.randrange(10**6))] for _ in range(5000)
+        ]
+
+    def test_bloom_filter(self):
+        """Test that added items are always found and others rarely are."""
+        bloom = BloomFilter.for_capacity(2**14, 10000)
+        for item in range(10000):
+            bloom.add(hash_key(str(item)))
+
+        self.assertTrue(all(hash_key(str(item)) in bloom for item in range(10000)))
+        false_positives = sum(
+            hash_key(str(item)) in bloom for item in range(10000, 20000)
+        )
+        self.assertLess(false_positives / 10000, 3 * bloom.false_positive_rate)
+
+    def test_hyperloglog(self):
+        """Test that the estimate is within the error bounds."""
+        for count in (100, 50000):
+            sketch = HyperLogLog(12)
+            for item in range(count):
+                sketch.add(hash_key(str(item)))
+                sketch.add(hash_key(str(item)))
+
+            self.assertLess(
+                abs(sketch.estimate() - count), 3 * sketch.relative_error * count
+            )
+
+    def test_bounds_contain_exact_metrics(self):
+        """Test that the bounds contain the exact confusion matrix and metrics."""
+        cm = calculate_confusion_matrix(
+            {frozenset(row) for row in self.true_rows},
+            {frozenset(row) for row in self.algorithm_rows},
+        )
+        counts = estimate_counts(self.true_rows, self.algorithm_rows, 2**16)
+
+        for exact, estimate in zip(
+            cm + calculate_metrics(cm),
+            approximate_confusion_matrix(counts) + approximate_metrics(counts),
+        ):
+            with self.subTest(exact=exact, estimate=estimate):
+                self.assertLessEqual(estimate.low, exact)
+                self.assertLessEqual(exact, estimate.high)
+
+    def test_small_memory(self):
+        """Test that too little memory is rejected and a full filter warns."""
+        with self.assertRaises(ValueError):
+            estimate_counts(self.true_rows, self.algorithm_rows, 0)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            counts = estimate_counts(
+                self.true_rows, self.algorithm_rows, 3 * 2**4 + MIN_FILTER_BYTES, 4
+            )
+
+        self.assertEqual(len(caught), 1)
+        self.assertIn("saturated", str(caught[0].message))
+        self.assertLessEqual(counts.tp.value, counts.algorithm.value)
+
+    def test_rows_from_compacted_file(self):
+        """Test that the CURIEs of a compacted file are expanded."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "true.csv"
+            path.write_text(
+                "@prefix l: <https://x/listing_>\nl:1,https://x/listing_2\n"
+            )
+
+            self.assertEqual(
+                list(RowsFromFile(str(path))),
+                [["https://x/listing_1", "https://x/listing_2"]],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import io
+import pathlib
+import tempfile
+import unittest
+
+from src.metrics import ConfusionMatrix
+from src.strata import (
+    attribute_pair,
+    calculate_stratified_confusion_matrices,
+    read_attribute_from_file,
+    site_pair,
+    write_stratified_metrics,
+)
+
+PREFIX = "https://raw.githubusercontent.com/fdioguardi/pronto/main/ontology/pronto.owl#listing_"
+
+
+class TestStratifiedMetrics(unittest.TestCase):
+    """Test the stratified duplicate detection metrics."""
+
+    def setUp(self):
+        """Create true and algorithm positives across several sites."""
+        self.a, self.b, self.c, self.d = (
+            PREFIX + "site1_1",
+            PREFIX + "site2_A2",
+            PREFIX + "site3_3",
+            PREFIX + "site3_4",
+        )
+        self.true_positives = {
+            frozenset([self.a, self.b]),
+            frozenset([self.c, self.d]),
+            frozenset([self.a, self.c]),
+        }
+        self.algorithm_positives = {
+            frozenset([self.b, self.a]),
+            frozenset([self.b, self.c]),
+            frozenset([self.d, self.c]),
+        }
+
+    def test_site_pair(self):
+        """Test that the stratum is the sorted pair of source sites."""
+        self.assertEqual(site_pair(frozenset([self.c, self.a])), "site1-site3")
+        self.assertEqual(site_pair(frozenset([self.c, self.d])), "site3-site3")
+        self.assertEqual(site_pair(frozenset(["1", self.a])), "site1-unknown")
+
+    def test_calculate_stratified_confusion_matrices(self):
+        """Test that each match is counted in its stratum."""
+        cms = calculate_stratified_confusion_matrices(
+            self.true_positives, self.algorithm_positives, site_pair
+        )
+
+        self.assertEqual(
+            cms,
+            {
+                "site1-site2": ConfusionMatrix(tp=1, fp=0, fn=0),
+                "site1-site3": ConfusionMatrix(tp=0, fp=0, fn=1),
+                "site2-site3": ConfusionMatrix(tp=0, fp=1, fn=0),
+                "site3-site3": ConfusionMatrix(tp=1, fp=0, fn=0),
+            },
+        )
+
+    def test_attribute_pair(self):
+        """Test that matches are stratified by an attribute of the data file."""
+        with tempfile.TemporaryDirectory() as directory:
+            data_file = pathlib.Path(directory) / "data.csv"
+            data_file.write_text(
+                f"uri,city\n{self.a},la plata\n{self.b},quilmes\n{self.c},la plata\n"
+            )
+            attributes = read_attribute_from_file(
+                str(data_file), "city", [self.a, self.b]
+            )
+
+        self.assertEqual(attributes, {self.a: "la plata", self.b: "quilmes"})
+
+        cms = calculate_stratified_confusion_matrices(
+            self.true_positives, self.algorithm_positives, attribute_pair(attributes)
+        )
+        self.assertEqual(
+            cms,
+            {
+                "-": ConfusionMatrix(tp=1, fp=0, fn=0),
+                "-la plata": ConfusionMatrix(tp=0, fp=0, fn=1),
+                "-quilmes": ConfusionMatrix(tp=0, fp=1, fn=0),
+                "la plata-quilmes": ConfusionMatrix(tp=1, fp=0, fn=0),
+            },
+        )
+
+    def test_write_stratified_metrics(self):
+        """Test that the table has a row per stratum and a total row."""
+        output = io.StringIO()
+        write_stratified_metrics(
+            output,
+            {
+                "site1-site2": ConfusionMatrix(tp=1, fp=1, fn=0),
+                "site3-site3": ConfusionMatrix(tp=1, fp=0, fn=1),
+            },
+        )
+
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            [
+                "stratum,tp,fp,fn,precision,recall,f1_score",
+                "site1-site2,1,1,0,0.500,1.000,0.667",
+                "site3-site3,1,0,1,1.000,0.500,0.667",
+                "all,2,1,1,0.667,0.667,0.667",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,562 @@
+"""
+Run the evaluation workflow (`gt.py` -> `convert.py` -> matcher ->
+`metrics.py`) as a pipeline of stages that only rerun when needed.
+
+A pipeline is a JSON file with variables and stages:
+
+    {
+        "variables": {"work": "{root}/work", "seed": "0"},
+        "stages": [
+            {
+                "name": "truth",
+                "cwd": "../convert/src",
+                "command": "python convert.py -i ... -o {work}/truth.jedai.csv ...",
+                "inputs": ["../ground_truth/input/labels.csv"],
+                "outputs": ["work/truth.jedai.csv"],
+                "stdout": "work/truth.log"
+            }
+        ]
+    }
+
+Variables are substituted for the `{name}` placeholders of commands,
+paths and other variables, and can be overridden from the command line.
+Only the names of variables are substituted, so other braces, such as
+those of JSON arguments or awk scripts, are kept as they are. A
+variable declared as `null` must be given from the command line.
+`root` is the directory of the pipeline file, which paths of inputs,
+outputs and `cwd` are relative to.
+
+The key of a stage is a hash of its command, its outputs and the
+contents of its inputs, with paths relative to the pipeline file, so
+that moving the checkout keeps the cache. When a stage has run with the
+same key before, its outputs are restored from the cache instead. A
+stage depends on the stages that write its inputs, and stages that do
+not depend on each other run in parallel.
+
+Usage (from the `pipeline` directory):
+    python -m src.pipeline -c pipeline.json -s matcher="python my_matcher.py"
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import IO, Optional
+
+# A placeholder of a variable in a command, a path or another variable.
+PLACEHOLDER = re.compile(r"\{([A-Za-z_]\w*)\}")
+
+
+@dataclasses.dataclass(frozen=True)
+class Stage:
+    """
+    A command of the pipeline, with the files it reads and writes.
+
+    Attributes:
+        name: The name of the stage.
+        command: The command, split into arguments.
+        cwd: The directory to run the command in.
+        inputs: The files the stage reads, or directories of them.
+        outputs: The files the stage writes.
+        stdout: The file to write the standard output of the command to,
+            which is also an output, or None to inherit it.
+        root: The directory of the pipeline file, which the paths of the
+            key of the stage are relative to.
+    """
+
+    name: str
+    command: tuple[str, ...]
+    cwd: str
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    stdout: Optional[str] = None
+    root: str = os.sep
+
+    @property
+    def artifacts(self) -> tuple[str, ...]:
+        """Return the outputs of the stage, including its standard output."""
+        return self.outputs + ((self.stdout,) if self.stdout else ())
+
+
+@dataclasses.dataclass
+class Result:
+    """
+    The outcome of a stage in a run of the pipeline.
+
+    Attributes:
+        name: The name of the stage.
+        status: "ran", "cached", "failed", or "skipped" when a stage it
+            depends on did not succeed.
+        seconds: The time taken to run the stage or restore its outputs.
+        key: The key of the stage, or None if it was skipped.
+    """
+
+    name: str
+    status: str
+    seconds: float = 0.0
+    key: Optional[str] = None
+
+
+def substitute(value: str, variables: dict[str, Optional[str]]) -> str:
+    """
+    Substitute the variables of the `{name}` placeholders of a value,
+    keeping any other text, including other braces, as it is.
+
+    Args:
+        value (str): the value.
+        variables (dict[str, Optional[str]]): the value of each
+            variable, which is None if it must be given.
+
+    Returns:
+        str: the value with its variables substituted.
+
+    Raises:
+        KeyError: if a variable is declared without a value.
+    """
+
+    def replace(match: re.Match) -> str:
+        name: str = match.group(1)
+        if name not in variables:
+            return match.group(0)
+        if variables[name] is None:
+            raise KeyError(name)
+        return variables[name]
+
+    return PLACEHOLDER.sub(replace, value)
+
+
+def load_pipeline(file_path: str, overrides: dict[str, str]) -> list[Stage]:
+    """
+    Load the stages of a pipeline file.
+
+    Args:
+        file_path (str): path to the pipeline file.
+        overrides (dict[str, str]): values of variables that replace
+            the ones of the file.
+
+    Returns:
+        list[Stage]: the stages, with their variables substituted and
+        their paths made absolute.
+
+    Raises:
+        KeyError: if a stage uses a variable declared without a value.
+    """
+    with open(file_path, "r") as f:
+        config = json.load(f)
+
+    root: str = os.path.dirname(os.path.abspath(file_path))
+    variables: dict[str, Optional[str]] = {"root": root}
+    for name, value in {**config.get("variables", {}), **overrides}.items():
+        variables[name] = None if value is None else substitute(str(value), variables)
+
+    def path(value: str) -> str:
+        return os.path.normpath(os.path.join(root, substitute(value, variables)))
+
+    stages: list[Stage] = []
+    for stage in config["stages"]:
+        try:
+            stages.append(
+                Stage(
+                    name=stage["name"],
+                    command=tuple(shlex.split(substitute(stage["command"], variables))),
+                    cwd=path(stage.get("cwd", ".")),
+                    inputs=tuple(path(p) for p in stage.get("inputs", [])),
+                    outputs=tuple(path(p) for p in stage.get("outputs", [])),
+                    stdout=path(stage["stdout"]) if "stdout" in stage else None,
+                    root=root,
+                )
+            )
+        except KeyError as error:
+            raise KeyError(
+                f"Stage {stage['name']} needs the variable {error}; "
+                f"give it with --set {error.args[0]}=VALUE"
+            ) from None
+
+    return stages
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Hash the contents of a file, or of the files of a directory, such
+    as the source code of a stage.
+
+    Args:
+        file_path (str): path to the file or directory.
+
+    Returns:
+        str: the SHA-256 of the contents, in hexadecimal.
+
+    Raises:
+        FileNotFoundError: if the file does not exist.
+    """
+    digest = hashlib.sha256()
+    if os.path.isdir(file_path):
+        for directory, subdirectories, files in os.walk(file_path):
+            subdirectories[:] = sorted(
+                name for name in subdirectories if not name.startswith((".", "__"))
+            )
+            for name in sorted(files):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, file_path).encode())
+                digest.update(file_digest(path).encode())
+
+        return digest.hexdigest()
+
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def stage_key(stage: Stage) -> str:
+    """
+    Hash a stage by its command, its outputs and the contents of its
+    inputs.
+
+    Absolute paths, including the arguments of the command that are
+    absolute paths, are hashed relative to the root of the stage when
+    they share a directory with it other than the top one, so that the
+    key does not change with the location of the checkout, while system
+    paths, such as the one of an interpreter, are hashed as they are.
+
+    Args:
+        stage (Stage): the stage.
+
+    Returns:
+        str: the key of the stage.
+
+    Raises:
+        FileNotFoundError: if an input of the stage does not exist.
+    """
+
+    def relative(path: str) -> str:
+        if not os.path.isabs(path):
+            return path
+        common = os.path.commonpath([path, stage.root])
+        if common == os.path.dirname(common):
+            return path
+        return os.path.relpath(path, stage.root)
+
+    description = {
+        "command": [relative(argument) for argument in stage.command],
+        "cwd": relative(stage.cwd),
+        "outputs": [relative(path) for path in stage.artifacts],
+        "inputs": {relative(path): file_digest(path) for path in sorted(stage.inputs)},
+    }
+    return hashlib.sha256(json.dumps(description).encode()).hexdigest()
+
+
+class Cache:
+    """
+    A directory of the outputs of each stage run, by key.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Args:
+            directory (str): the directory of the cache.
+        """
+        self.directory: str = directory
+
+    def restore(self, key: str, outputs: tuple[str, ...]) -> bool:
+        """
+        Copy the cached outputs of a key to their paths.
+
+        Args:
+            key (str): the key of the stage.
+            outputs (tuple[str, ...]): the paths of the outputs.
+
+        Returns:
+            bool: whether the outputs were cached.
+        """
+        entry: str = os.path.join(self.directory, key)
+        if not os.path.isdir(entry):
+            return False
+
+        for index, output in enumerate(outputs):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            shutil.copyfile(os.path.join(entry, str(index)), output)
+
+        return True
+
+    def store(self, key: str, outputs: tuple[str, ...]) -> None:
+        """
+        Copy the outputs of a stage run into the cache.
+
+        The entry is written under a temporary name and then renamed, so
+        that an interrupted copy is never taken for a cached run.
+
+        Args:
+            key (str): the key of the stage.
+            outputs (tuple[str, ...]): the paths of the outputs.
+        """
+        entry: str = os.path.join(self.directory, key)
+        partial: str = f"{entry}.{os.getpid()}.partial"
+        os.makedirs(partial, exist_ok=True)
+        for index, output in enumerate(outputs):
+            shutil.copyfile(output, os.path.join(partial, str(index)))
+
+        try:
+            os.rename(partial, entry)
+        except OSError:
+            shutil.rmtree(partial)
+
+
+def dependencies(stages: list[Stage]) -> dict[str, set[str]]:
+    """
+    Find the stages each stage depends on, i.e. the ones that write its
+    inputs.
+
+    Args:
+        stages (list[Stage]): the stages.
+
+    Returns:
+        dict[str, set[str]]: the names of the dependencies of each stage.
+
+    Raises:
+        ValueError: if two stages write the same file.
+    """
+    writers: dict[str, str] = {}
+    for stage in stages:
+        for output in stage.artifacts:
+            if output in writers:
+                raise ValueError(
+                    f"{output} is written by {writers[output]} and {stage.name}"
+                )
+            writers[output] = stage.name
+
+    return {
+        stage.name: {writers[path] for path in stage.inputs if path in writers}
+        for stage in stages
+    }
+
+
+def run_stage(stage: Stage, cache: Cache, force: bool = False) -> Result:
+    """
+    Run a stage, or restore its outputs from the cache.
+
+    Args:
+        stage (Stage): the stage.
+        cache (Cache): the cache of outputs.
+        force (bool): whether to run the stage even if it is cached.
+
+    Returns:
+        Result: the outcome of the stage.
+    """
+    start: float = time.perf_counter()
+    try:
+        key: str = stage_key(stage)
+    except OSError as error:
+        print(f"[{stage.name}] {error}", file=sys.stderr)
+        return Result(stage.name, "failed", time.perf_counter() - start)
+
+    if not force and cache.restore(key, stage.artifacts):
+        return Result(stage.name, "cached", time.perf_counter() - start, key)
+
+    # Commands such as `convert.py` refuse to overwrite their outputs.
+    for output in stage.artifacts:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        if os.path.exists(output):
+            os.remove(output)
+
+    stdout: Optional[IO[bytes]] = open(stage.stdout, "wb") if stage.stdout else None
+    try:
+        completed = subprocess.run(stage.command, cwd=stage.cwd, stdout=stdout)
+    except OSError as error:
+        print(f"[{stage.name}] {error}", file=sys.stderr)
+        return Result(stage.name, "failed", time.perf_counter() - start, key)
+    finally:
+        if stdout is not None:
+            stdout.close()
+
+    missing = [output for output in stage.outputs if not os.path.exists(output)]
+    if completed.returncode != 0 or missing:
+        print(
+            f"[{stage.name}] exited with {completed.returncode}"
+            + (f", missing {', '.join(missing)}" if missing else ""),
+            file=sys.stderr,
+        )
+        return Result(stage.name, "failed", time.perf_counter() - start, key)
+
+    cache.store(key, stage.artifacts)
+    return Result(stage.name, "ran", time.perf_counter() - start, key)
+
+
+def run_pipeline(
+    stages: list[Stage], cache: Cache, jobs: int = 1, force: bool = False
+) -> list[Result]:
+    """
+    Run the stages of a pipeline, each one as soon as the stages it
+    depends on have succeeded, with up to `jobs` stages at a time.
+
+    Args:
+        stages (list[Stage]): the stages.
+        cache (Cache): the cache of outputs.
+        jobs (int): the maximum number of stages to run at once.
+        force (bool): whether to run the stages even if they are cached.
+
+    Returns:
+        list[Result]: the outcome of each stage, in the order of
+        `stages`.
+
+    Raises:
+        ValueError: if stages depend on each other.
+    """
+    depends: dict[str, set[str]] = dependencies(stages)
+    results: dict[str, Result] = {}
+    running: dict[Future, str] = {}
+
+    with ThreadPoolExecutor(jobs) as executor:
+        while len(results) < len(stages):
+            progress: bool = False
+            for stage in stages:
+                if stage.name in results or stage.name in running.values():
+                    continue
+
+                states = [results.get(name) for name in depends[stage.name]]
+                if any(s and s.status in ("failed", "skipped") for s in states):
+                    results[stage.name] = Result(stage.name, "skipped")
+                    progress = True
+                elif all(states):
+                    future = executor.submit(run_stage, stage, cache, force)
+                    running[future] = stage.name
+                    progress = True
+
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+            elif not progress:
+                raise ValueError(
+                    "The stages "
+                    + ", ".join(s.name for s in stages if s.name not in results)
+                    + " depend on each other"
+                )
+
+    return [results[stage.name] for stage in stages]
+
+
+def print_report(results: list[Result], seconds: float) -> None:
+    """
+    Print the status and the time taken by each stage.
+
+    Args:
+        results (list[Result]): the outcome of each stage.
+        seconds (float): the wall time of the whole run.
+    """
+    width: int = max([len(result.name) for result in results] + [len("total")])
+    print(f"{'stage':<{width}} {'status':<8} {'seconds':>8}")
+    for result in results:
+        print(f"{result.name:<{width}} {result.status:<8} {result.seconds:>8.2f}")
+    print(f"{'total':<{width}} {'':<8} {seconds:>8.2f}")
+
+
+def parse_variable(value: str) -> tuple[str, str]:
+    """
+    Parse a variable given as "NAME=VALUE".
+
+    Args:
+        value (str): the variable argument.
+
+    Returns:
+        tuple[str, str]: the name and the value of the variable.
+    """
+    name, separator, value = value.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got {name}")
+
+    return name, value
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        argparse.Namespace: the parsed arguments as an object.
+    """
+    parser = argparse.ArgumentParser(
+        description="Runs the stages of an evaluation pipeline, reusing the outputs of unchanged stages"
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        default="pipeline.json",
+        help="path to the pipeline file",
+    )
+    parser.add_argument(
+        "-s",
+        "--set",
+        type=parse_variable,
+        action="append",
+        default=[],
+        help="NAME=VALUE of a variable of the pipeline; may be repeated",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="maximum number of stages to run at once",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="directory of the cached outputs; .cache next to the pipeline file by default",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="run every stage even if its outputs are cached",
+    )
+    parser.add_argument(
+        "-r",
+        "--report",
+        type=str,
+        default=None,
+        help="path to write the outcome of each stage to, as JSON",
+    )
+
+    args: argparse.Namespace = parser.parse_args()
+
+    if not os.path.exists(args.config):
+        raise argparse.ArgumentTypeError(f"File {args.config} does not exist")
+
+    return args
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    stages = load_pipeline(args.config, dict(args.set))
+    cache = Cache(
+        args.cache
+        or os.path.join(os.path.dirname(os.path.abspath(args.config)), ".cache")
+    )
+
+    start: float = time.perf_counter()
+    results = run_pipeline(stages, cache, args.jobs, args.force)
+    print_report(results, time.perf_counter() - start)
+
+    if args.report is not None:
+        with open(args.report, "w") as f:
+            json.dump([dataclasses.asdict(result) for result in results], f, indent=2)
+
+    if any(result.status in ("failed", "skipped") for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import json
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+from src.pipeline import (
+    Cache,
+    dependencies,
+    load_pipeline,
+    run_pipeline,
+    stage_key,
+)
+
+# Copy the first argument to the second one, uppercased, after a pause.
+UPPER = (
+    '{python} -c "import sys, time; time.sleep({pause}); '
+    "open(sys.argv[2], 'w').write(open(sys.argv[1]).read().upper())\""
+)
+
+
+class TestPipeline(unittest.TestCase):
+    """Test the cached, parallel pipeline runner."""
+
+    def setUp(self):
+        """Write a pipeline of two independent stages and a final one."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.directory.name)
+        (self.root / "input.txt").write_text("labels")
+        self.config = self.root / "pipeline.json"
+        self.config.write_text(
+            json.dumps(
+                {
+                    "variables": {"python": sys.executable, "pause": "0.5"},
+                    "stages": [
+                        {
+                            "name": name,
+                            "command": UPPER + f" input.txt out/{name}.txt",
+                            "inputs": ["input.txt"],
+                            "outputs": [f"out/{name}.txt"],
+                        }
+                        for name in ("truth", "training")
+                    ]
+                    + [
+                        {
+                            "name": "metrics",
+                            "command": "{python} -c \"print('done')\"",
+                            "inputs": ["out/truth.txt", "out/training.txt"],
+                            "stdout": "out/metrics.txt",
+                        }
+                    ],
+                }
+            )
+        )
+        self.cache = Cache(str(self.root / ".cache"))
+
+    def tearDown(self):
+        """Remove the pipeline and its outputs."""
+        self.directory.cleanup()
+
+    def test_dependencies(self):
+        """Test that stages depend on the stages that write their inputs."""
+        stages = load_pipeline(str(self.config), {})
+
+        self.assertEqual(
+            dependencies(stages),
+            {"truth": set(), "training": set(), "metrics": {"truth", "training"}},
+        )
+
+    def test_missing_variable(self):
+        """Test that a variable declared without a value is reported."""
+        config = json.loads(self.config.read_text())
+        config["variables"]["pause"] = None
+        self.config.write_text(json.dumps(config))
+
+        with self.assertRaises(KeyError):
+            load_pipeline(str(self.config), {})
+        self.assertEqual(len(load_pipeline(str(self.config), {"pause": "0"})), 3)
+
+    def test_literal_braces(self):
+        """Test that braces that are not variables are kept."""
+        config = json.loads(self.config.read_text())
+        config["stages"][2][
+            "command"
+        ] = "awk '{print $1}' '{\"a\": {\"b\": 1}}' {other} {python}"
+        self.config.write_text(json.dumps(config))
+
+        command = load_pipeline(str(self.config), {})[2].command
+        self.assertEqual(
+            command,
+            ("awk", "{print $1}", '{"a": {"b": 1}}', "{other}", sys.executable),
+        )
+
+    def test_key_of_moved_pipeline(self):
+        """Test that the keys do not depend on where the pipeline is."""
+        keys = [stage_key(stage) for stage in load_pipeline(str(self.config), {})[:2]]
+        moved = self.root / "moved"
+        moved.mkdir()
+        for name in ("input.txt", "pipeline.json"):
+            shutil.copy(self.root / name, moved / name)
+
+        stages = load_pipeline(str(moved / "pipeline.json"), {})[:2]
+        self.assertEqual([stage_key(stage) for stage in stages], keys)
+
+    def test_run_in_parallel_and_cache(self):
+        """Test that independent stages overlap and unchanged ones are reused."""
+        stages = load_pipeline(str(self.config), {})
+
+        start = time.perf_counter()
+        results = run_pipeline(stages, self.cache, jobs=2)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual([r.status for r in results], ["ran", "ran", "ran"])
+        self.assertEqual((self.root / "out" / "truth.txt").read_text(), "LABELS")
+        self.assertEqual((self.root / "out" / "metrics.txt").read_text(), "done\n")
+
+        (self.root / "out" / "truth.txt").unlink()
+        results = run_pipeline(stages, self.cache, jobs=2)
+        self.assertEqual([r.status for r in results], ["cached"] * 3)
+        self.assertEqual((self.root / "out" / "truth.txt").read_text(), "LABELS")
+
+        (self.root / "input.txt").write_text("other labels")
+        results = run_pipeline(stages, self.cache, jobs=2)
+        self.assertEqual([r.status for r in results], ["ran", "ran", "ran"])
+
+    def test_failure_skips_dependents(self):
+        """Test that the stages after a failed one are skipped."""
+        stages = load_pipeline(str(self.config), {"pause": "'x'"})
+
+        results = run_pipeline(stages, self.cache, jobs=2)
+
+        self.assertEqual([r.status for r in results], ["failed", "failed", "skipped"])
+
+
+if __name__ == "__main__":
+    unittest.main()